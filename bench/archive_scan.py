@@ -0,0 +1,134 @@
+"""
+Benchmark scan analitik: arsip kolom (mmap) vs jurnal baris per baris
+
+Jalankan dari root project:
+    python bench/archive_scan.py [jumlah_line_item]
+
+Default 10.000.000 line item (3 line per transaksi, 500 item berbeda,
+satu transaksi tiap 2 detik). Arsip sintetis ditulis ke folder sementara
+dengan TransactionArchive.write_segment, jadi formatnya sama dengan hasil
+archive-transactions; angka total dihitung dengan hitung_total.
+
+Yang diukur:
+    1. Scan arsip seluruh rentang dan rentang satu hari, dengan numpy
+       (jika terinstall) dan dengan array stdlib
+    2. Baseline: sales_summary dari jurnal SQLite (decode JSON per baris)
+       untuk 1.000.000 line item, lalu diekstrapolasi ke jumlah line
+"""
+
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import main  # noqa: E402
+
+LINES_PER_TRX = 3
+START_TIME = 1.75e9
+TRX_INTERVAL = 2.0
+JOURNAL_LINES = 1_000_000
+
+
+def synthetic_rows(trx_count, first_seq=1, seed=0):
+    """Baris seperti TransactionJournal.rows()"""
+    rng = random.Random(seed)
+    ids = [f"I{n:04d}" for n in range(500)]
+
+    for seq in range(first_seq, first_seq + trx_count):
+        items = [
+            {"id": rng.choice(ids), "nama": "x", "price": 15000, "qty": rng.randint(1, 3)}
+            for _ in range(LINES_PER_TRX)
+        ]
+        subtotal = sum(line["price"] * line["qty"] for line in items)
+        diskon, ppn, total = main.hitung_total(subtotal)
+        yield (
+            seq, f"K3-{seq:08d}", "K3", "bench@kasir", START_TIME + seq * TRX_INTERVAL,
+            subtotal, diskon, ppn, total, total + 5000, 5000, {"items": items},
+        )
+
+
+def build_archive(trx_count):
+    batch = []
+    for row in synthetic_rows(trx_count):
+        batch.append(row)
+        if len(batch) == main.ARCHIVE_SEGMENT_MAX_TRX:
+            main.trx_archive.write_segment(batch)
+            batch = []
+    if batch:
+        main.trx_archive.write_segment(batch)
+
+
+def build_journal(trx_count):
+    conn = main.connect_db()
+    main.trx_journal.rows(limit=1)  # buat tabel
+    try:
+        conn.execute("BEGIN")
+        conn.executemany(
+            "INSERT INTO trx_journal (trx_id, outlet, email, waktu, subtotal, diskon, "
+            "ppn, total, cash, kembalian, pembeli) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (row[1:-1] + (json.dumps(row[-1]),) for row in synthetic_rows(trx_count)),
+        )
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main_bench(lines):
+    trx_count = lines // LINES_PER_TRX
+    tmp = tempfile.mkdtemp(prefix="kasir-bench-archive-")
+    main.app.config["ARCHIVE_DIR"] = os.path.join(tmp, "archive")
+    main.app.config["DATABASE"] = os.path.join(tmp, "kasir.db")
+
+    one_day = (START_TIME + 86400 * 30, START_TIME + 86400 * 31)
+
+    try:
+        elapsed, _ = timed(lambda: build_archive(trx_count))
+        segments = main.trx_archive.segments()
+        line_count = sum(segment.header["line_count"] for segment in segments)
+        size = sum(os.path.getsize(segment.path) for segment in segments)
+        print(f"arsip: {line_count} line item, {trx_count} transaksi, "
+              f"{len(segments)} segmen, {size / 2**20:.0f} MiB (tulis {elapsed:.1f} s)")
+
+        print(f"{'scan arsip':<16} {'semua':>10} {'1 hari':>10}")
+        numpy_module = main.numpy
+        backends = [("numpy", numpy_module)] if numpy_module is not None else []
+        backends.append(("array (stdlib)", None))
+        for label, backend in backends:
+            main.numpy = backend
+            try:
+                full, result = timed(lambda: main.trx_archive.summary())
+                day, _ = timed(lambda: main.trx_archive.summary(*one_day))
+            finally:
+                main.numpy = numpy_module
+            assert result["trx_count"] == trx_count
+            print(f"{label:<16} {full:9.2f}s {day * 1000:8.1f}ms")
+
+        # Baseline: arsip kosong, semua transaksi di jurnal
+        main.app.config["ARCHIVE_DIR"] = os.path.join(tmp, "empty")
+        journal_trx = JOURNAL_LINES // LINES_PER_TRX
+        build_journal(journal_trx)
+        elapsed, result = timed(lambda: main.sales_summary())
+        assert result["trx_count"] == journal_trx
+        per_line = elapsed / (journal_trx * LINES_PER_TRX)
+        print(f"jurnal (SQLite + JSON per baris): {elapsed:.2f} s untuk "
+              f"{journal_trx * LINES_PER_TRX} line item, "
+              f"~{per_line * line_count:.0f} s untuk {line_count} line item")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main_bench(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000)
@@ -0,0 +1,211 @@
+"""
+Benchmark koneksi per worker: WSGI (gunicorn gthread) vs ASGI (uvicorn)
+
+Jalankan dari root project:
+    python bench/asgi_connections.py [jumlah_stream]
+
+Untuk setiap mode, satu worker server dijalankan di folder sementara
+(data/ sendiri). Benchmark membuka N koneksi SSE /stream/availability
+(seperti tablet yang selalu terhubung), lalu mengukur latency /cart/get
+selama stream-stream itu tetap terbuka, plus jumlah thread dan RSS
+proses server.
+
+Butuh gunicorn dan uvicorn (pip install gunicorn uvicorn); mode yang
+package-nya tidak ada dilewati. Untuk 1000 stream, naikkan batas file
+descriptor dulu (ulimit -n 4096).
+"""
+
+import asyncio
+import http.client
+import importlib.util
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.parse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Thread per worker untuk mode WSGI (gunicorn --threads)
+WSGI_THREADS = 16
+
+CONNECT_TIMEOUT = 20
+REQUEST_TIMEOUT = 5
+LATENCY_SAMPLES = 20
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def server_command(mode, port):
+    if mode == "wsgi":
+        return [
+            sys.executable, "-m", "gunicorn", "--pythonpath", ROOT,
+            "--worker-class", "gthread", "--workers", "1",
+            "--threads", str(WSGI_THREADS), "--bind", f"127.0.0.1:{port}",
+            "main:app",
+        ]
+    return [
+        sys.executable, "-m", "uvicorn", "--app-dir", ROOT,
+        "--workers", "1", "--host", "127.0.0.1", "--port", str(port),
+        "--log-level", "warning", "main:asgi_app",
+    ]
+
+
+def wait_ready(port, deadline=30):
+    start = time.time()
+    while time.time() - start < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/login")
+            conn.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server di port {port} tidak siap")
+
+
+def login(port):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    body = urllib.parse.urlencode({"email": "zhaenx_id@yeswehack.com", "password": "zh43nx"})
+    conn.request("POST", "/login", body=body,
+                 headers={"Content-Type": "application/x-www-form-urlencoded"})
+    response = conn.getresponse()
+    response.read()
+    return response.getheader("Set-Cookie").split(";")[0]
+
+
+def server_pid(process):
+    """PID proses worker (gunicorn: child dari master)"""
+    try:
+        with open(f"/proc/{process.pid}/task/{process.pid}/children") as file:
+            children = file.read().split()
+    except OSError:
+        children = []
+    return int(children[0]) if children else process.pid
+
+
+def proc_status(pid):
+    status = {}
+    with open(f"/proc/{pid}/status") as file:
+        for line in file:
+            key, _, value = line.partition(":")
+            status[key] = value.strip()
+    return int(status["Threads"]), int(status["VmRSS"].split()[0]) / 1024
+
+
+async def open_stream(port, cookie, connected):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(
+        f"GET /stream/availability HTTP/1.1\r\nHost: bench\r\nCookie: {cookie}\r\n\r\n".encode()
+    )
+    await writer.drain()
+
+    buffer = b""
+    while b"snapshot" not in buffer:
+        data = await reader.read(4096)
+        if not data:
+            return
+        buffer += data
+    connected.append(writer)
+
+    # Tahan koneksi tetap terbuka sampai task di-cancel
+    await asyncio.Event().wait()
+
+
+async def cart_get(port, cookie):
+    start = time.perf_counter()
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(
+        f"GET /cart/get HTTP/1.1\r\nHost: bench\r\nCookie: {cookie}\r\nConnection: close\r\n\r\n".encode()
+    )
+    await writer.drain()
+    await reader.read()
+    writer.close()
+    return (time.perf_counter() - start) * 1000
+
+
+async def measure(port, cookie, streams):
+    connected = []
+    tasks = [asyncio.create_task(open_stream(port, cookie, connected)) for _ in range(streams)]
+
+    start = time.perf_counter()
+    while len(connected) < streams and time.perf_counter() - start < CONNECT_TIMEOUT:
+        await asyncio.sleep(0.1)
+    connect_s = time.perf_counter() - start
+
+    latencies = []
+    try:
+        for _ in range(LATENCY_SAMPLES):
+            latencies.append(await asyncio.wait_for(cart_get(port, cookie), REQUEST_TIMEOUT))
+    except asyncio.TimeoutError:
+        latencies = None
+
+    result = {"connected": len(connected), "connect_s": connect_s, "latencies": latencies}
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return result
+
+
+def run_mode(mode, streams):
+    workdir = tempfile.mkdtemp(prefix="kasir-bench-")
+    os.makedirs(os.path.join(workdir, "data"))
+    shutil.copy(os.path.join(ROOT, "data", "menu.json"), os.path.join(workdir, "data"))
+
+    port = free_port()
+    process = subprocess.Popen(
+        server_command(mode, port), cwd=workdir,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_ready(port)
+        cookie = login(port)
+        result = asyncio.run(measure(port, cookie, streams))
+        result["threads"], result["rss_mb"] = proc_status(server_pid(process))
+        return result
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main_bench(streams):
+    modes = [
+        ("wsgi", f"gunicorn gthread ({WSGI_THREADS} thread)", "gunicorn"),
+        ("asgi", "uvicorn main:asgi_app", "uvicorn"),
+    ]
+
+    print(f"{streams} stream SSE terbuka, 1 worker")
+    print(f"{'mode':<30} {'stream':>11} {'connect s':>10} {'/cart/get p50':>14} "
+          f"{'max ms':>7} {'thread':>7} {'RSS MB':>7}")
+
+    for mode, label, package in modes:
+        if importlib.util.find_spec(package) is None:
+            print(f"{label:<30} dilewati ({package} tidak terinstall)")
+            continue
+
+        r = run_mode(mode, streams)
+        if r["latencies"] is None:
+            p50 = f"timeout >{REQUEST_TIMEOUT}s"
+            worst = "-"
+        else:
+            p50 = f"{statistics.median(r['latencies']):.1f} ms"
+            worst = f"{max(r['latencies']):.1f}"
+        print(f"{label:<30} {r['connected']:>5}/{streams:<5} {r['connect_s']:10.1f} {p50:>14} "
+              f"{worst:>7} {r['threads']:7d} {r['rss_mb']:7.0f}")
+
+
+if __name__ == "__main__":
+    main_bench(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
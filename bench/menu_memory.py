@@ -0,0 +1,79 @@
+"""
+Benchmark memory katalog menu: dict hasil json.loads vs MenuItem (__slots__)
+
+Jalankan dari root project:
+    python bench/menu_memory.py [jumlah_item]
+
+Memory diukur dengan tracemalloc (hanya alokasi Python, tanpa overhead
+allocator), jadi angkanya bisa dibandingkan antar mesin.
+"""
+
+import json
+import os
+import sys
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import main  # noqa: E402
+
+
+def synthetic_menu(total, categories=10):
+    """menu.json sintetis: nama/img berulang seperti katalog asli"""
+    per_category = total // categories
+    return {
+        f"Kategori {k}": [
+            {
+                "nama": f"Menu item nomor {k} {i % 500}",
+                "price": 10000 + i,
+                "id": f"K{k}I{i}",
+                "img": f"https://img.example/{k}/{i % 50}.jpg",
+            }
+            for i in range(per_category)
+        ]
+        for k in range(categories)
+    }
+
+
+def measure(build):
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def main_bench(total):
+    raw = json.dumps(synthetic_menu(total))
+
+    # Sebelum: katalog = dict hasil json.loads
+    _, before = measure(lambda: json.loads(raw))
+
+    # Sesudah: katalog = MenuItem per item (seperti load_menu)
+    def build_compact():
+        return {
+            sys.intern(kategori): [main.MenuItem(value, kategori) for value in items]
+            for kategori, items in json.loads(raw).items()
+        }
+
+    _, after = measure(build_compact)
+
+    print(f"katalog {total} item (tracemalloc)")
+    print(f"  dict      : {before / total:7.1f} bytes/item  ({before / 2**20:6.1f} MiB)")
+    print(f"  MenuItem  : {after / total:7.1f} bytes/item  ({after / 2**20:6.1f} MiB)")
+    print(f"  hemat     : {100 * (1 - after / before):.0f}%")
+
+    # Line cart di session: copy data item vs [id, qty]
+    item = {"id": "Mkn001", "nama": "Nasi goreng pedas pake telor", "price": 23000,
+            "img": "https://i.ibb.co.com/200HRDjR/MK001.jpg"}
+    old_line = {**item, "qty": 2, "subtotal": 46000}
+    new_line = [item["id"], 2]
+    print("line cart di session (JSON)")
+    print(f"  dict      : {len(json.dumps(old_line, separators=(',', ':')))} bytes")
+    print(f"  [id, qty] : {len(json.dumps(new_line, separators=(',', ':')))} bytes")
+
+
+if __name__ == "__main__":
+    main_bench(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
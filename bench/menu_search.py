@@ -0,0 +1,96 @@
+"""
+Benchmark MenuSearchIndex pada katalog sintetis 100.000 item
+
+Jalankan dari root project:
+    python bench/menu_search.py [jumlah_item]
+
+Membandingkan index (prefix bisect + trigram) dengan scan linear
+(setiap kata query harus menjadi awalan salah satu kata nama/id), yaitu
+cara paling sederhana tanpa index.
+"""
+
+import os
+import random
+import statistics
+import string
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import main  # noqa: E402
+
+WORDS = [
+    "nasi", "goreng", "ayam", "bakar", "mie", "kuah", "es", "teh", "jeruk",
+    "kopi", "susu", "latte", "matcha", "sapi", "bebek", "pedas", "manis",
+    "keju", "coklat", "rice", "bowl", "sambal", "matah", "karage", "beef",
+    "soto", "bakso", "sate", "roti",
+]
+
+QUERIES = [
+    "nasi gor",  # prefix, 2 kata
+    "kopi susu latte",  # konjungsi 3 kata (banyak kandidat)
+    "X012345",  # id persis
+    "matca",  # typo (trigram)
+    "sambel matah",  # typo + prefix
+    "zzzz",  # bukan kata menu (hanya fuzzy ke suffix acak)
+]
+
+REPEAT = 50
+
+
+def synthetic_catalog(total, categories=20, seed=1):
+    rng = random.Random(seed)
+    catalog = {f"K{k}": [] for k in range(categories)}
+    for i in range(total):
+        nama = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 5)))
+        nama += " " + "".join(rng.choice(string.ascii_lowercase) for _ in range(4))
+        data = {"id": f"X{i:06d}", "nama": nama, "price": 1000, "img": ""}
+        catalog[f"K{i % categories}"].append(main.MenuItem(data, f"K{i % categories}"))
+    return catalog
+
+
+def linear_search(docs, query, limit):
+    words = main.normalize_text(query).split()
+    result = []
+    for kategori, item, tokens in docs:
+        if all(any(token.startswith(word) for token in tokens) for word in words):
+            result.append((kategori, item))
+            if len(result) >= limit:
+                break
+    return result
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000, result
+
+
+def main_bench(total):
+    catalog = synthetic_catalog(total)
+
+    start = time.perf_counter()
+    index = main.MenuSearchIndex(catalog)
+    print(f"katalog {total} item, build index {time.perf_counter() - start:.2f} s")
+
+    docs = [
+        (kategori, item, main.normalize_text(f"{item['nama']} {item['id']}").split())
+        for kategori, items in catalog.items()
+        for item in items
+    ]
+
+    print(f"{'query':<18} {'index ms':>9} {'hasil':>6} {'linear ms':>10} {'hasil':>6}")
+    for query in QUERIES:
+        index_ms, hits = timed(lambda: index.search(query, 20), REPEAT)
+        linear_ms, linear_hits = timed(lambda: linear_search(docs, query, 20), 5)
+        print(f"{query:<18} {index_ms:9.3f} {len(hits):6d} {linear_ms:10.2f} {len(linear_hits):6d}")
+
+
+if __name__ == "__main__":
+    main_bench(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
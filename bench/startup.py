@@ -0,0 +1,276 @@
+"""
+Benchmark startup worker: waktu import main.py (load menu.json) dan
+latency request pertama
+
+Jalankan dari root project:
+    python bench/startup.py [jumlah_item_sintetis]
+
+Setiap pengukuran memakai proses Python baru (seperti worker yang baru
+di-spawn) di folder sementara berisi data/menu.json sendiri, jadi
+data/ milik project tidak disentuh. Dua katalog diukur: menu.json asli
+dan menu.json sintetis yang besar (default 300.000 item, puluhan MB).
+
+Bagian kedua membandingkan loader lama (json.load seluruh file lalu
+convert ke MenuItem) dengan load_menu (streaming), masing-masing di
+proses baru supaya peak RSS tidak tercampur.
+
+Bagian ketiga mengukur request pertama dengan bytecode cache template
+Jinja: mati, folder cache kosong (worker pertama setelah deploy tanpa
+precompile), dan folder cache hasil "flask --app main precompile-templates".
+"""
+
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+RESULT_PREFIX = "BENCH "
+
+# Halaman kasir hanya diukur untuk katalog sebesar ini
+INDEX_MAX_ITEMS = 1000
+
+
+def synthetic_menu(total, categories=10):
+    per_category = total // categories
+    return {
+        f"Kat{k}": [
+            {
+                "nama": f"Menu item nomor {k} {i}",
+                "price": 10000 + i,
+                "id": f"K{k}I{i}",
+                "img": f"https://img.example/{k}/{i}.jpg",
+                "barcode": str(8990000000000 + k * 100000 + i),
+            }
+            for i in range(per_category)
+        ]
+        for k in range(categories)
+    }
+
+
+def maxrss_mb():
+    # Linux: ru_maxrss dalam KiB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def report(**result):
+    print(RESULT_PREFIX + json.dumps(result), flush=True)
+
+
+# ========================================================================
+# PROSES ANAK (dijalankan di folder sementara)
+# ========================================================================
+
+
+def child_startup():
+    start = time.perf_counter()
+    sys.path.insert(0, ROOT)
+    import main
+
+    imported = time.perf_counter()
+    items = sum(len(items) for items in main.base_catalog.menu.values())
+
+    client = main.app.test_client()
+    base_url = "https://localhost"
+
+    # Request pertama: halaman login (render template pertama kali)
+    t = time.perf_counter()
+    client.get("/login", base_url=base_url)
+    first_login = time.perf_counter() - t
+
+    # Request pertama setelah login: JSON menu (halaman 1) dan halaman
+    # kasir. Halaman kasir me-render SEMUA item, jadi untuk katalog
+    # sintetis yang besar hanya /api/menu yang diukur
+    email, password = "zhaenx_id@yeswehack.com", "zh43nx"
+    client.post("/login", data={"email": email, "password": password}, base_url=base_url)
+    t = time.perf_counter()
+    client.get("/api/menu?page=1", base_url=base_url)
+    first_api = time.perf_counter() - t
+
+    first_index = None
+    if items <= INDEX_MAX_ITEMS:
+        t = time.perf_counter()
+        client.get("/", base_url=base_url)
+        first_index = (time.perf_counter() - t) * 1000
+
+    report(
+        items=items,
+        import_s=imported - start,
+        first_login_ms=first_login * 1000,
+        first_api_ms=first_api * 1000,
+        first_index_ms=first_index,
+        maxrss_mb=maxrss_mb(),
+    )
+
+
+def child_loader(mode):
+    sys.path.insert(0, ROOT)
+    import main
+
+    # Baseline RSS setelah import (menu.json asli yang kecil)
+    main.MENU_PATH = os.path.abspath("big_menu.json")
+    before = maxrss_mb()
+
+    start = time.perf_counter()
+    if mode == "json.load":
+        with open(main.MENU_PATH, "rb") as file:
+            raw = json.load(file)
+        catalog = {
+            sys.intern(kategori): [main.MenuItem(value, kategori) for value in values]
+            for kategori, values in raw.items()
+        }
+        del raw
+    else:
+        catalog, _ = main.load_menu()
+    elapsed = time.perf_counter() - start
+
+    report(
+        items=sum(len(items) for items in catalog.values()),
+        load_s=elapsed,
+        rss_growth_mb=maxrss_mb() - before,
+    )
+
+
+def child_templates(mode):
+    sys.path.insert(0, ROOT)
+    import main
+
+    if mode == "precompile":
+        result = main.app.test_cli_runner().invoke(args=["precompile-templates"])
+        if result.exit_code != 0:
+            raise RuntimeError(result.output)
+        return
+
+    if mode == "off":
+        main.app.jinja_env.bytecode_cache = None
+
+    client = main.app.test_client()
+    base_url = "https://localhost"
+
+    t = time.perf_counter()
+    client.get("/login", base_url=base_url)
+    first_login = time.perf_counter() - t
+
+    email, password = "zhaenx_id@yeswehack.com", "zh43nx"
+    client.post("/login", data={"email": email, "password": password}, base_url=base_url)
+    t = time.perf_counter()
+    client.get("/", base_url=base_url)
+    first_index = time.perf_counter() - t
+
+    report(
+        first_login_ms=first_login * 1000,
+        first_index_ms=first_index * 1000,
+        compiled=main.template_bytecode_cache.compiled if mode != "off" else None,
+    )
+
+
+# ========================================================================
+# PROSES UTAMA
+# ========================================================================
+
+
+def run_child(workdir, *args, expect_result=True):
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", *args],
+        cwd=workdir,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    if not expect_result:
+        return None
+    for line in output.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX):])
+    raise RuntimeError(f"Tidak ada hasil dari proses anak: {output}")
+
+
+def make_workdir(menu_path):
+    workdir = tempfile.mkdtemp(prefix="kasir-bench-")
+    os.makedirs(os.path.join(workdir, "data"))
+    shutil.copy(menu_path, os.path.join(workdir, "data", "menu.json"))
+    return workdir
+
+
+def main_bench(total):
+    tmp = tempfile.mkdtemp(prefix="kasir-bench-menu-")
+    big_menu = os.path.join(tmp, "menu.json")
+    with open(big_menu, "w") as file:
+        json.dump(synthetic_menu(total), file, indent=2)
+
+    try:
+        print("startup worker (proses baru, median dari 3)")
+        print(f"{'menu.json':<22} {'item':>7} {'import s':>9} {'login ms':>9} "
+              f"{'api ms':>8} {'index ms':>9} {'maxrss MB':>10}")
+
+        for label, path in (
+            ("asli", os.path.join(ROOT, "data", "menu.json")),
+            (f"sintetis {os.path.getsize(big_menu) / 1e6:.0f} MB", big_menu),
+        ):
+            runs = []
+            for _ in range(3):
+                workdir = make_workdir(path)
+                try:
+                    runs.append(run_child(workdir, "startup"))
+                finally:
+                    shutil.rmtree(workdir, ignore_errors=True)
+
+            runs.sort(key=lambda r: r["import_s"])
+            r = runs[1]
+            index_ms = "-" if r["first_index_ms"] is None else f"{r['first_index_ms']:.1f}"
+            print(f"{label:<22} {r['items']:7d} {r['import_s']:9.2f} {r['first_login_ms']:9.1f} "
+                  f"{r['first_api_ms']:8.1f} {index_ms:>9} {r['maxrss_mb']:10.0f}")
+
+        print()
+        print(f"loader menu.json sintetis ({total} item)")
+        print(f"{'loader':<12} {'load s':>7} {'RSS naik MB':>12}")
+        workdir = make_workdir(os.path.join(ROOT, "data", "menu.json"))
+        shutil.copy(big_menu, os.path.join(workdir, "big_menu.json"))
+        try:
+            for mode in ("json.load", "load_menu"):
+                r = run_child(workdir, "loader", mode)
+                print(f"{mode:<12} {r['load_s']:7.2f} {r['rss_growth_mb']:12.0f}")
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        print()
+        print("request pertama per worker, bytecode cache template (median dari 5)")
+        print(f"{'cache':<24} {'login ms':>9} {'index ms':>9} {'di-compile':>11}")
+        for mode, label in (
+            ("off", "mati"),
+            ("cold", "folder kosong"),
+            ("warm", "setelah precompile"),
+        ):
+            runs = []
+            for _ in range(5):
+                workdir = make_workdir(os.path.join(ROOT, "data", "menu.json"))
+                try:
+                    if mode == "warm":
+                        run_child(workdir, "templates", "precompile", expect_result=False)
+                    runs.append(run_child(workdir, "templates", mode))
+                finally:
+                    shutil.rmtree(workdir, ignore_errors=True)
+
+            runs.sort(key=lambda r: r["first_login_ms"] + r["first_index_ms"])
+            r = runs[2]
+            compiled = "-" if r["compiled"] is None else str(r["compiled"])
+            print(f"{label:<24} {r['first_login_ms']:9.1f} {r['first_index_ms']:9.1f} {compiled:>11}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        if sys.argv[2] == "startup":
+            child_startup()
+        elif sys.argv[2] == "templates":
+            child_templates(sys.argv[3])
+        else:
+            child_loader(sys.argv[3])
+    else:
+        main_bench(int(sys.argv[1]) if len(sys.argv) > 1 else 300000)
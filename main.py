@@ -1,6 +1,31 @@
+import csv
 import json
 import io
+import mmap
+import array
+import atexit
+import logging
+import logging.handlers
+import gzip
+import asyncio
+import os
+import re
+import sys
+import sqlite3
+import hashlib
+import secrets
+import time
 import datetime
+import threading
+import queue
+import bisect
+import codecs
+import heapq
+import itertools
+import unicodedata
+import zipfile
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
 from flask import (
     Flask,
@@ -11,11 +36,34 @@ from flask import (
     session,
     jsonify,
     url_for,
+    has_request_context,
+    g,
 )
+from flask.json.provider import DefaultJSONProvider
+from flask.logging import default_handler as flask_default_log_handler
 from flask_login import login_required
+from jinja2 import FileSystemBytecodeCache
 from reportlab.pdfgen import canvas
-from reportlab.lib.utils import ImageReader
+from reportlab.lib.utils import ImageReader, simpleSplit
+from PIL import Image
 from functools import wraps
+import click
+from markupsafe import Markup
+
+try:
+    import orjson
+except ImportError:  # optional: tanpa orjson dipakai json (stdlib)
+    orjson = None
+
+try:
+    import numpy
+except ImportError:  # optional: tanpa numpy, scan arsip memakai array (stdlib)
+    numpy = None
+
+try:
+    import brotli
+except ImportError:  # optional: tanpa brotli hanya gzip
+    brotli = None
 from werkzeug.security import generate_password_hash, check_password_hash
 
 
@@ -38,9 +86,20 @@ app.config["SESSION_COOKIE_HTTPONLY"] = True
 app.config["SESSION_COOKIE_SAMESITE"] = "Lax"
 app.config["PERMANENT_SESSION_LIFETIME"] = 3600
 
+# Database SQLite lokal (counter nomor struk, dll)
+app.config["DATABASE"] = "data/kasir.db"
+
+# Kode outlet, dipakai sebagai prefix nomor struk
+# WAJIB berbeda untuk setiap outlet agar nomor struk tidak bentrok
+app.config["OUTLET_ID"] = "K3"
+app.config["RECEIPT_ID_BLOCK_SIZE"] = 100
+
 
 USERS = {"zhaenx_id@yeswehack.com": generate_password_hash("zh43nx")}
 
+# User yang boleh mengakses endpoint /admin/...
+ADMINS = {"zhaenx_id@yeswehack.com"}
+
 
 def login_required(f):
     @wraps(f)
@@ -56,6 +115,7 @@ def login_required(f):
             current_time = datetime.datetime.now().timestamp()
 
             if current_time - login_time > 3600:  # 3600 detik = 1 jam
+                release_session_stock()
                 session.clear()
                 return redirect(url_for("login", timeout="true"))
 
@@ -64,12 +124,311 @@ def login_required(f):
     return decorated_function
 
 
+def admin_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+
+        if session.get("email") not in ADMINS:
+            return jsonify({"error": "Forbidden"}), 403
+
+        return f(*args, **kwargs)
+
+    return decorated_function
+
+
+# ========================================================================
+# HELPER CLASS - LOGGING (QUEUE + THREAD BACKGROUND)
+# ========================================================================
+
+# Level minimum app.logger (DEBUG / INFO / WARNING / ERROR)
+app.config["LOG_LEVEL"] = "INFO"
+
+# Kapasitas antrian record log. Jika penuh, record baru DIBUANG
+# (dihitung), request tidak pernah menunggu I/O log.
+app.config["LOG_QUEUE_SIZE"] = 10000
+
+# Saat antrian sudah terisi >= setengah, record di bawah WARNING
+# (debug, info, timing request) hanya disimpan 1 dari N
+app.config["LOG_SAMPLE_UNDER_PRESSURE"] = 10
+
+
+class JSONLogFormatter(logging.Formatter):
+    """
+    Format record log sebagai satu baris JSON
+
+    Contoh:
+        {"level":"ERROR","logger":"main","msg":"Error in checkout: ...",
+         "request_id":"3f9c1a2b7d4e5f60","route":"/checkout","ts":"..."}
+    """
+
+    # Field tambahan (extra=...) yang ikut ditulis jika ada
+    EXTRA_FIELDS = (
+        "request_id",
+        "route",
+        "method",
+        "status",
+        "duration_ms",
+        "first_request",
+        "templates_compiled",
+        "dropped",
+    )
+
+    def format(self, record):
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S")
+            + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for field in self.EXTRA_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return encode_json(entry).decode("utf-8")
+
+
+class RequestContextFilter(logging.Filter):
+    """Tambahkan request_id dan route ke record yang dibuat di dalam request"""
+
+    def filter(self, record):
+        if has_request_context():
+            if getattr(record, "request_id", None) is None:
+                record.request_id = g.get("request_id")
+            if getattr(record, "route", None) is None:
+                rule = request.url_rule
+                record.route = rule.rule if rule is not None else request.path
+        return True
+
+
+_traceback_formatter = logging.Formatter()
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler yang tidak pernah blocking
+
+    Record dimasukkan ke queue dengan put_nowait lalu ditulis oleh
+    QueueListener di thread background. Di bawah tekanan (queue terisi
+    >= 1/2) record di bawah WARNING di-sample 1 dari sample_rate, dan
+    di atas 3/4 dibuang semua: sisa kapasitas untuk WARNING / ERROR.
+    Record yang dibuang dihitung, lalu dilaporkan sebagai satu WARNING
+    setelah tekanan turun.
+    """
+
+    def __init__(self, log_queue, sample_rate):
+        super().__init__(log_queue)
+        self.sample_rate = sample_rate
+        self.dropped = 0
+        self._sampled = itertools.count()
+
+    def _keep(self, record, used):
+        if record.levelno >= logging.WARNING:
+            return True
+        if used * 2 < self.queue.maxsize:
+            return True
+        if used * 4 >= self.queue.maxsize * 3:
+            return False
+        return next(self._sampled) % self.sample_rate == 0
+
+    def emit(self, record):
+        used = self.queue.qsize()
+        # Diputuskan SEBELUM prepare(): record yang dibuang tidak
+        # sempat di-format sama sekali
+        if not self._keep(record, used):
+            self.dropped += 1
+            return
+
+        if self.dropped and used * 2 < self.queue.maxsize:
+            dropped, self.dropped = self.dropped, 0
+            self.enqueue(
+                logging.makeLogRecord(
+                    {
+                        "name": record.name,
+                        "levelno": logging.WARNING,
+                        "levelname": "WARNING",
+                        "msg": "Log queue penuh: record dibuang",
+                        "dropped": dropped,
+                    }
+                )
+            )
+
+        try:
+            self.enqueue(self.prepare(record))
+        except Exception:
+            self.handleError(record)
+
+    def prepare(self, record):
+        # Format pesan + traceback di thread pemanggil: args bisa berubah
+        # setelah record dibuat, traceback menahan frame request
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _traceback_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def start_log_listener():
+    """
+    (Re)start antrian + thread penulis log
+
+    Dipanggil saat import dan di proses anak setelah fork (gunicorn
+    --preload): thread listener tidak ikut ter-copy oleh fork.
+    """
+    global _log_listener
+
+    log_handler.queue = queue.Queue(app.config["LOG_QUEUE_SIZE"])
+    log_handler.dropped = 0
+
+    output = logging.StreamHandler(sys.stderr)
+    output.setFormatter(JSONLogFormatter())
+
+    _log_listener = logging.handlers.QueueListener(log_handler.queue, output)
+    _log_listener.start()
+
+
+def stop_log_listener():
+    """Tulis sisa record di queue sebelum proses berhenti"""
+    if _log_listener is not None and _log_listener._thread is not None:
+        _log_listener.stop()
+
+
+_log_listener = None
+log_handler = DroppingQueueHandler(
+    queue.Queue(app.config["LOG_QUEUE_SIZE"]), app.config["LOG_SAMPLE_UNDER_PRESSURE"]
+)
+log_handler.addFilter(RequestContextFilter())
+
+app.logger.removeHandler(flask_default_log_handler)
+app.logger.addHandler(log_handler)
+app.logger.setLevel(app.config["LOG_LEVEL"])
+app.logger.propagate = False
+
+start_log_listener()
+atexit.register(stop_log_listener)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=start_log_listener)
+
+
+# ID request dari proxy/client dipakai jika formatnya wajar
+_request_id_pattern = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+
+@app.before_request
+def start_request_log():
+    """Beri request ID + catat waktu mulai (untuk timing per route)"""
+    request_id = request.headers.get("X-Request-ID", "")
+    if not _request_id_pattern.match(request_id):
+        request_id = secrets.token_hex(8)
+
+    g.request_id = request_id
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+def log_request_timing(response):
+    """
+    Log timing setiap request (INFO) dan kirim X-Request-ID ke client
+
+    Untuk stream SSE, durasi = waktu sampai header dikirim.
+    """
+    started = g.get("request_started")
+    if started is None:
+        return response
+
+    response.headers["X-Request-ID"] = g.request_id
+    if app.logger.isEnabledFor(logging.INFO):
+        extra = {
+            "method": request.method,
+            "status": response.status_code,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+
+        # Request pertama per endpoint di proses ini (worker baru / setelah
+        # deploy) ikut membayar compile template: ditandai agar latency-nya
+        # bisa dibandingkan dengan / tanpa bytecode cache
+        if request.endpoint not in _first_request_seen:
+            _first_request_seen.add(request.endpoint)
+            extra["first_request"] = True
+            if template_bytecode_cache is not None:
+                extra["templates_compiled"] = template_bytecode_cache.compiled
+
+        app.logger.info("request", extra=extra)
+    return response
+
+
+# ========================================================================
+# HELPER CLASS - BYTECODE CACHE TEMPLATE JINJA
+# ========================================================================
+
+# Folder cache bytecode template, dipakai bersama oleh semua worker.
+# Isi folder bisa dibuat saat deploy: flask --app main precompile-templates
+# None = tanpa cache (setiap worker compile template dari source)
+app.config["TEMPLATE_CACHE_DIR"] = "data/template_cache"
+
+
+class TemplateBytecodeCache(FileSystemBytecodeCache):
+    """
+    FileSystemBytecodeCache + jumlah template yang di-compile dari source
+
+    Bytecode disimpan per (nama template, checksum source): template yang
+    berubah saat deploy otomatis di-compile ulang, file lama diabaikan.
+    Penulisan file atomic (temp file + rename), aman untuk banyak worker.
+    """
+
+    def __init__(self, directory):
+        super().__init__(directory)
+        self.compiled = 0
+
+    def load_bytecode(self, bucket):
+        super().load_bytecode(bucket)
+        if bucket.code is None:
+            self.compiled += 1
+
+
+# Endpoint yang sudah pernah dilayani proses ini (lihat log_request_timing)
+_first_request_seen = set()
+
+template_bytecode_cache = None
+if app.config["TEMPLATE_CACHE_DIR"]:
+    os.makedirs(app.config["TEMPLATE_CACHE_DIR"], exist_ok=True)
+    template_bytecode_cache = TemplateBytecodeCache(app.config["TEMPLATE_CACHE_DIR"])
+    app.jinja_env.bytecode_cache = template_bytecode_cache
+
+
+@app.cli.command("precompile-templates")
+def precompile_templates_command():
+    """Compile semua template ke bytecode cache (jalankan saat deploy)."""
+    if template_bytecode_cache is None:
+        raise click.ClickException("TEMPLATE_CACHE_DIR tidak di-set")
+
+    started = time.perf_counter()
+    names = app.jinja_env.list_templates()
+    for name in names:
+        app.jinja_env.get_template(name)
+
+    click.echo(
+        f"{len(names)} template, {template_bytecode_cache.compiled} di-compile "
+        f"dalam {(time.perf_counter() - started) * 1000:.1f} ms"
+    )
+
+
 # ========================================================================
 # AUTHENTICATION ROUTES
 # ========================================================================
 @app.before_request
 def blocker():
-    safe_paths = ["/login"]
+    safe_paths = ["/login", "/sw.js"]
 
     if request.path.startswith("/static"):
         return
@@ -81,6 +440,12 @@ def blocker():
 
 @app.after_request
 def add_no_cache_headers(response):
+    # Response dengan ETag boleh disimpan browser, tapi WAJIB divalidasi
+    # ulang setiap kali dipakai (hasilnya 304 jika belum berubah)
+    if response.headers.get("ETag"):
+        response.headers["Cache-Control"] = "private, no-cache, must-revalidate"
+        return response
+
     response.headers["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
     response.headers["Pragma"] = "no-cache"
     response.headers["Expires"] = "0"
@@ -116,6 +481,7 @@ def login():
 
             session["jumlahcart"] = []
             session["cart_count"] = 0
+            session["outlet"] = app.config["OUTLET_ID"]
 
             next_page = request.args.get("next")
             return redirect(next_page if next_page else url_for("index"))
@@ -142,6 +508,9 @@ def logout():
     2. Mark session for deletion
     3. Redirect ke login page
     """
+    # Stok yang masih di-reserve cart dikembalikan dulu
+    release_session_stock()
+
     # Clear semua data di session
     # Ini akan hapus: logged_in, username, cart, pembeli, dll
     session.clear()
@@ -173,13 +542,45 @@ def index():
 
     if not session.get("logged_in"):
         return redirect("/login")
-    # Ambil data cart dari session.
-    # Kalau belum ada, default-nya list kosong.
-    cart = session.get("jumlahcart", [])
+
+    # Halaman index sama untuk semua kasir selama menu & template tidak
+    # berubah. Data cart per-user TIDAK ikut di-render di sini, tapi
+    # diambil JavaScript lewat /cart/get setelah halaman dimuat.
+    catalog = current_catalog()
+    etag = f"{catalog.version}-{template_version()}"
+
+    # Browser masih punya versi yang sama → 304 tanpa render apapun
+    # (weak: ETag response yang dikompres dikirim sebagai W/"...")
+    if request.if_none_match.contains_weak(etag):
+        response = app.response_class(status=304)
+        response.set_etag(etag)
+        return response
 
     # Render halaman index.html
-    # Kirim data menu dan cart ke template
-    return render_template("index.html", menu=menu, cart=cart)
+    # Grid menu diambil dari fragment cache (render sekali per versi menu)
+    response = app.make_response(
+        render_template(
+            "index.html",
+            menu_grid=render_menu_grid(),
+            catalog_version=catalog.version,
+            # Tarif dalam basis point (1000 = 10%): dipakai JavaScript untuk
+            # hitung total saat offline dengan aturan integer hitung_total
+            diskon_bp=int(DISKON * 10000),
+            pajak_bp=int(PAJAK * 10000),
+        )
+    )
+    response.set_etag(etag)
+    return response
+
+
+@app.route("/sw.js", methods=["GET"])
+def service_worker():
+    """
+    Service worker (static/js/sw.js) untuk mode offline
+
+    Dilayani dari root agar scope-nya seluruh aplikasi, bukan /static/.
+    """
+    return app.send_static_file("js/sw.js")
 
 
 # ========================================================================
@@ -196,539 +597,3716 @@ DISKON = Decimal("0.10")  # Diskon promosi 10% untuk semua transaksi
 
 
 # ========================================================================
-# LOAD DATA MENU DARI FILE JSON
+# DATABASE - SQLITE
 # ========================================================================
 
 
-def load_menu():
+def connect_db():
+    """
+    Membuka koneksi SQLite ke app.config["DATABASE"]
+
+    - isolation_level=None: transaksi diatur manual (BEGIN IMMEDIATE)
+    - WAL mode: reader tidak di-block oleh writer dari worker lain
+    - timeout 30 detik: tunggu lock dari proses lain, bukan langsung error
     """
-    Memuat data menu dari file JSON dengan error handling yang robust
+    db_path = app.config["DATABASE"]
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
 
-    Fungsi ini dipanggil sekali saat aplikasi start untuk load semua data menu
-    dari file eksternal (data/menu.json) ke dalam memory
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
 
-    Returns:
-        dict: Dictionary berisi data menu yang sudah di-parse dari JSON
-              Format: {"kategori": [{"id": 1, "nama": "...", "price": ...}, ...]}
-        dict: Dictionary kosong {} jika terjadi error (file tidak ada atau invalid)
 
-    Error Handling:
-        - FileNotFoundError: File menu.json tidak ditemukan
-        - JSONDecodeError: Syntax error di file JSON (koma kurang, quote salah, dll)
+# ========================================================================
+# HELPER CLASS - NOMOR STRUK / TRANSACTION ID
+# ========================================================================
+
+
+class ReceiptNumberAllocator:
     """
-    try:
-        # Buka file menu.json dengan mode read
-        # encoding="utf-8" untuk support karakter Indonesia (é, ñ, dll)
-        # Context manager (with) otomatis close file setelah selesai
-        with open("data/menu.json", "r", encoding="utf-8") as file:
-            # Parse JSON string menjadi Python dictionary
-            # json.load() membaca file dan convert ke dict/list Python
-            return json.load(file)
+    Generator nomor struk (transaction id) yang unik & monotonic
 
-    except FileNotFoundError:
-        # Exception ini muncul jika file tidak ditemukan
-        # Bisa karena path salah atau file memang tidak ada
+    Nomor diambil per BLOK dari counter persistent di SQLite:
+    setiap proses "menyewa" range nomor (misal 100 nomor sekaligus)
+    dengan satu transaksi BEGIN IMMEDIATE, lalu membagikannya dari
+    memory. Checkout tidak perlu round trip ke database per nomor.
 
-        # Log error ke console/file untuk debugging
-        # Penting untuk troubleshooting di production environment
-        app.logger.error("menu.json not found")
+    Keunikan:
+        - Antar thread: dijaga threading.Lock
+        - Antar proses/worker: setiap blok hanya dimiliki satu proses
+          (update counter di-serialize oleh lock SQLite)
+        - Antar outlet: nomor diberi prefix outlet_id
+        - Setelah fork: blok milik proses parent dibuang
 
-        # Return empty dict agar aplikasi tidak crash
-        # Aplikasi tetap bisa jalan, hanya menu-nya kosong
-        return {}
+    Nomor yang belum terpakai saat proses mati akan hilang (gap).
+    Ini normal: yang dijamin adalah unik & naik, bukan berurutan rapat.
 
-    except json.JSONDecodeError:
-        # Exception ini muncul jika file JSON tidak valid
-        # Contoh: ada koma yang kurang, bracket tidak closing, dll
+    Format: "<outlet_id>-<nomor 8 digit>", contoh "K3-00000042"
+    """
 
-        # Log error untuk debugging
-        app.logger.error("Invalid JSON in menu.json")
+    def __init__(self, outlet_id, block_size=100):
+        self.outlet_id = outlet_id
+        self.block_size = block_size
 
-        # Return empty dict agar aplikasi tidak crash
-        return {}
+        self._next = 1
+        self._end = 0  # _next > _end berarti blok habis
+        self._pid = None
+        self._lock = threading.Lock()
 
+    def _fetch_block(self):
+        conn = connect_db()
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS counters ("
+                "name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+            )
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT OR IGNORE INTO counters (name, value) VALUES (?, 0)",
+                (self.outlet_id,),
+            )
+            (start,) = conn.execute(
+                "SELECT value FROM counters WHERE name = ?", (self.outlet_id,)
+            ).fetchone()
+            conn.execute(
+                "UPDATE counters SET value = ? WHERE name = ?",
+                (start + self.block_size, self.outlet_id),
+            )
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
 
-# Execute fungsi load_menu() saat aplikasi start
-# Variable global 'menu' ini akan digunakan di seluruh aplikasi
-# Load sekali saja untuk efisiensi (tidak load ulang setiap request)
-menu = load_menu()
+        self._next = start + 1
+        self._end = start + self.block_size
+        self._pid = os.getpid()
 
+    def next_id(self):
+        """
+        Returns:
+            str: Nomor struk berikutnya, contoh "K3-00000042"
+        """
+        with self._lock:
+            if self._next > self._end or self._pid != os.getpid():
+                self._fetch_block()
 
-# ========================================================================
-# HELPER FUNCTIONS - PERHITUNGAN FINANSIAL
-# ========================================================================
+            number = self._next
+            self._next += 1
 
+        return f"{self.outlet_id}-{number:08d}"
 
-def hitung_total(subtotal):
-    """
-    Menghitung diskon, PPN, dan total akhir berdasarkan subtotal
 
-    Alur perhitungan sesuai aturan perpajakan Indonesia:
-    1. Hitung diskon dari subtotal
-    2. Kurangi subtotal dengan diskon = DPP (Dasar Pengenaan Pajak)
-    3. Hitung PPN dari DPP (BUKAN dari subtotal!)
-    4. Total = DPP + PPN
+# OUTLET_ID -> ReceiptNumberAllocator (satu counter per outlet)
+_receipt_numbers = {}
+_receipt_numbers_lock = threading.Lock()
 
-    Args:
-        subtotal (int/float): Total harga semua item sebelum diskon dan pajak
 
-    Returns:
-        tuple: (diskon, ppn, total) - semua dalam format integer (Rupiah)
+def receipt_numbers_for(outlet_id):
+    """Allocator nomor struk untuk outlet (dibuat saat pertama dipakai)"""
+    with _receipt_numbers_lock:
+        allocator = _receipt_numbers.get(outlet_id)
+        if allocator is None:
+            allocator = ReceiptNumberAllocator(
+                outlet_id, block_size=app.config["RECEIPT_ID_BLOCK_SIZE"]
+            )
+            _receipt_numbers[outlet_id] = allocator
+        return allocator
 
-    Contoh:
-        subtotal = 100000
-        diskon, ppn, total = hitung_total(100000)
-        # diskon = 10000 (10% dari 100000)
-        # dpp = 90000 (100000 - 10000)
-        # ppn = 9000 (10% dari 90000)
-        # total = 99000 (90000 + 9000)
+
+# ========================================================================
+# HELPER CLASS - IDEMPOTENCY KEY
+# ========================================================================
+
+
+class IdempotencyStore:
+    """
+    Penyimpanan hasil request berdasarkan Idempotency-Key
+
+    Client mengirim key unik per aksi (misal 1x klik "Proses"). Jika
+    request yang sama terkirim ulang (Wi-Fi putus, browser retry),
+    server mengembalikan response yang sudah tersimpan TANPA memproses
+    ulang validasi, perhitungan, maupun render.
+
+    Key & hasil disimpan di SQLite (tabel idempotency_keys), jadi
+    berlaku untuk semua worker: retry yang masuk ke worker lain tetap
+    mendapat response yang sama.
+
+    - Bounded: maksimal max_entries key, yang paling lama dibuang dulu
+    - TTL: key kadaluarsa setelah ttl detik
+    - In-flight: duplikat yang datang saat request pertama masih
+      diproses akan MENUNGGU hasil request pertama (tidak diproses dobel).
+      Key yang belum selesai dilepas setelah wait_timeout detik, supaya
+      worker yang mati di tengah request tidak mengunci key sampai TTL.
     """
 
-    # Konversi subtotal ke Decimal untuk perhitungan akurat
-    # str() diperlukan untuk menghindari floating point error
-    # Decimal("100.50") lebih akurat dari Decimal(100.50)
-    subtotal = Decimal(str(subtotal))
+    POLL_INTERVAL = 0.05  # detik, saat menunggu request pertama selesai
+
+    def __init__(self, max_entries=1024, ttl=600, wait_timeout=30):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.wait_timeout = wait_timeout
+        self._ready = set()
+
+    def _connect(self):
+        conn = connect_db()
+        db_path = app.config["DATABASE"]
+
+        if db_path not in self._ready:
+            # status NULL = request pertama masih diproses
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS idempotency_keys ("
+                "key TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, "
+                "created REAL NOT NULL, expires REAL NOT NULL, "
+                "status INTEGER, headers TEXT, body BLOB, session TEXT)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idempotency_keys_created "
+                "ON idempotency_keys (created)"
+            )
+            self._ready.add(db_path)
+
+        return conn
+
+    def _evict(self, conn, now):
+        # Dipanggil di dalam transaksi: buang yang kadaluarsa, lalu yang
+        # paling lama dibuat jika jumlah key masih melebihi max_entries
+        conn.execute("DELETE FROM idempotency_keys WHERE expires < ?", (now,))
+        (count,) = conn.execute("SELECT COUNT(*) FROM idempotency_keys").fetchone()
+        if count >= self.max_entries:
+            conn.execute(
+                "DELETE FROM idempotency_keys WHERE key IN ("
+                "SELECT key FROM idempotency_keys ORDER BY created LIMIT ?)",
+                (count - self.max_entries + 1,),
+            )
 
-    # STEP 1: Hitung diskon 10% dari subtotal
-    # Contoh: Rp 100.000 × 10% = Rp 10.000
-    # int() untuk convert ke integer karena Rupiah tidak ada sen
-    diskon = int(subtotal * DISKON)
+    def _claim(self, key, fingerprint):
+        """
+        Returns:
+            tuple: (owner, fingerprint) - owner True jika key baru dibuat
+                   oleh request ini
+        """
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            self._evict(conn, now)
+            row = conn.execute(
+                "INSERT INTO idempotency_keys (key, fingerprint, created, expires) "
+                "VALUES (?, ?, ?, ?) ON CONFLICT (key) DO NOTHING RETURNING key",
+                (key, fingerprint, now, now + self.wait_timeout),
+            ).fetchone()
+            if row is None:
+                (fingerprint,) = conn.execute(
+                    "SELECT fingerprint FROM idempotency_keys WHERE key = ?", (key,)
+                ).fetchone()
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+        return row is not None, fingerprint
+
+    def _load(self, key):
+        conn = self._connect()
+        try:
+            return conn.execute(
+                "SELECT status, headers, body, session FROM idempotency_keys "
+                "WHERE key = ? AND expires >= ?",
+                (key, time.time()),
+            ).fetchone()
+        finally:
+            conn.close()
+
+    def _wait(self, key):
+        deadline = time.monotonic() + self.wait_timeout
+
+        while True:
+            row = self._load(key)
+            if row is None:
+                return None  # Request pertama gagal / key dilepas
+            if row[0] is not None:
+                status, headers, body, session_values = row
+                return {
+                    "status": status,
+                    "headers": [tuple(header) for header in json.loads(headers)],
+                    "body": body,
+                    "session": json.loads(session_values),
+                }
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(self.POLL_INTERVAL)
+
+    def _store(self, key, result):
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE idempotency_keys SET expires = ?, status = ?, headers = ?, "
+                "body = ?, session = ? WHERE key = ?",
+                (
+                    time.time() + self.ttl,
+                    result["status"],
+                    encode_json(result["headers"]),
+                    result["body"],
+                    encode_json(result["session"]),
+                    key,
+                ),
+            )
+        finally:
+            conn.close()
 
-    # STEP 2: Hitung DPP (Dasar Pengenaan Pajak)
-    # DPP = Subtotal dikurangi diskon
-    # Ini adalah harga yang akan dikenakan pajak
-    # Contoh: Rp 100.000 - Rp 10.000 = Rp 90.000
-    dpp = subtotal - diskon
+    def _discard(self, key):
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM idempotency_keys WHERE key = ?", (key,))
+        finally:
+            conn.close()
+
+    def run(self, key, fingerprint, func, keep=lambda result: True):
+        """
+        Menjalankan func() sekali untuk setiap key
+
+        Args:
+            key (str): Idempotency key (sudah di-scope per user & route)
+            fingerprint (str): Hash isi request, untuk deteksi key dipakai
+                               ulang dengan data yang berbeda
+            func (callable): Fungsi yang menghasilkan result
+                             dict(status, headers, body, session)
+            keep (callable): Return False jika result tidak boleh disimpan
+                             (key dilepas, retry berikutnya diproses ulang)
+
+        Returns:
+            tuple: (result, replayed)
+                   result = None jika timeout menunggu / request pertama gagal
+
+        Raises:
+            ValueError: Key sama dipakai untuk isi request yang berbeda
+        """
+        owner, stored_fingerprint = self._claim(key, fingerprint)
+
+        if not owner:
+            if stored_fingerprint != fingerprint:
+                raise ValueError("Idempotency-Key dipakai untuk request berbeda")
+            return self._wait(key), True
 
-    # STEP 3: Hitung PPN 10% dari DPP (PENTING: dari DPP, bukan subtotal!)
-    # Sesuai aturan perpajakan, pajak dihitung SETELAH diskon
-    # Contoh: Rp 90.000 × 10% = Rp 9.000
-    ppn = int(dpp * PAJAK)
+        try:
+            result = func()
+        except Exception:
+            self._discard(key)
+            raise
 
-    # STEP 4: Hitung total yang harus dibayar
-    # Total = DPP + PPN (harga setelah diskon + pajak)
-    # Contoh: Rp 90.000 + Rp 9.000 = Rp 99.000
-    total = dpp + ppn
+        if keep(result):
+            self._store(key, result)
+        else:
+            self._discard(key)
 
-    # Return tuple berisi 3 nilai: diskon, ppn, dan total
-    # Semua di-convert ke int karena Rupiah tidak menggunakan desimal
-    return int(diskon), int(ppn), int(total)
+        return result, False
 
 
-def calculate_totals(cart):
-    """
-    Menghitung semua total yang ada di keranjang belanja
+idempotency_store = IdempotencyStore()
 
-    Fungsi wrapper yang menggabungkan:
-    1. Perhitungan subtotal dari semua item di cart
-    2. Perhitungan diskon, PPN, dan total menggunakan hitung_total()
 
-    Args:
-        cart (list): List of dictionaries, setiap item memiliki keys:
-                    - id: ID unik item
-                    - nama: Nama menu
-                    - price: Harga per item
-                    - qty: Jumlah quantity yang dipesan
-                    - subtotal: price × qty
+def idempotent(*session_keys):
+    """
+    Decorator untuk endpoint yang aman di-retry dengan Idempotency-Key
 
-    Returns:
-        tuple: (subtotal, diskon, ppn, total) - semua dalam integer
+    Key dibaca dari header "Idempotency-Key" (fetch/JSON) atau field
+    form "idempotency_key" (form POST). Tanpa key, endpoint berjalan
+    seperti biasa.
 
-    Contoh cart:
-        [
-            {"id": 1, "nama": "Nasi Goreng", "price": 25000, "qty": 2, "subtotal": 50000},
-            {"id": 2, "nama": "Es Teh", "price": 5000, "qty": 3, "subtotal": 15000}
-        ]
+    Response < 500 disimpan beserta nilai session_keys setelah request
+    selesai. Saat replay, nilai session tersebut dipulihkan juga, karena
+    response pertama (beserta cookie session-nya) mungkin tidak pernah
+    sampai ke client.
 
-        Hasil:
-        subtotal = 65000  (50000 + 15000)
-        diskon = 6500     (10% dari 65000)
-        ppn = 5850        (10% dari 58500)
-        total = 64350     (58500 + 5850)
+    Contoh:
+        @app.route("/checkout", methods=["POST"])
+        @login_required
+        @idempotent("pembeli")
+        def checkout(): ...
     """
 
-    # Hitung subtotal dengan cara:
-    # 1. Loop setiap item di cart
-    # 2. Kalikan price × qty untuk setiap item
-    # 3. Jumlahkan semua hasil perkalian menggunakan sum()
-    #
-    # Generator expression (... for item in cart) lebih efisien dari loop biasa
-    # karena tidak membuat list intermediate di memory
-    #
-    # Contoh:
-    # Item 1: 25000 × 2 = 50000
-    # Item 2: 5000 × 3 = 15000
-    # Subtotal = 50000 + 15000 = 65000
-    subtotal = sum(int(item["price"]) * int(item["qty"]) for item in cart)
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            # Body mentah dibaca (dan di-cache) SEBELUM request.form:
+            # setelah form di-parse, get_data() mengembalikan b"" sehingga
+            # semua form POST akan punya fingerprint yang sama
+            body = request.get_data(cache=True)
 
-    # Panggil fungsi hitung_total untuk mendapatkan diskon, ppn, dan total
-    # Fungsi ini menerapkan semua logic perpajakan yang kompleks
-    diskon, ppn, total = hitung_total(subtotal)
+            key = request.headers.get("Idempotency-Key") or request.form.get(
+                "idempotency_key"
+            )
+            if not key:
+                return f(*args, **kwargs)
+
+            # Scope key per user & route agar tidak bisa bentrok antar kasir
+            scoped_key = f"{session.get('email')}:{request.path}:{key}"
+            fingerprint = hashlib.sha1(body).hexdigest()
+
+            def execute():
+                response = app.make_response(f(*args, **kwargs))
+                return {
+                    "status": response.status_code,
+                    "headers": list(response.headers.items()),
+                    "body": response.get_data(),
+                    "session": {k: session.get(k) for k in session_keys},
+                }
+
+            try:
+                result, replayed = idempotency_store.run(
+                    scoped_key,
+                    fingerprint,
+                    execute,
+                    keep=lambda result: result["status"] < 500,
+                )
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 422
+
+            if result is None:
+                return jsonify({"error": "Request sedang diproses"}), 409
+
+            if replayed:
+                for k, value in result["session"].items():
+                    if value is None:
+                        session.pop(k, None)
+                    else:
+                        session[k] = value
+                session.modified = True
+
+            response = app.response_class(
+                result["body"], status=result["status"], headers=result["headers"]
+            )
+            if replayed:
+                response.headers["Idempotent-Replayed"] = "true"
+            return response
 
-    # Return semua nilai dalam satu tuple
-    # Tuple ini akan di-unpack di tempat lain untuk update display
-    return subtotal, diskon, ppn, total
+        return decorated_function
+
+    return decorator
 
 
 # ========================================================================
-# HELPER FUNCTIONS - PENCARIAN DATA
+# HELPER CLASS - JSON ENCODER (ORJSON / STDLIB + FRAGMENT)
 # ========================================================================
 
 
-def find_item_in_cart(cart, item_id):
+class JSONFragment(bytes):
+    """
+    JSON yang sudah di-encode (bytes), disisipkan apa adanya oleh
+    encode_json. Contoh: bagian statis line cart yang di-cache per item.
     """
-    Mencari item di keranjang belanja berdasarkan ID
 
-    Fungsi ini digunakan untuk operasi:
-    - PLUS: Cari item dulu sebelum tambah qty
-    - MINUS: Cari item dulu sebelum kurangi qty
-    - REMOVE: Cari item dulu sebelum hapus dari cart
 
-    Args:
-        cart (list): List of items dalam cart (dari session)
-        item_id (str/int): ID item yang ingin dicari
+# Placeholder fragment selama encode: "\u0000<token><index>". Data user
+# tidak bisa menghasilkan string yang sama tanpa mengetahui token acak ini.
+_FRAGMENT_TOKEN = secrets.token_hex(8)
+_fragment_pattern = re.compile(rb'"\\u0000' + _FRAGMENT_TOKEN.encode() + rb'(\d+)"')
 
-    Returns:
-        dict: Reference ke item yang ditemukan (bukan copy!)
-              Item memiliki keys: id, nama, price, qty, subtotal, img
-        None: Jika item dengan ID tersebut tidak ada di cart
+if orjson is not None:
+    _ORJSON_OPTIONS = (
+        orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    )
 
-    Important Notes:
-        - Return adalah REFERENCE, bukan copy
-        - Perubahan pada return value akan affect cart langsung
-        - Tidak perlu save lagi ke session setelah modify
 
-    Contoh penggunaan:
-        item = find_item_in_cart(cart, "5")
-        if item:
-            item["qty"] += 1  # Langsung mengubah qty di cart
-            item["subtotal"] = item["qty"] * item["price"]
-        else:
-            print("Item tidak ditemukan")
+def encode_json(obj):
     """
+    Encode object menjadi bytes JSON compact (UTF-8, key urut abjad)
 
-    # Loop setiap item yang ada di keranjang
-    for item in cart:
-        # Bandingkan ID sebagai string untuk menghindari type mismatch
-        # ID bisa datang sebagai:
-        # - int dari JSON parsing ({"id": 5})
-        # - string dari form POST (request.form["id"] = "5")
-        #
-        # Dengan convert keduanya ke string, kita pastikan perbandingan akurat
-        # str(5) == str("5") → "5" == "5" → True
-        if str(item["id"]) == str(item_id):
-            # Item ditemukan!
-            # Return reference ke item (bukan copy)
-            # Ini adalah Python feature: objects di-pass by reference
-            return item
+    Memakai orjson jika terinstall, jika tidak json (stdlib). Kedua
+    backend menghasilkan bytes yang sama. Nilai non-JSON (Decimal,
+    tanggal, Markup, ...) diubah sama seperti jsonify Flask;
+    JSONFragment disisipkan tanpa di-encode ulang.
 
-    # Loop selesai tapi tidak ada yang match
-    # Return None untuk indicate "not found"
-    # Caller bisa cek dengan: if item: atau if item is None:
-    return None
+    Args:
+        obj: dict / list / nilai JSON
 
+    Returns:
+        bytes: JSON tanpa newline di akhir
+    """
+    fragments = []
+
+    def default(value):
+        if isinstance(value, JSONFragment):
+            fragments.append(value)
+            return f"\x00{_FRAGMENT_TOKEN}{len(fragments) - 1}"
+        return app.json.default(value)
+
+    if orjson is not None:
+        data = orjson.dumps(obj, default=default, option=_ORJSON_OPTIONS)
+    else:
+        data = json.dumps(
+            obj,
+            default=default,
+            ensure_ascii=False,
+            sort_keys=True,
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+    if fragments:
+        data = _fragment_pattern.sub(lambda m: fragments[int(m[1])], data)
+    return data
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider Flask (jsonify, request.get_json) lewat encode_json
 
-def find_menu_item(item_id):
+    Output jsonify tetap sama strukturnya (key urut abjad, compact,
+    newline di akhir); bedanya karakter non-ASCII dikirim sebagai UTF-8,
+    bukan escape \\uXXXX. Mode debug (indent) tetap memakai stdlib.
     """
-    Mencari item di database menu berdasarkan ID
 
-    Fungsi ini dipanggil saat user klik "Add to Cart"
-    Kita hanya punya ID dari button, perlu ambil data lengkap dari menu database
+    ensure_ascii = False
 
-    Args:
-        item_id (str/int): ID item yang ingin dicari
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return encode_json(obj).decode("utf-8")
 
-    Returns:
-        dict: Data item lengkap dari menu dengan keys:
-              - id: ID unik item
-              - nama: Nama menu
-              - price: Harga per item
-              - img: Path ke gambar menu
-              - kategori: Kategori menu (optional)
-        None: Jika item tidak ditemukan di database menu
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
 
-    Struktur menu database:
-        {
-            "makanan": [
-                {"id": 1, "nama": "Nasi Goreng", "price": 25000, "img": "nasi_goreng.jpg"},
-                {"id": 2, "nama": "Mie Goreng", "price": 20000, "img": "mie_goreng.jpg"}
-            ],
-            "minuman": [
-                {"id": 10, "nama": "Es Teh", "price": 5000, "img": "es_teh.jpg"},
-                {"id": 11, "nama": "Es Jeruk", "price": 7000, "img": "es_jeruk.jpg"}
-            ],
-            "snack": [...]
-        }
+    def response(self, *args, **kwargs):
+        if self._app.debug or self.compact is False:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(encode_json(obj) + b"\n", mimetype=self.mimetype)
 
-    Contoh penggunaan:
-        menu_data = find_menu_item("1")
-        if menu_data:
-            cart.append({
-                "id": menu_data["id"],
-                "nama": menu_data["nama"],
-                "price": menu_data["price"],
-                "img": menu_data["img"],
-                "qty": 1
-            })
-    """
-
-    # Loop setiap kategori di menu
-    # menu.items() return tuples: ("makanan", [...]), ("minuman", [...])
-    # kategori = "makanan", items = list of menu items
-    for kategori, items in menu.items():
-
-        # Loop setiap item dalam kategori tersebut
-        # m = menu item dictionary
-        for m in items:
-            # Bandingkan ID sebagai string (alasan sama seperti find_item_in_cart)
-            if str(m["id"]) == str(item_id):
-                # Item ditemukan!
-                # Return seluruh data item dari database menu
-                # Data ini akan digunakan untuk populate cart
-                return m
-
-    # Item tidak ditemukan di semua kategori
-    # Return None untuk indicate "not found"
-    # Ini bisa terjadi jika:
-    # - ID invalid/tidak ada di database
-    # - Menu database corrupt
-    # - Ada bug di frontend yang kirim ID salah
-    return None
+
+app.json_provider_class = FastJSONProvider
+app.json = FastJSONProvider(app)
 
 
 # ========================================================================
-# HELPER FUNCTION - UPDATE SESSION CART
+# HELPER FUNCTIONS - KOMPRESI RESPONSE (GZIP / BROTLI)
 # ========================================================================
 
+# Response lebih kecil dari ini (bytes) dikirim apa adanya
+app.config["COMPRESS_MIN_SIZE"] = 512
 
-def update_session_cart(cart):
-    """
-    Menyimpan cart ke session dan menghitung total quantity
+# Content-type yang dikompres + level per encoding. Level membatasi
+# biaya CPU: PDF struk (sudah terkompres sebagian oleh reportlab) cukup
+# level rendah, hasil level tinggi hampir sama tapi jauh lebih lambat.
+app.config["COMPRESS_LEVELS"] = {
+    "text/html": {"br": 5, "gzip": 6},
+    "application/json": {"br": 4, "gzip": 6},
+    "text/css": {"br": 5, "gzip": 6},
+    "text/javascript": {"br": 5, "gzip": 6},
+    "application/javascript": {"br": 5, "gzip": 6},
+    "application/pdf": {"br": 4, "gzip": 1},
+}
 
-    Fungsi ini dipanggil setiap kali ada perubahan pada cart untuk:
-    1. Persist data ke server-side session
-    2. Menghitung total items untuk badge counter
-    3. Mark session sebagai modified (penting untuk Flask session)
+# Hasil kompresi response ber-ETag (grid menu, index, katalog, struk,
+# file static) disimpan, maksimal sebesar ini (bytes, LRU)
+app.config["COMPRESS_CACHE_MAX_BYTES"] = 8 * 1024 * 1024
 
-    Args:
-        cart (list): List of dictionaries berisi items di cart
+# (path, etag, encoding) -> bytes terkompresi
+_compress_cache = OrderedDict()
+_compress_cache_bytes = 0
+_compress_lock = threading.Lock()
 
-    Important Notes:
-        - session.modified = True WAJIB dipanggil
-        - Tanpa ini, perubahan pada list/dict tidak akan tersimpan
-        - Ini adalah common pitfall dalam Flask session management
-    """
 
-    # Simpan cart ke session dengan key "jumlahcart"
-    # Data ini akan persist selama session aktif (hingga browser close)
-    session["jumlahcart"] = cart
+def compress_body(data, encoding, level):
+    """Kompres bytes dengan encoding "br" atau "gzip" (deterministik)"""
+    if encoding == "br":
+        return brotli.compress(data, quality=level)
+    return gzip.compress(data, compresslevel=level, mtime=0)
 
-    # Hitung total quantity dari semua item untuk badge counter
-    # sum() dengan generator expression lebih efisien daripada loop
-    # Contoh: jika cart punya 3 items dengan qty [2, 1, 3]
-    # maka cart_count = 2 + 1 + 3 = 6
-    session["cart_count"] = sum(i["qty"] for i in cart)
 
-    # CRITICAL: Mark session as modified
-    # Flask session menggunakan signed cookies yang hanya diupdate jika modified
-    # Tanpa ini, perubahan pada mutable objects (list/dict) tidak tersimpan
-    # Ini adalah best practice untuk semua session modifications
-    session.modified = True
+def cache_compressed(key, body):
+    """Simpan hasil kompresi ke _compress_cache (LRU dibatasi bytes)"""
+    global _compress_cache_bytes
 
+    max_bytes = app.config["COMPRESS_CACHE_MAX_BYTES"]
+    if len(body) > max_bytes:
+        return
 
-# ========================================================================
-# API ENDPOINT - CART UPDATE
-# ========================================================================
+    with _compress_lock:
+        old = _compress_cache.pop(key, None)
+        if old is not None:
+            _compress_cache_bytes -= len(old)
 
+        _compress_cache[key] = body
+        _compress_cache_bytes += len(body)
+        while _compress_cache_bytes > max_bytes:
+            _, evicted = _compress_cache.popitem(last=False)
+            _compress_cache_bytes -= len(evicted)
 
-@app.route("/cart/update", methods=["POST"])
-@login_required
-def cart_update():
+
+@app.after_request
+def compress_response(response):
     """
-    Endpoint untuk menangani semua operasi pada cart
+    Kompres response sesuai Accept-Encoding browser (br / gzip)
 
-    Supported Actions:
-        - "add": Tambah item baru atau increase qty jika sudah ada
-        - "plus": Increase quantity item yang sudah ada
-        - "minus": Decrease quantity, auto-remove jika qty = 0
-        - "remove": Hapus item dari cart (regardless of qty)
+    Tidak dikompres:
+        - content-type di luar COMPRESS_LEVELS, atau < COMPRESS_MIN_SIZE
+        - status selain 200 (304, redirect, error)
+        - response streaming (SSE): dikirim per event, tidak di-buffer
 
-    Request Body (JSON):
-        {
-            "action": "add|plus|minus|remove",
-            "id": "item_id"
-        }
+    Response ber-ETag isinya tetap selama ETag sama, jadi hasil kompresi
+    di-cache per (path, etag, encoding). ETag dijadikan weak (W/"..."):
+    bytes berbeda dari versi tanpa kompresi, tapi isinya sama sehingga
+    If-None-Match tetap cocok (perbandingan weak) dan hasilnya 304.
+    """
+    levels = app.config["COMPRESS_LEVELS"].get(response.mimetype)
+    if (
+        levels is None
+        or response.status_code != 200
+        or (response.is_streamed and not response.direct_passthrough)
+        or "Content-Encoding" in response.headers
+    ):
+        return response
 
-    Response (JSON):
-        Success (200):
-        {
-            "cart": [...],           # Updated cart data
-            "count": 5,              # Total quantity for badge
-            "subtotal": 100000,      # Total sebelum diskon
-            "diskon": 10000,         # Potongan harga
-            "ppn": 9000,             # Pajak
-            "total": 99000           # Total akhir
-        }
+    length = response.content_length
+    if length is None or length < app.config["COMPRESS_MIN_SIZE"]:
+        return response
 
-        Error (400/404/500):
-        {
-            "error": "Error message"
-        }
+    response.vary.add("Accept-Encoding")
 
-    HTTP Status Codes:
-        200: Success
-        400: Bad request (invalid input)
-        404: Item not found
-        500: Internal server error
-    """
+    offered = ("br", "gzip") if brotli is not None else ("gzip",)
+    encoding = request.accept_encodings.best_match(offered)
+    if encoding is None:
+        return response
 
-    try:
-        # ============================================================
-        # STEP 1: VALIDASI REQUEST & EXTRACT PARAMETERS
-        # ============================================================
+    etag, _ = response.get_etag()
+    key = (request.path, etag, encoding) if etag else None
+
+    with _compress_lock:
+        body = _compress_cache.get(key) if key else None
+        if body is not None:
+            _compress_cache.move_to_end(key)
+
+    if response.direct_passthrough:
+        # File static (send_file): body masih berupa file terbuka
+        source = response.response
+        data = b"".join(source) if body is None else None
+        if hasattr(source, "close"):
+            source.close()
+        response.direct_passthrough = False
+        response.set_data(data or b"")
+    else:
+        data = response.get_data()
+
+    if body is None:
+        body = compress_body(data, encoding, levels[encoding])
+        if len(body) >= len(data):
+            return response
+        if key:
+            cache_compressed(key, body)
+
+    response.set_data(body)
+    response.headers["Content-Encoding"] = encoding
+    if etag:
+        response.set_etag(etag, weak=True)
+    return response
 
-        # Parse JSON dari request body
-        # request.get_json() return None jika:
-        # - Request tidak mengandung JSON
-        # - Content-Type header bukan application/json
-        # - JSON syntax error (invalid format)
-        data = request.get_json()
 
-        # Validasi: pastikan request body mengandung JSON
-        # Return 400 Bad Request jika tidak ada data
-        if not data:
-            return jsonify({"error": "Invalid request"}), 400
+# ========================================================================
+# HELPER CLASS - EVENT BROKER (SERVER-SENT EVENTS)
+# ========================================================================
 
-        # Extract action dan item_id dari JSON payload
-        # .get() method return None jika key tidak ada (safe)
-        action = data.get("action")  # Expected: "add"|"plus"|"minus"|"remove"
-        item_id = data.get("id")  # Expected: string atau integer ID
+# Interval (detik) koneksi SSE bangun saat tidak ada event
+# (cek reload menu + deteksi client yang sudah disconnect)
+SSE_POLL_INTERVAL = 2
 
-        # Validasi: pastikan parameter wajib tersedia
-        # action harus ada dan tidak empty string
-        # item_id harus ada (boleh 0, tapi tidak boleh None)
-        if not action or item_id is None:
-            return jsonify({"error": "Missing parameters"}), 400
+# Kirim komentar keepalive jika tidak ada event selama ini (detik),
+# agar proxy tidak menutup koneksi yang idle
+SSE_KEEPALIVE_INTERVAL = 15
 
-        # ============================================================
-        # STEP 2: LOAD CART & FIND TARGET ITEM
-        # ============================================================
+# Key environ WSGI yang diisi asgi_app (mode ASGI, lihat bagian ASGI
+# ENTRYPOINT). Jika ada, sse_response tidak membuat generator blocking:
+# stream dilayani langsung oleh event loop.
+ASGI_ENVIRON_KEY = "kasir.asgi"
+ASGI_SSE_KEY = "kasir.asgi.sse"
 
-        # Ambil cart dari session
-        # Default ke empty list jika:
-        # - Session baru (first time user)
-        # - Cart sudah di-clear sebelumnya
-        # - Session expired dan di-reset
-        cart = session.get("jumlahcart", [])
 
-        # Cari apakah item dengan ID ini sudah ada di cart
-        # find_item_in_cart return:
-        # - Reference ke item dict jika ada (modifiable)
-        # - None jika tidak ada
-        target = find_item_in_cart(cart, item_id)
+def format_sse(event, data, event_id=None):
+    """
+    Format satu pesan Server-Sent Events
 
-        # ============================================================
-        # STEP 3: HANDLE ACTION - ADD
-        # ============================================================
+    Returns:
+        bytes: "id: ..\\nevent: ..\\ndata: {json}\\n\\n"
+    """
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append("data: ")
+    return "\n".join(lines).encode("utf-8") + encode_json(data) + b"\n\n"
 
-        if action == "add":
-            # ADD action punya 2 skenario berbeda
 
-            # SKENARIO 1: Item BELUM ada di cart (target = None)
-            if not target:
-                # Item baru, perlu ambil data lengkap dari menu database
-                menu_item = find_menu_item(item_id)
+class EventBroker:
+    """
+    Fan-out publisher untuk Server-Sent Events
 
-                # Validasi: pastikan item exists di menu
-                # Bisa tidak ada jika:
-                # - ID invalid/typo
-                # - Item sudah dihapus dari menu
-                # - Bug di frontend yang kirim ID salah
-                if not menu_item:
-                    return jsonify({"error": "Item not found"}), 404
+    Satu publish() → pesan di-encode SEKALI, lalu dimasukkan ke queue
+    setiap subscriber topic tersebut (contoh topic: kode outlet).
+    Setiap koneksi SSE hanya menunggu queue miliknya, tidak ada polling
+    per client ke server.
 
-                # Buat dictionary baru untuk item
-                # Copy data dari menu_item dan tambah qty & subtotal
-                cart.append(
-                    {
-                        "id": menu_item["id"],  # ID unik item
-                        "nama": menu_item["nama"],  # Nama menu
-                        "price": menu_item["price"],  # Harga per item
-                        "img": menu_item["img"],  # Path gambar
-                        "qty": 1,  # Quantity awal = 1
-                        "subtotal": menu_item["price"],  # price × qty = price × 1
-                    }
+    Subscriber yang terlalu lambat (queue penuh) diputus. EventSource di
+    browser otomatis reconnect dan menerima snapshot terbaru.
+
+    Jika replay > 0, pesan terakhir (maksimal replay pesan, semua topic)
+    disimpan. Client yang reconnect dengan Last-Event-ID menerima ulang
+    pesan topic-nya yang terlewat.
+
+    Contoh penggunaan:
+        broker = EventBroker()
+        broker.publish("K3", "availability", {"id": "Mn003", "available": False})
+        return sse_response(broker, "K3", snapshot)
+    """
+
+    def __init__(self, max_queue=256, replay=0):
+        self.max_queue = max_queue
+        self._topics = {}
+        self._ids = itertools.count(1)
+        self._last_id = 0
+        self._history = deque(maxlen=replay)  # (event_id, topic, message)
+        self._lock = threading.Lock()
+
+    def subscribe(self, topic, last_event_id=None, factory=queue.Queue):
+        """
+        Daftar sebagai subscriber topic
+
+        Args:
+            topic (str): Topic yang di-subscribe
+            last_event_id (int/None): ID event terakhir yang sudah diterima
+                client. Pesan topic ini setelah ID tersebut yang masih ada
+                di history dimasukkan ke queue lebih dulu.
+            factory (callable): factory(maxsize) → queue subscriber.
+                Default queue.Queue (thread); mode ASGI memakai
+                AsyncSubscriber (event loop).
+
+        Returns:
+            queue.Queue: Queue berisi bytes pesan SSE (None = stream ditutup)
+        """
+        with self._lock:
+            replayed = []
+            if last_event_id is not None:
+                # Pesan yang sudah terbuang dari history tidak bisa dikirim
+                # ulang: beri tahu client agar bisa sinkron ulang sendiri.
+                # ID lebih besar dari ID terakhir = ID dari sebelum server
+                # restart, semua history sekarang belum pernah diterima.
+                if last_event_id > self._last_id:
+                    replayed.append(format_sse("gap", {"last_event_id": last_event_id}))
+                    last_event_id = 0
+                elif self._history and self._history[0][0] > last_event_id + 1:
+                    replayed.append(format_sse("gap", {"last_event_id": last_event_id}))
+                replayed.extend(
+                    message
+                    for event_id, event_topic, message in self._history
+                    if event_id > last_event_id and event_topic == topic
                 )
 
-            # SKENARIO 2: Item SUDAH ada di cart (target != None)
-            else:
-                # Tinggal tambah quantity dan update subtotal
-                # target adalah reference, jadi modifikasi langsung affect cart
-                target["qty"] += 1
-                target["subtotal"] = target["qty"] * target["price"]
+            subscriber = factory(self.max_queue + len(replayed))
+            for message in replayed:
+                subscriber.put_nowait(message)
+
+            self._topics.setdefault(topic, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, topic, subscriber):
+        with self._lock:
+            subscribers = self._topics.get(topic)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._topics[topic]
+
+    def publish(self, topic, event, data):
+        """
+        Kirim event ke semua subscriber topic
+
+        Returns:
+            int: ID event yang dikirim
+        """
+        with self._lock:
+            event_id = self._last_id = next(self._ids)
+            message = format_sse(event, data, event_id)
+            if self._history.maxlen:
+                self._history.append((event_id, topic, message))
+            subscribers = list(self._topics.get(topic, ()))
+
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(message)
+            except queue.Full:
+                # Client terlalu lambat: putus, nanti reconnect + snapshot
+                self.unsubscribe(topic, subscriber)
+                self._close(subscriber)
+
+        return event_id
+
+    @staticmethod
+    def _close(subscriber):
+        """Kosongkan queue lalu kirim None (tanda stream harus ditutup)"""
+        while True:
+            try:
+                while True:
+                    subscriber.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                subscriber.put_nowait(None)
+                return
+            except queue.Full:
+                continue
+
+
+def sse_response(broker, topic, snapshot=None, last_event_id=None):
+    """
+    Response streaming text/event-stream untuk satu subscriber
 
-        # ============================================================
-        # STEP 4: HANDLE ACTION - PLUS
-        # ============================================================
+    Args:
+        broker (EventBroker): Sumber event
+        topic (str): Topic yang di-subscribe
+        snapshot (callable/None): Dipanggil SETELAH subscribe, return
+            bytes pesan awal (state terkini). Karena subscribe dulu,
+            tidak ada event yang terlewat di antara snapshot dan stream.
+        last_event_id (int/None): Untuk replay (lihat EventBroker.subscribe)
 
-        elif action == "plus":
-            # PLUS hanya bisa dilakukan pada item yang SUDAH ada
-            # Validasi: jika item tidak ada, return error
-            # Seharusnya tidak terjadi karena button plus hanya muncul di cart
-            # Tapi kita tetap validate untuk robustness
-            if not target:
-                return jsonify({"error": "Item not in cart"}), 404
+    Returns:
+        Response: Streaming response (tidak di-buffer)
+    """
+    if has_request_context() and request.environ.get(ASGI_ENVIRON_KEY):
+        # Mode ASGI: cukup kirim header, stream dijalankan asgi_app tanpa
+        # memegang thread selama koneksi terbuka
+        request.environ[ASGI_SSE_KEY] = (broker, topic, snapshot, last_event_id)
+        response = app.response_class(iter(()), mimetype="text/event-stream")
+        response.headers["X-Accel-Buffering"] = "no"
+        return response
 
-            # Tambah quantity dan update subtotal
-            # Logic sama dengan ADD skenario 2
-            target["qty"] += 1
-            target["subtotal"] = target["qty"] * target["price"]
+    def generate():
+        subscriber = broker.subscribe(topic, last_event_id)
+        idle = 0
 
-        # ============================================================
-        # STEP 5: HANDLE ACTION - MINUS
-        # ============================================================
+        try:
+            if snapshot is not None:
+                yield snapshot()
+
+            while True:
+                try:
+                    message = subscriber.get(timeout=SSE_POLL_INTERVAL)
+                except queue.Empty:
+                    # Worker ini mungkin tidak menerima request lain:
+                    # cek perubahan menu / overlay dari worker lain di sini
+                    check_menu_reload()
+
+                    idle += SSE_POLL_INTERVAL
+                    if idle >= SSE_KEEPALIVE_INTERVAL:
+                        idle = 0
+                        yield b": keepalive\n\n"
+                    continue
+
+                if message is None:
+                    return
+
+                idle = 0
+                yield message
+        finally:
+            broker.unsubscribe(topic, subscriber)
+
+    response = app.response_class(generate(), mimetype="text/event-stream")
+    response.headers["X-Accel-Buffering"] = "no"  # nginx: jangan buffer
+    return response
 
-        elif action == "minus":
-            # MINUS juga hanya untuk item yang sudah ada
-            if not target:
-                return jsonify({"error": "Item not in cart"}), 404
 
-            # Kurangi quantity
-            target["qty"] -= 1
+# ========================================================================
+# LOAD DATA MENU DARI FILE JSON
+# ========================================================================
 
-            # CRITICAL LOGIC: Auto-remove jika qty = 0
-            # Ini memberikan UX yang baik:
-            # - User tidak perlu klik remove button terpisah
-            # - Tinggal tekan minus sampai item hilang
-            # - Lebih intuitive untuk mobile users
-            if target["qty"] <= 0:
-                # Hapus item dari cart
-                # cart.remove() mencari dan menghapus object dari list
-                cart.remove(target)
-            else:
-                # Qty masih positif, update subtotal
-                target["subtotal"] = target["qty"] * target["price"]
 
-        # ============================================================
-        # STEP 6: HANDLE ACTION - REMOVE
-        # ============================================================
+MENU_PATH = "data/menu.json"
 
-        elif action == "remove":
-            # REMOVE menghapus item regardless of quantity
-            # Validasi: item harus ada
-            if not target:
-                return jsonify({"error": "Item not in cart"}), 404
+# Interval (detik) pengecekan perubahan file menu.json
+app.config["MENU_RELOAD_INTERVAL"] = 2
 
-            # Hapus item dari cart
-            # Tidak peduli qty-nya berapa, langsung dihapus
-            # Di frontend ada confirmation dialog untuk prevent accidental delete
-            cart.remove(target)
 
-        # ============================================================
-        # STEP 7: HANDLE INVALID ACTION
-        # ============================================================
+# Maksimal jumlah entry rusak yang ditulis satu per satu ke log
+MENU_MAX_LOGGED_ERRORS = 20
 
-        else:
+
+def load_menu():
+    """
+    Memuat data menu dari file JSON secara streaming
+
+    File dibaca per item (lihat MenuStreamParser), jadi memory puncak
+    tidak ikut membesar walaupun menu.json berukuran puluhan MB.
+    Setiap item divalidasi saat dibaca dan langsung disimpan sebagai
+    MenuItem.
+
+    Returns:
+        tuple: (catalog, version)
+               catalog = {"kategori": [MenuItem, ...]}
+               version = hash isi file (lihat catalog_version)
+        ({}, version): Jika file tidak ada / strukturnya rusak sejak awal
+
+    Error Handling:
+        - FileNotFoundError: File menu.json tidak ditemukan
+        - Item tidak valid (schema salah / id dobel): item dilewati,
+          dicatat di log lengkap dengan posisinya (kategori, index, offset)
+        - MenuFormatError: Syntax JSON rusak di tengah file. Item yang
+          sudah terbaca sebelum posisi rusak tetap dipakai
+    """
+    catalog = {}
+    seen_ids = set()
+    errors = []
+
+    try:
+        # Mode binary: decode UTF-8 dan hash versi dilakukan parser
+        with open(MENU_PATH, "rb") as file:
+            parser = MenuStreamParser(file)
+
+            try:
+                for kategori, index, offset, value in parser.items():
+                    items = catalog.setdefault(sys.intern(kategori), [])
+
+                    if index is None:
+                        errors.append((kategori, index, offset, "Isi kategori harus list"))
+                        continue
+
+                    error = validate_menu_item(value)
+                    if error is None and str(value["id"]) in seen_ids:
+                        error = f"id {value['id']} dobel"
+                    if error:
+                        errors.append((kategori, index, offset, error))
+                        continue
+
+                    seen_ids.add(str(value["id"]))
+                    items.append(MenuItem(value, kategori))
+
+            except MenuFormatError as e:
+                # Sisa file setelah posisi rusak tidak bisa dibaca,
+                # tapi item sebelumnya tetap dipakai
+                app.logger.error(f"Invalid JSON in menu.json: {e}")
+
+            version = parser.version()
+
+    except FileNotFoundError:
+        # Exception ini muncul jika file tidak ditemukan
+        # Bisa karena path salah atau file memang tidak ada
+
+        # Log error ke console/file untuk debugging
+        # Penting untuk troubleshooting di production environment
+        app.logger.error("menu.json not found")
+
+        # Return katalog kosong agar aplikasi tidak crash
+        # Aplikasi tetap bisa jalan, hanya menu-nya kosong
+        return {}, catalog_version(b"")
+
+    for kategori, index, offset, error in errors[:MENU_MAX_LOGGED_ERRORS]:
+        app.logger.warning(
+            f"menu.json: item dilewati (kategori={kategori!r}, index={index}, "
+            f"offset={offset}): {error}"
+        )
+    if len(errors) > MENU_MAX_LOGGED_ERRORS:
+        app.logger.warning(
+            f"menu.json: {len(errors) - MENU_MAX_LOGGED_ERRORS} item rusak lainnya dilewati"
+        )
+
+    return catalog, version
+
+
+# ========================================================================
+# HELPER CLASS - ITEM MENU (COMPACT)
+# ========================================================================
+
+
+class MenuItem:
+    """
+    Representasi item menu yang hemat memory
+
+    Dibanding dict hasil json.load (hash table + key string per item):
+        - __slots__: tidak ada __dict__ per object
+        - String di-intern (sys.intern): kategori, nama, id, dan img
+          yang sama dipakai bersama, tidak diduplikasi per item
+        - price disimpan sebagai int
+
+    Object ini read-only setelah dibuat dan dipakai bersama oleh semua
+    request (dan semua worker hasil fork, selama tidak ditulis ulang).
+
+    Tetap bisa diakses seperti dict (item["nama"], item.get("plu"),
+    {**item}) sehingga template, JSON response, dan helper lain tidak
+    perlu tahu perbedaannya.
+    """
+
+    __slots__ = ("id", "nama", "price", "img", "kategori", "barcode", "plu", "_cart_json")
+
+    # Field yang ikut di-serialize ke JSON (urutan = urutan di menu.json)
+    FIELDS = ("nama", "price", "id", "img")
+    OPTIONAL_FIELDS = ("barcode", "plu")
+
+    # Field yang boleh dibaca lewat item["..."] / item.get("...")
+    # Slot internal (_cart_json) sengaja tidak termasuk
+    PUBLIC_FIELDS = frozenset(FIELDS + OPTIONAL_FIELDS + ("kategori",))
+
+    def __init__(self, data, kategori):
+        self.id = sys.intern(str(data["id"]))
+        self.nama = sys.intern(str(data["nama"]))
+        self.price = int(data["price"])
+        self.img = sys.intern(str(data.get("img") or ""))
+        self.kategori = sys.intern(kategori)
+        self.barcode = data.get("barcode")
+        self.plu = data.get("plu")
+        self._cart_json = None
+
+    def keys(self):
+        return self.FIELDS + tuple(
+            field for field in self.OPTIONAL_FIELDS if getattr(self, field)
+        )
+
+    def __getitem__(self, key):
+        if key not in self.PUBLIC_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        value = getattr(self, key, None) if key in self.PUBLIC_FIELDS else None
+        return default if value is None else value
+
+    def cart_json(self, qty):
+        """
+        Line cart item ini sebagai JSONFragment (sama dengan hasil encode
+        line expand_cart)
+
+        Field statis (id, img, nama, price) di-encode sekali lalu disimpan
+        di item. Reload menu / overlay outlet membuat object MenuItem baru,
+        jadi cache ini otomatis mengikuti versi katalog.
+        """
+        prefix = self._cart_json
+        if prefix is None:
+            static = {"id": self.id, "img": self.img, "nama": self.nama, "price": self.price}
+            # Key urut abjad: qty dan subtotal selalu setelah price
+            prefix = self._cart_json = encode_json(static)[:-1] + b","
+
+        return JSONFragment(prefix + b'"qty":%d,"subtotal":%d}' % (qty, self.price * qty))
+
+    def __repr__(self):
+        return f"MenuItem({self.id!r}, {self.nama!r}, {self.price})"
+
+
+# ========================================================================
+# HELPER CLASS - PARSER STREAMING MENU.JSON
+# ========================================================================
+
+# Ukuran chunk yang dibaca dari file per kali baca
+MENU_READ_CHUNK = 64 * 1024
+
+# Batas ukuran satu value JSON (item / nama kategori) dalam karakter.
+# Value yang tidak selesai sampai batas ini dianggap rusak, supaya
+# file rusak tidak membuat seluruh sisa file masuk ke buffer.
+MENU_MAX_VALUE_CHARS = 1024 * 1024
+
+_json_decoder = json.JSONDecoder()
+_json_whitespace = re.compile(r"[ \t\n\r]*")
+
+
+class MenuFormatError(ValueError):
+    """Struktur menu.json rusak di posisi tertentu (offset karakter)"""
+
+    def __init__(self, message, offset):
+        super().__init__(f"{message} (offset {offset})")
+        self.offset = offset
+
+
+class MenuStreamParser:
+    """
+    Membaca menu.json per item tanpa memuat seluruh file ke memory
+
+    Format yang diharapkan: {"kategori": [{item}, {item}, ...], ...}
+
+    File dibaca per chunk (MENU_READ_CHUNK) dan setiap item di-decode
+    sendiri dengan JSONDecoder.raw_decode. Bagian buffer yang sudah
+    diparse langsung dibuang, jadi memory puncak kira-kira sebesar
+    satu chunk + satu item, bukan sebesar file.
+
+    Selama membaca, isi file (bytes) juga di-hash untuk versi katalog.
+
+    Contoh penggunaan:
+        with open(MENU_PATH, "rb") as file:
+            parser = MenuStreamParser(file)
+            for kategori, index, offset, value in parser.items():
+                ...
+            version = parser.version()
+    """
+
+    def __init__(self, file):
+        self.file = file
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.digest = hashlib.sha1()
+        self.buf = ""
+        self.pos = 0
+        self.offset = 0  # offset karakter awal self.buf di file
+        self.eof = False
+
+    def version(self):
+        """Hash seluruh isi file (sisa yang belum diparse ikut dibaca)"""
+        for raw in iter(lambda: self.file.read(MENU_READ_CHUNK), b""):
+            self.digest.update(raw)
+        return self.digest.hexdigest()[:16]
+
+    def tell(self):
+        return self.offset + self.pos
+
+    def _fill(self):
+        """Baca chunk berikutnya, buang bagian buffer yang sudah diparse"""
+        if self.eof:
+            return False
+
+        raw = self.file.read(MENU_READ_CHUNK)
+        self.digest.update(raw)
+        if not raw:
+            self.eof = True
+
+        try:
+            chunk = self.decoder.decode(raw, final=self.eof)
+        except UnicodeDecodeError:
+            self.eof = True
+            raise MenuFormatError("File bukan UTF-8 yang valid", self.offset + len(self.buf))
+
+        self.offset += self.pos
+        self.buf = self.buf[self.pos :] + chunk
+        self.pos = 0
+        return bool(raw)
+
+    def _peek(self):
+        """Karakter berikutnya setelah whitespace ("" jika file habis)"""
+        while True:
+            self.pos = _json_whitespace.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, chars):
+        char = self._peek()
+        if not char or char not in chars:
+            found = repr(char) if char else "akhir file"
+            raise MenuFormatError(
+                f"Diharapkan {' atau '.join(chars)}, ditemukan {found}", self.tell()
+            )
+        self.pos += 1
+        return char
+
+    def _value(self):
+        """Decode satu value JSON lengkap mulai dari posisi sekarang"""
+        self._peek()
+        while True:
+            try:
+                value, end = _json_decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                # Bisa jadi value belum lengkap di buffer: baca chunk lagi
+                too_big = len(self.buf) - self.pos > MENU_MAX_VALUE_CHARS
+                if too_big or not self._fill():
+                    raise MenuFormatError(e.msg, self.offset + e.pos)
+                continue
+
+            # Angka di ujung buffer bisa terpotong ("230" dari "23000")
+            if end == len(self.buf) and self._fill():
+                continue
+
+            self.pos = end
+            return value
+
+    def items(self):
+        """
+        Generator semua item di file
+
+        Yields:
+            tuple: (kategori, index, offset, value)
+                   value adalah hasil decode apa adanya (belum divalidasi),
+                   None jika isi kategori bukan list (index = None)
+
+        Raises:
+            MenuFormatError: Jika struktur JSON rusak. Item yang sudah
+                             di-yield sebelumnya tetap valid.
+        """
+        self._expect("{")
+        if self._peek() == "}":
+            return
+
+        while True:
+            offset = self.tell()
+            kategori = self._value()
+            if not isinstance(kategori, str):
+                raise MenuFormatError("Nama kategori harus string", offset)
+            self._expect(":")
+
+            if self._peek() != "[":
+                # Isi kategori bukan list: lewati value-nya saja
+                offset = self.tell()
+                self._value()
+                yield kategori, None, offset, None
+            else:
+                self._expect("[")
+                index = 0
+                if self._peek() == "]":
+                    self.pos += 1
+                else:
+                    while True:
+                        offset = self.tell()
+                        yield kategori, index, offset, self._value()
+                        index += 1
+                        if self._expect(",]") == "]":
+                            break
+
+            if self._expect(",}") == "}":
+                break
+
+
+# Tipe hasil json untuk id / kode (bool sengaja tidak termasuk)
+_MENU_CODE_TYPES = (str, int)
+
+
+def validate_menu_item(item):
+    """
+    Validasi schema satu item menu.json
+
+    Value berasal dari json decoder, jadi tipenya pasti tipe dasar
+    (dict, list, str, int, float, bool, None) dan cukup dicek dengan
+    type() is ... (lebih cepat dari isinstance, dan bool tidak lolos
+    sebagai int).
+
+    Returns:
+        str: Pesan error jika item tidak valid
+        None: Jika item valid
+    """
+    if type(item) is not dict:
+        return "Item harus berupa object"
+
+    item_id = item.get("id")
+    if type(item_id) not in _MENU_CODE_TYPES or not str(item_id).strip():
+        return "Field 'id' wajib (string/angka, tidak kosong)"
+
+    nama = item.get("nama")
+    if type(nama) is not str or not nama.strip():
+        return "Field 'nama' wajib (string)"
+
+    price = item.get("price")
+    if type(price) is not int or price < 0:
+        return "Field 'price' wajib (angka bulat >= 0)"
+
+    img = item.get("img")
+    if img is not None and type(img) is not str:
+        return "Field 'img' harus string"
+
+    barcode = item.get("barcode")
+    if barcode is not None and type(barcode) is not str:
+        if type(barcode) is not list or any(
+            type(code) not in _MENU_CODE_TYPES for code in barcode
+        ):
+            return "Field 'barcode' harus string atau list of string"
+
+    plu = item.get("plu")
+    if plu is not None and type(plu) not in _MENU_CODE_TYPES:
+        return "Field 'plu' harus string/angka"
+
+    return None
+
+
+# ========================================================================
+# HELPER CLASS - INDEX PENCARIAN MENU
+# ========================================================================
+
+
+def normalize_text(text):
+    """
+    Lowercase + hapus aksen, contoh "Café Latté" → "cafe latte"
+    """
+    text = str(text).lower()
+    if text.isascii():
+        return text
+
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in text if not unicodedata.combining(c))
+
+
+def trigrams(word):
+    """
+    Set trigram dari satu kata (diberi padding spasi)
+
+    Contoh: "teh" → {"  t", " te", "teh", "eh "}
+    """
+    padded = f"  {word} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class MenuSearchIndex:
+    """
+    Index pencarian in-memory untuk nama & id menu
+
+    Dibangun sekali saat katalog di-load (dan setiap reload), lalu
+    dipakai read-only oleh semua request.
+
+    1. Prefix index: list token (kata) terurut + bisect
+       "nas gor" cocok dengan "Nasi goreng ..." karena setiap kata query
+       adalah awalan salah satu kata di nama / id item.
+
+    2. Koreksi typo per kata: trigram index atas KOSAKATA (bukan atas
+       semua item, jadi jauh lebih kecil). Kata query yang tidak menjadi
+       awalan kata manapun diganti dengan kata paling mirip, contoh
+       "capucino" → "cappucino", "ayam bkar" → "ayam bakar".
+       Kandidat hanya diambil dari trigram query yang paling jarang.
+    """
+
+    # Jumlah trigram paling jarang yang dipakai untuk ambil kandidat
+    RARE_TRIGRAMS = 3
+
+    # Minimal kemiripan (Jaccard trigram) untuk koreksi typo
+    MIN_SIMILARITY = 0.3
+
+    # Maksimal alternatif koreksi per kata
+    MAX_CORRECTIONS = 3
+
+    def __init__(self, catalog):
+        # doc id = posisi item di list ini
+        self.docs = []
+        self.doc_tokens = []
+
+        token_docs = {}
+
+        for kategori, items in catalog.items():
+            for item in items:
+                doc_id = len(self.docs)
+                self.docs.append((kategori, item))
+
+                tokens = normalize_text(f"{item['nama']} {item['id']}").split()
+                self.doc_tokens.append(tokens)
+
+                for token in set(tokens):
+                    token_docs.setdefault(token, []).append(doc_id)
+
+        # Token terurut untuk prefix search dengan bisect
+        self.tokens = sorted(token_docs)
+        self.token_docs = [token_docs[token] for token in self.tokens]
+
+        # Prefix sum jumlah item per token, untuk menghitung berapa item
+        # yang cocok dengan suatu range token dalam O(1)
+        self.doc_counts = list(itertools.accumulate(map(len, self.token_docs), initial=0))
+
+        # Trigram kosakata: trigram → list posisi token di self.tokens
+        # Token yang mengandung angka (id / kode) tidak perlu koreksi typo
+        self.token_trigrams = {}
+        self.trigram_tokens = {}
+        for i, token in enumerate(self.tokens):
+            if any(c.isdigit() for c in token):
+                continue
+
+            grams = trigrams(token)
+            self.token_trigrams[i] = grams
+            for gram in grams:
+                self.trigram_tokens.setdefault(gram, []).append(i)
+
+    def _prefix_range(self, prefix):
+        start = bisect.bisect_left(self.tokens, prefix)
+        end = bisect.bisect_left(self.tokens, prefix + "\uffff", start)
+        return start, end
+
+    def _correct(self, word):
+        """
+        Cari kata di kosakata yang paling mirip dengan word (typo)
+
+        Returns:
+            list: Maksimal MAX_CORRECTIONS token, paling mirip lebih dulu
+        """
+        grams = trigrams(word)
+        postings = [
+            self.trigram_tokens[g] for g in grams if g in self.trigram_tokens
+        ]
+        postings.sort(key=len)
+
+        candidates = set()
+        for positions in postings[: self.RARE_TRIGRAMS]:
+            candidates.update(positions)
+
+        scored = []
+        for i in candidates:
+            other = self.token_trigrams[i]
+            shared = len(grams & other)
+            score = shared / (len(grams) + len(other) - shared)
+            if score >= self.MIN_SIMILARITY:
+                scored.append((-score, i))
+
+        return [self.tokens[i] for _, i in heapq.nsmallest(self.MAX_CORRECTIONS, scored)]
+
+    def search(self, query, limit=20):
+        """
+        Cari menu berdasarkan nama / id
+
+        Args:
+            query (str): Text pencarian (case-insensitive, boleh typo)
+            limit (int): Maksimal jumlah hasil
+
+        Returns:
+            list: List of (kategori, item)
+        """
+        # Setiap kata query → daftar awalan yang diterima
+        # Kata tanpa prefix match diganti hasil koreksi typo
+        alternatives = []
+        for word in normalize_text(query).split():
+            start, end = self._prefix_range(word)
+            if start < end:
+                alternatives.append(((word,), [(start, end)]))
+                continue
+
+            corrections = self._correct(word)
+            if not corrections:
+                return []
+            alternatives.append(
+                (tuple(corrections), [self._prefix_range(c) for c in corrections])
+            )
+
+        if not alternatives:
+            return []
+
+        # Mulai dari kata dengan jumlah item cocok paling sedikit,
+        # kata lain cukup dicek pada item kandidat
+        alternatives.sort(
+            key=lambda a: sum(
+                self.doc_counts[end] - self.doc_counts[start] for start, end in a[1]
+            )
+        )
+        (_, ranges), others = alternatives[0], alternatives[1:]
+
+        found = []
+        seen = set()
+        for start, end in ranges:
+            for i in range(start, end):
+                for doc_id in self.token_docs[i]:
+                    if doc_id in seen:
+                        continue
+                    seen.add(doc_id)
+
+                    tokens = self.doc_tokens[doc_id]
+                    if all(
+                        any(t.startswith(p) for t in tokens for p in prefixes)
+                        for prefixes, _ in others
+                    ):
+                        found.append(self.docs[doc_id])
+                        if len(found) >= limit:
+                            return found
+
+        return found
+
+
+# ========================================================================
+# INISIALISASI KATALOG MENU
+# ========================================================================
+
+
+def catalog_version(data):
+    """
+    Menghitung versi katalog menu (hash dari isi file menu.json)
+
+    Versi ini sama di semua worker selama isi file sama, sehingga
+    bisa dipakai sebagai key cache dan ETag. Saat load_menu, hash yang
+    sama dihitung MenuStreamParser sambil membaca file per chunk.
+
+    Args:
+        data (bytes): Isi file menu.json
+    """
+    return hashlib.sha1(data).hexdigest()[:16]
+
+
+def build_item_index(catalog):
+    """
+    Membangun hash index item menu untuk lookup O(1)
+
+    Field optional per item di menu.json:
+        - "barcode": string atau list of string (EAN/UPC dari scanner)
+        - "plu": kode PLU (Price Look-Up) untuk item tanpa barcode
+
+    Returns:
+        tuple: (by_id, by_code)
+               by_id = {"Mkn001": item, ...}
+               by_code = {"8991234567890": item, "1001": item, ...}
+    """
+    by_id = {}
+    by_code = {}
+
+    for items in catalog.values():
+        for item in items:
+            by_id[str(item["id"])] = item
+
+            codes = item.get("barcode") or []
+            if isinstance(codes, str):
+                codes = [codes]
+            if item.get("plu"):
+                codes = [*codes, item["plu"]]
+
+            for code in codes:
+                code = str(code).strip()
+                if code in by_code:
+                    # Kode dobel: item pertama yang dipakai
+                    app.logger.warning(f"Kode {code} dipakai lebih dari 1 item")
+                    continue
+                by_code[code] = item
+
+    return by_id, by_code
+
+
+# ========================================================================
+# HELPER CLASS - KATALOG PER OUTLET
+# ========================================================================
+
+# Overlay per outlet: data/outlets/<OUTLET_ID>.json
+OUTLETS_DIR = "data/outlets"
+
+# Penanda "tidak di-override" di CatalogView.overrides
+_BASE_ITEM = object()
+
+
+class CatalogView:
+    """
+    Katalog menu yang dilihat oleh satu outlet
+
+    Semua outlet memakai katalog dasar yang sama (data/menu.json).
+    Perbedaan per outlet ditulis di overlay sparse
+    data/outlets/<OUTLET_ID>.json, hanya berisi item yang berbeda:
+        {
+            "price": {"Mkn001": 25000},   # Harga khusus outlet
+            "unavailable": ["Mn003"]      # Item tidak dijual di outlet
+        }
+
+    Item yang tidak di-override adalah object MenuItem yang SAMA dengan
+    katalog dasar (tidak di-copy). Hanya item dengan harga override yang
+    dibuat object baru. Index id & barcode serta index pencarian juga
+    dipakai bersama; view outlet hanya menyimpan dict overrides kecil.
+
+    Contoh penggunaan:
+        base = CatalogView(menu, version)
+        k5 = base.with_overlay({"price": {"Mkn001": 25000}}, version_k5)
+        k5.get("Mkn001").price   # 25000, lookup O(1)
+    """
+
+    def __init__(self, catalog, version):
+        self.menu = catalog
+        self.version = version
+        self.by_id, self.by_code = build_item_index(catalog)
+        self.search_index = MenuSearchIndex(catalog)
+
+        # item_id -> MenuItem pengganti, atau None jika tidak dijual
+        self.overrides = {}
+        self.unavailable = frozenset()
+
+    def with_overlay(self, overlay, version):
+        """
+        Membuat view outlet dari view dasar ini + overlay
+
+        Args:
+            overlay (dict): {"price": {id: harga}, "unavailable": [id, ...]}
+            version (str): Versi katalog outlet (dasar + overlay)
+
+        Returns:
+            CatalogView: View baru yang berbagi item & index dengan view ini
+        """
+        view = object.__new__(CatalogView)
+        view.version = version
+        view.by_id, view.by_code = self.by_id, self.by_code
+        view.search_index = self.search_index
+        view.overrides = {}
+
+        for item_id, price in overlay.get("price", {}).items():
+            item = self.by_id.get(str(item_id))
+            if item is None:
+                app.logger.warning(f"Overlay outlet: item {item_id} tidak ada di menu")
+                continue
+            view.overrides[item.id] = MenuItem({**item, "price": price}, item.kategori)
+
+        for item_id in overlay.get("unavailable", []):
+            if str(item_id) not in self.by_id:
+                app.logger.warning(f"Overlay outlet: item {item_id} tidak ada di menu")
+                continue
+            view.overrides[str(item_id)] = None
+
+        view.unavailable = frozenset(
+            item_id for item_id, item in view.overrides.items() if item is None
+        )
+
+        # List per kategori hanya berisi referensi ke item (tidak di-copy)
+        if view.overrides:
+            view.menu = {
+                kategori: [resolved for resolved in map(view.resolve, items) if resolved]
+                for kategori, items in self.menu.items()
+            }
+        else:
+            view.menu = self.menu
+
+        return view
+
+    def resolve(self, item):
+        """Item katalog dasar → versi outlet ini (None jika tidak dijual)"""
+        override = self.overrides.get(item.id, _BASE_ITEM)
+        return item if override is _BASE_ITEM else override
+
+    def get(self, item_id):
+        """Lookup item berdasarkan ID, O(1)"""
+        item = self.by_id.get(str(item_id))
+        return item and self.resolve(item)
+
+    def get_by_code(self, code):
+        """Lookup item berdasarkan barcode / PLU, fallback ke ID"""
+        item = self.by_code.get(code) or self.by_id.get(code)
+        return item and self.resolve(item)
+
+    def search(self, query, limit):
+        """
+        Pencarian menu di view ini
+
+        Index pencarian dipakai bersama semua outlet. Hasil dari index
+        di-resolve ke item outlet; item yang tidak dijual dibuang, jadi
+        diminta sedikit lebih banyak dari limit.
+        """
+        results = []
+
+        for kategori, item in self.search_index.search(
+            query, limit + len(self.unavailable)
+        ):
+            item = self.resolve(item)
+            if item:
+                results.append((kategori, item))
+
+        return results[:limit]
+
+
+def load_outlet_overlay(path):
+    """
+    Memuat overlay outlet (file kecil, cukup json.load biasa)
+
+    Returns:
+        tuple: (overlay, raw_bytes)
+        (None, None): Jika file tidak bisa dibaca / formatnya salah
+    """
+    try:
+        with open(path, "rb") as file:
+            raw = file.read()
+        overlay = json.loads(raw)
+    except (OSError, ValueError) as e:
+        app.logger.error(f"Overlay outlet {path} tidak valid: {e}")
+        return None, None
+
+    prices = overlay.get("price", {}) if isinstance(overlay, dict) else None
+    unavailable = overlay.get("unavailable", []) if isinstance(overlay, dict) else None
+
+    if (
+        not isinstance(prices, dict)
+        or not isinstance(unavailable, list)
+        or any(type(price) is not int or price < 0 for price in prices.values())
+    ):
+        app.logger.error(f"Overlay outlet {path} tidak valid: format price/unavailable")
+        return None, None
+
+    return overlay, raw
+
+
+def outlet_overlay_paths():
+    """{OUTLET_ID: path} untuk semua file overlay di OUTLETS_DIR"""
+    try:
+        names = os.listdir(OUTLETS_DIR)
+    except OSError:
+        return {}
+
+    return {
+        name[: -len(".json")]: os.path.join(OUTLETS_DIR, name)
+        for name in sorted(names)
+        if name.endswith(".json")
+    }
+
+
+def build_catalogs(base):
+    """
+    Membangun view semua outlet dari katalog dasar
+
+    Outlet default (OUTLET_ID) selalu ada, walaupun tanpa file overlay.
+
+    Returns:
+        dict: {OUTLET_ID: CatalogView}
+    """
+    views = {app.config["OUTLET_ID"]: base}
+
+    for outlet, path in outlet_overlay_paths().items():
+        overlay, raw = load_outlet_overlay(path)
+        if overlay is None:
+            continue
+
+        version = catalog_version(base.version.encode("ascii") + raw)
+        views[outlet] = base.with_overlay(overlay, version)
+
+    return views
+
+
+def catalog_mtimes():
+    """mtime menu.json + semua overlay, untuk deteksi perubahan file"""
+    paths = {"": MENU_PATH, **outlet_overlay_paths()}
+    mtimes = {}
+
+    for outlet, path in paths.items():
+        try:
+            mtimes[outlet] = os.stat(path).st_mtime
+        except OSError:
+            mtimes[outlet] = None
+
+    return mtimes
+
+
+# Execute fungsi load_menu() saat aplikasi start
+# Katalog dasar + view per outlet ini akan digunakan di seluruh aplikasi
+# Load sekali saja untuk efisiensi (tidak load ulang setiap request)
+base_catalog = CatalogView(*load_menu())
+catalogs = build_catalogs(base_catalog)
+
+_menu_reload_lock = threading.Lock()
+_overlay_write_lock = threading.Lock()
+_menu_loaded_mtimes = catalog_mtimes()
+
+# Publisher event ketersediaan menu (topic = kode outlet)
+availability_broker = EventBroker()
+_menu_checked_at = time.monotonic()
+
+
+def current_outlet():
+    """Kode outlet yang dipilih session (default OUTLET_ID)"""
+    return session.get("outlet") or app.config["OUTLET_ID"]
+
+
+def current_catalog():
+    """
+    View katalog untuk outlet yang dipilih session
+
+    Di luar request (CLI, startup) atau jika outlet tidak dikenal,
+    dipakai outlet default (OUTLET_ID).
+    """
+    outlet = session.get("outlet") if has_request_context() else None
+    return catalogs.get(outlet) or catalogs[app.config["OUTLET_ID"]]
+
+
+def reload_menu():
+    """
+    Load ulang menu.json / overlay outlet dan update versi katalog
+
+    Semua cache yang di-key dengan versi katalog (fragment menu, dll)
+    otomatis tidak terpakai lagi setelah versi berubah. Katalog dasar
+    (dan index-nya) hanya dibangun ulang jika menu.json berubah; jika
+    hanya overlay yang berubah, cukup view outlet yang dibangun ulang.
+    """
+    global base_catalog, catalogs
+    global _menu_loaded_mtimes
+
+    with _menu_reload_lock:
+        mtimes = catalog_mtimes()
+        base = base_catalog
+
+        # Index dibangun dulu sampai selesai, baru di-swap bersama menu
+        # Request yang sedang berjalan tetap memakai katalog lama
+        if mtimes.get("") != _menu_loaded_mtimes.get(""):
+            base = CatalogView(*load_menu())
+        new_catalogs = build_catalogs(base)
+
+        old_catalogs = catalogs
+        base_catalog, catalogs = base, new_catalogs
+        _menu_loaded_mtimes = mtimes
+
+        publish_availability_changes(old_catalogs, new_catalogs)
+
+
+def publish_availability_changes(old_catalogs, new_catalogs):
+    """
+    Kirim event SSE untuk setiap item yang berubah status habis / tersedia
+
+    Dipanggil setelah reload (termasuk reload karena overlay diubah
+    worker lain), jadi tablet di semua worker ikut ter-update.
+    """
+    for outlet, view in new_catalogs.items():
+        old = old_catalogs.get(outlet)
+        before = old.unavailable if old is not None else frozenset()
+
+        for item_id in sorted(before ^ view.unavailable):
+            availability_broker.publish(
+                outlet,
+                "availability",
+                {
+                    "outlet": outlet,
+                    "version": view.version,
+                    "id": item_id,
+                    "available": item_id not in view.unavailable,
+                },
+            )
+
+
+@app.before_request
+def check_menu_reload():
+    """
+    Reload menu otomatis jika data/menu.json atau overlay outlet berubah
+
+    File hanya di-stat paling sering sekali per MENU_RELOAD_INTERVAL
+    detik, jadi hampir tidak ada biaya per request.
+    """
+    global _menu_checked_at
+
+    now = time.monotonic()
+    if now - _menu_checked_at < app.config["MENU_RELOAD_INTERVAL"]:
+        return
+
+    _menu_checked_at = now
+    if catalog_mtimes() != _menu_loaded_mtimes:
+        reload_menu()
+
+
+# ========================================================================
+# HELPER FUNCTIONS - FRAGMENT CACHE MENU
+# ========================================================================
+
+# versi katalog (per outlet) -> Markup HTML grid menu
+_menu_grid_cache = {}
+_menu_grid_lock = threading.Lock()
+
+# Hash isi file template, dihitung sekali (lihat template_version)
+_template_version = None
+
+
+def render_menu_grid():
+    """
+    Render grid menu (templates/_menu_grid.html) sekali per versi katalog
+
+    Grid menu identik untuk semua kasir di outlet yang sama, jadi nested
+    loop Jinja cukup dijalankan sekali per outlet. Request berikutnya
+    memakai HTML dari cache.
+
+    Returns:
+        Markup: HTML grid menu (aman di-insert tanpa escape)
+    """
+    catalog = current_catalog()
+    grid = _menu_grid_cache.get(catalog.version)
+
+    if grid is None:
+        grid = Markup(render_template("_menu_grid.html", menu=catalog.menu))
+
+        # Simpan hanya versi yang masih dipakai, versi lama tidak akan
+        # dipakai lagi. Prune di dalam lock: thread lain bisa sedang
+        # menambah versi baru ke dict yang sama
+        live = {view.version for view in catalogs.values()}
+        with _menu_grid_lock:
+            for version in [v for v in _menu_grid_cache if v not in live]:
+                del _menu_grid_cache[version]
+            _menu_grid_cache[catalog.version] = grid
+
+    return grid
+
+
+def template_version():
+    """
+    Hash dari isi template halaman index (untuk ETag)
+
+    Berubah hanya saat deploy template baru, dan sama di semua worker.
+    """
+    global _template_version
+
+    if _template_version is None:
+        digest = hashlib.sha1()
+        for name in ("index.html", "_menu_grid.html"):
+            source, _, _ = app.jinja_loader.get_source(app.jinja_env, name)
+            digest.update(source.encode("utf-8"))
+        _template_version = digest.hexdigest()[:16]
+
+    return _template_version
+
+
+# ========================================================================
+# HELPER FUNCTIONS - PERHITUNGAN FINANSIAL
+# ========================================================================
+
+
+def hitung_total(subtotal):
+    """
+    Menghitung diskon, PPN, dan total akhir berdasarkan subtotal
+
+    Alur perhitungan sesuai aturan perpajakan Indonesia:
+    1. Hitung diskon dari subtotal
+    2. Kurangi subtotal dengan diskon = DPP (Dasar Pengenaan Pajak)
+    3. Hitung PPN dari DPP (BUKAN dari subtotal!)
+    4. Total = DPP + PPN
+
+    Args:
+        subtotal (int/float): Total harga semua item sebelum diskon dan pajak
+
+    Returns:
+        tuple: (diskon, ppn, total) - semua dalam format integer (Rupiah)
+
+    Contoh:
+        subtotal = 100000
+        diskon, ppn, total = hitung_total(100000)
+        # diskon = 10000 (10% dari 100000)
+        # dpp = 90000 (100000 - 10000)
+        # ppn = 9000 (10% dari 90000)
+        # total = 99000 (90000 + 9000)
+    """
+
+    # Konversi subtotal ke Decimal untuk perhitungan akurat
+    # str() diperlukan untuk menghindari floating point error
+    # Decimal("100.50") lebih akurat dari Decimal(100.50)
+    subtotal = Decimal(str(subtotal))
+
+    # STEP 1: Hitung diskon 10% dari subtotal
+    # Contoh: Rp 100.000 × 10% = Rp 10.000
+    # int() untuk convert ke integer karena Rupiah tidak ada sen
+    diskon = int(subtotal * DISKON)
+
+    # STEP 2: Hitung DPP (Dasar Pengenaan Pajak)
+    # DPP = Subtotal dikurangi diskon
+    # Ini adalah harga yang akan dikenakan pajak
+    # Contoh: Rp 100.000 - Rp 10.000 = Rp 90.000
+    dpp = subtotal - diskon
+
+    # STEP 3: Hitung PPN 10% dari DPP (PENTING: dari DPP, bukan subtotal!)
+    # Sesuai aturan perpajakan, pajak dihitung SETELAH diskon
+    # Contoh: Rp 90.000 × 10% = Rp 9.000
+    ppn = int(dpp * PAJAK)
+
+    # STEP 4: Hitung total yang harus dibayar
+    # Total = DPP + PPN (harga setelah diskon + pajak)
+    # Contoh: Rp 90.000 + Rp 9.000 = Rp 99.000
+    total = dpp + ppn
+
+    # Return tuple berisi 3 nilai: diskon, ppn, dan total
+    # Semua di-convert ke int karena Rupiah tidak menggunakan desimal
+    return int(diskon), int(ppn), int(total)
+
+
+def calculate_totals(cart):
+    """
+    Menghitung semua total yang ada di keranjang belanja
+
+    Fungsi wrapper yang menggabungkan:
+    1. Perhitungan subtotal dari semua item di cart
+    2. Perhitungan diskon, PPN, dan total menggunakan hitung_total()
+
+    Args:
+        cart (list): List of dictionaries, setiap item memiliki keys:
+                    - id: ID unik item
+                    - nama: Nama menu
+                    - price: Harga per item
+                    - qty: Jumlah quantity yang dipesan
+                    - subtotal: price × qty
+
+    Returns:
+        tuple: (subtotal, diskon, ppn, total) - semua dalam integer
+
+    Contoh cart:
+        [
+            {"id": 1, "nama": "Nasi Goreng", "price": 25000, "qty": 2, "subtotal": 50000},
+            {"id": 2, "nama": "Es Teh", "price": 5000, "qty": 3, "subtotal": 15000}
+        ]
+
+        Hasil:
+        subtotal = 65000  (50000 + 15000)
+        diskon = 6500     (10% dari 65000)
+        ppn = 5850        (10% dari 58500)
+        total = 64350     (58500 + 5850)
+    """
+
+    # Hitung subtotal dengan cara:
+    # 1. Loop setiap item di cart
+    # 2. Kalikan price × qty untuk setiap item
+    # 3. Jumlahkan semua hasil perkalian menggunakan sum()
+    #
+    # Generator expression (... for item in cart) lebih efisien dari loop biasa
+    # karena tidak membuat list intermediate di memory
+    #
+    # Contoh:
+    # Item 1: 25000 × 2 = 50000
+    # Item 2: 5000 × 3 = 15000
+    # Subtotal = 50000 + 15000 = 65000
+    subtotal = sum(int(item["price"]) * int(item["qty"]) for item in cart)
+
+    # Panggil fungsi hitung_total untuk mendapatkan diskon, ppn, dan total
+    # Fungsi ini menerapkan semua logic perpajakan yang kompleks
+    diskon, ppn, total = hitung_total(subtotal)
+
+    # Return semua nilai dalam satu tuple
+    # Tuple ini akan di-unpack di tempat lain untuk update display
+    return subtotal, diskon, ppn, total
+
+
+# ========================================================================
+# HELPER FUNCTIONS - PENCARIAN DATA
+# ========================================================================
+
+
+def find_item_in_cart(cart, item_id):
+    """
+    Mencari item di keranjang belanja berdasarkan ID
+
+    Fungsi ini digunakan untuk operasi:
+    - PLUS: Cari item dulu sebelum tambah qty
+    - MINUS: Cari item dulu sebelum kurangi qty
+    - REMOVE: Cari item dulu sebelum hapus dari cart
+
+    Args:
+        cart (list): List of line [item_id, qty] dalam cart (dari session)
+        item_id (str/int): ID item yang ingin dicari
+
+    Returns:
+        list: Reference ke line [item_id, qty] yang ditemukan (bukan copy!)
+        None: Jika item dengan ID tersebut tidak ada di cart
+
+    Important Notes:
+        - Return adalah REFERENCE, bukan copy
+        - Perubahan pada return value akan affect cart langsung
+        - Tidak perlu save lagi ke session setelah modify
+
+    Contoh penggunaan:
+        line = find_item_in_cart(cart, "5")
+        if line:
+            line[CART_QTY] += 1  # Langsung mengubah qty di cart
+        else:
+            print("Item tidak ditemukan")
+    """
+
+    # Loop setiap line yang ada di keranjang
+    for line in cart:
+        # Bandingkan ID sebagai string untuk menghindari type mismatch
+        # ID bisa datang sebagai:
+        # - int dari JSON parsing ({"id": 5})
+        # - string dari form POST (request.form["id"] = "5")
+        #
+        # Dengan convert keduanya ke string, kita pastikan perbandingan akurat
+        # str(5) == str("5") → "5" == "5" → True
+        if line[CART_ID] == str(item_id):
+            # Item ditemukan!
+            # Return reference ke line (bukan copy)
+            # Ini adalah Python feature: objects di-pass by reference
+            return line
+
+    # Loop selesai tapi tidak ada yang match
+    # Return None untuk indicate "not found"
+    # Caller bisa cek dengan: if item: atau if item is None:
+    return None
+
+
+def find_menu_item(item_id):
+    """
+    Mencari item di database menu berdasarkan ID
+
+    Fungsi ini dipanggil saat user klik "Add to Cart"
+    Kita hanya punya ID dari button, perlu ambil data lengkap dari menu database
+
+    Item di-resolve di katalog outlet yang dipilih session, jadi harga
+    yang dipakai adalah harga outlet tersebut (lihat CatalogView).
+
+    Args:
+        item_id (str/int): ID item yang ingin dicari
+
+    Returns:
+        MenuItem: Data item lengkap dari menu dengan field:
+              - id: ID unik item
+              - nama: Nama menu
+              - price: Harga per item
+              - img: Path ke gambar menu
+              - kategori: Kategori menu
+        None: Jika item tidak ditemukan di database menu
+
+    Struktur menu database:
+        {
+            "makanan": [
+                {"id": 1, "nama": "Nasi Goreng", "price": 25000, "img": "nasi_goreng.jpg"},
+                {"id": 2, "nama": "Mie Goreng", "price": 20000, "img": "mie_goreng.jpg"}
+            ],
+            "minuman": [
+                {"id": 10, "nama": "Es Teh", "price": 5000, "img": "es_teh.jpg"},
+                {"id": 11, "nama": "Es Jeruk", "price": 7000, "img": "es_jeruk.jpg"}
+            ],
+            "snack": [...]
+        }
+
+    Contoh penggunaan:
+        menu_data = find_menu_item("1")
+        if menu_data:
+            add_to_cart(cart, menu_data)
+    """
+
+    # Lookup O(1) di hash index (dibangun saat menu di-load)
+    # ID dibandingkan sebagai string (alasan sama seperti find_item_in_cart)
+    #
+    # Return None jika:
+    # - ID invalid/tidak ada di database
+    # - Item tidak dijual di outlet ini
+    # - Ada bug di frontend yang kirim ID salah
+    return current_catalog().get(item_id)
+
+
+def find_menu_item_by_code(code):
+    """
+    Mencari item menu berdasarkan barcode / PLU hasil scan
+
+    Kode yang tidak terdaftar sebagai barcode / PLU dicoba sebagai ID
+    item, sehingga label berisi kode item (contoh "Mkn001") tetap bisa
+    di-scan.
+
+    Returns:
+        MenuItem: Data item menu
+        None: Jika kode tidak dikenal
+    """
+    return current_catalog().get_by_code(str(code).strip())
+
+
+# ========================================================================
+# HELPER FUNCTION - UPDATE SESSION CART
+# ========================================================================
+
+
+# Cart di session hanya menyimpan REFERENSI ke item menu:
+# setiap line = [item_id, qty], contoh [["Mkn001", 2], ["Mn003", 1]]
+# nama, img, dan price TIDAK di-copy, tapi diambil dari katalog saat
+# dibutuhkan (expand_cart). Cookie session jadi kecil dan tidak ada
+# duplikasi string per cart.
+CART_ID = 0
+CART_QTY = 1
+
+
+def get_cart():
+    """
+    Mengambil cart dari session dalam format [[item_id, qty], ...]
+
+    Cart format lama (list of dict lengkap) dari session sebelum update
+    otomatis di-convert ke format baru.
+    """
+    cart = session.get("jumlahcart", [])
+
+    return [
+        [str(line["id"]), int(line["qty"])] if isinstance(line, dict) else line
+        for line in cart
+    ]
+
+
+def expand_cart(cart):
+    """
+    Mengubah cart [[item_id, qty], ...] menjadi line lengkap untuk response
+
+    Data item (nama, price, img) diambil dari katalog outlet session.
+    Item yang sudah tidak ada di katalog (menu di-reload) dilewati.
+
+    Returns:
+        list: [{"id", "nama", "price", "img", "qty", "subtotal"}, ...]
+              Format sama seperti yang dipakai main.js dan calculate_totals
+    """
+    lines = []
+    catalog = current_catalog()  # sekali per cart, bukan per line
+
+    for item_id, qty in cart:
+        item = catalog.get(item_id)
+        if item is None:
+            continue
+
+        lines.append(
+            {
+                "id": item.id,  # ID unik item
+                "nama": item.nama,  # Nama menu
+                "price": item.price,  # Harga per item
+                "img": item.img,  # Path gambar
+                "qty": qty,  # Quantity
+                "subtotal": item.price * qty,  # price × qty
+            }
+        )
+
+    return lines
+
+
+def cart_json(lines):
+    """
+    Line cart (hasil expand_cart) untuk response JSON
+
+    Hasilnya satu JSONFragment berisi array line: bagian statis setiap
+    item (id, img, nama, price) diambil dari cache MenuItem.cart_json,
+    tidak di-encode ulang per request. Bytes hasilnya sama dengan
+    meng-encode lines langsung.
+
+    Dengan orjson, lines dikembalikan apa adanya: orjson meng-encode
+    dict line lebih cepat daripada menyusun fragment di Python.
+    """
+    if orjson is not None:
+        return lines
+
+    catalog = current_catalog()
+    encoded = []
+
+    for line in lines:
+        item = catalog.get(line["id"])
+        if item is None or item.price != line["price"]:
+            # Katalog berubah di tengah request: encode line apa adanya
+            encoded.append(encode_json(line))
+            continue
+        encoded.append(item.cart_json(line["qty"]))
+
+    return JSONFragment(b"[" + b",".join(encoded) + b"]")
+
+
+def add_to_cart(cart, menu_item, qty=1):
+    """
+    Menambahkan item menu ke cart sebanyak qty
+
+    Jika item sudah ada di cart, qty-nya ditambah.
+    Jika belum, dibuat line baru [item_id, qty].
+
+    Args:
+        cart (list): Cart dari get_cart() (dimodifikasi langsung)
+        menu_item (MenuItem): Data item dari find_menu_item / scan
+        qty (int): Jumlah yang ditambahkan
+    """
+    target = find_item_in_cart(cart, menu_item.id)
+
+    if target:
+        target[CART_QTY] += qty
+        return
+
+    cart.append([menu_item.id, qty])
+
+
+def update_session_cart(cart):
+    """
+    Menyimpan cart ke session dan menghitung total quantity
+
+    Fungsi ini dipanggil setiap kali ada perubahan pada cart untuk:
+    1. Persist data ke server-side session
+    2. Menghitung total items untuk badge counter
+    3. Mark session sebagai modified (penting untuk Flask session)
+
+    Args:
+        cart (list): List of line [item_id, qty] di cart
+
+    Important Notes:
+        - session.modified = True WAJIB dipanggil
+        - Tanpa ini, perubahan pada list/dict tidak akan tersimpan
+        - Ini adalah common pitfall dalam Flask session management
+    """
+
+    # Simpan cart ke session dengan key "jumlahcart"
+    # Data ini akan persist selama session aktif (hingga browser close)
+    session["jumlahcart"] = cart
+
+    # Hitung total quantity dari semua item untuk badge counter
+    # sum() dengan generator expression lebih efisien daripada loop
+    # Contoh: jika cart punya 3 items dengan qty [2, 1, 3]
+    # maka cart_count = 2 + 1 + 3 = 6
+    session["cart_count"] = sum(line[CART_QTY] for line in cart)
+
+    # Cart berubah = transaksi yang sudah di-checkout tidak berlaku lagi
+    # Struk berikutnya harus dari checkout baru (trx_id baru)
+    session.pop("pembeli", None)
+
+    # CRITICAL: Mark session as modified
+    # Flask session menggunakan signed cookies yang hanya diupdate jika modified
+    # Tanpa ini, perubahan pada mutable objects (list/dict) tidak tersimpan
+    # Ini adalah best practice untuk semua session modifications
+    session.modified = True
+
+
+# ========================================================================
+# HELPER CLASS - PESANAN PARKIR (OPEN ORDERS PER KASIR)
+# ========================================================================
+
+# Batas jumlah pesanan parkir per kasir & panjang nama pesanan
+PARKED_ORDERS_MAX = 50
+ORDER_NAME_MAX_LENGTH = 40
+
+
+class ParkedOrderStore:
+    """
+    Penyimpanan pesanan yang diparkir (contoh: per nomor meja)
+
+    Hanya pesanan AKTIF yang ada di session (jumlahcart). Pesanan lain
+    disimpan di SQLite, bukan di cookie, sehingga cookie tidak membesar
+    dengan setiap meja yang masih terbuka, dan /cart/update hanya
+    memproses cart aktif.
+
+    Tabel parked_orders memakai PRIMARY KEY (email, name):
+        - Ganti pesanan: 1 lookup + 1 delete via primary key
+        - List pesanan: range scan per email (tanpa decode isi cart,
+          jumlah item disimpan di kolom sendiri)
+
+    Parkir & ambil pesanan dilakukan dalam SATU transaksi (swap), jadi
+    cart tidak bisa hilang atau dobel walaupun request datang bersamaan
+    dari beberapa worker.
+    """
+
+    def __init__(self):
+        # Path database yang tabelnya sudah dibuat oleh proses ini
+        self._ready = set()
+
+    def _connect(self):
+        conn = connect_db()
+        db_path = app.config["DATABASE"]
+
+        if db_path not in self._ready:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS parked_orders ("
+                "email TEXT NOT NULL, name TEXT NOT NULL, cart TEXT NOT NULL, "
+                "item_count INTEGER NOT NULL, updated REAL NOT NULL, "
+                "PRIMARY KEY (email, name))"
+            )
+            self._ready.add(db_path)
+
+        return conn
+
+    def list(self, email):
+        """
+        Returns:
+            list: [{"name": "Meja 5", "count": 3, "updated": 1733650000.0}, ...]
+                  Urut dari yang paling lama diparkir
+        """
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT name, item_count, updated FROM parked_orders "
+                "WHERE email = ? ORDER BY updated",
+                (email,),
+            ).fetchall()
+        finally:
+            conn.close()
+
+        return [{"name": name, "count": count, "updated": updated} for name, count, updated in rows]
+
+    def swap(self, email, park=None, take=None):
+        """
+        Parkir cart aktif dan/atau ambil pesanan parkir (satu transaksi)
+
+        Args:
+            email (str): Kasir pemilik pesanan
+            park (tuple/None): (name, cart) cart aktif yang diparkir
+            take (str/None): Nama pesanan parkir yang dijadikan aktif
+
+        Returns:
+            list/None: Cart pesanan yang diambil ([[item_id, qty], ...])
+
+        Raises:
+            ValueError: Nama pesanan sudah dipakai / pesanan terlalu banyak
+            LookupError: Pesanan yang diambil tidak ada
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if take is not None:
+                    row = conn.execute(
+                        "SELECT cart FROM parked_orders WHERE email = ? AND name = ?",
+                        (email, take),
+                    ).fetchone()
+                    if row is None:
+                        raise LookupError(f"Pesanan {take} tidak ditemukan")
+                    conn.execute(
+                        "DELETE FROM parked_orders WHERE email = ? AND name = ?",
+                        (email, take),
+                    )
+
+                if park is not None:
+                    name, cart = park
+                    (total,) = conn.execute(
+                        "SELECT COUNT(*) FROM parked_orders WHERE email = ?", (email,)
+                    ).fetchone()
+                    if total >= PARKED_ORDERS_MAX:
+                        raise ValueError("Pesanan parkir terlalu banyak")
+
+                    try:
+                        conn.execute(
+                            "INSERT INTO parked_orders VALUES (?, ?, ?, ?, ?)",
+                            (
+                                email,
+                                name,
+                                json.dumps(cart, separators=(",", ":")),
+                                sum(line[CART_QTY] for line in cart),
+                                time.time(),
+                            ),
+                        )
+                    except sqlite3.IntegrityError:
+                        raise ValueError(f"Nama pesanan {name} sudah dipakai")
+
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+
+        return json.loads(row[0]) if take is not None else None
+
+
+parked_orders = ParkedOrderStore()
+
+
+# ========================================================================
+# HELPER CLASS - STOK / INVENTORY
+# ========================================================================
+
+# Reservasi stok di cart dilepas jika session tidak aktif selama ini
+# (sama dengan umur session login)
+app.config["STOCK_RESERVATION_TTL"] = 3600
+
+# Interval (detik) pembersihan reservasi yang kadaluarsa
+app.config["STOCK_SWEEP_INTERVAL"] = 30
+
+# Umur (detik) cache level stok per proses & jumlah shard cache
+STOCK_CACHE_TTL = 1.0
+STOCK_CACHE_SHARDS = 16
+
+# Penanda "tidak ada di cache" (None = item tidak dihitung stoknya)
+_STOCK_MISSING = object()
+
+
+class OutOfStock(Exception):
+    """Stok tidak cukup untuk item-item di self.items (list item_id)"""
+
+    def __init__(self, items):
+        super().__init__(f"Stok tidak cukup: {', '.join(items)}")
+        self.items = items
+
+
+class StockCache:
+    """
+    Cache level stok per proses, dibagi ke beberapa shard
+
+    Setiap shard punya dict & lock sendiri, jadi thread yang membaca
+    item berbeda (hampir selalu) tidak saling menunggu satu lock.
+
+    Cache hanya dipakai sebagai jalan pintas, bukan sumber kebenaran:
+        - Item tanpa stok (tidak di-track): reserve() tidak query SQLite
+        - Item yang sudah habis: langsung ditolak tanpa transaksi
+    Entry berumur maksimal STOCK_CACHE_TTL detik, setelah itu dibaca
+    ulang dari SQLite (perubahan dari worker lain ikut terbaca).
+
+    Karena bisa basi, commit() dan release() TIDAK memakai cache untuk
+    memutuskan apakah item di-track: item yang mulai di-track worker
+    lain selama window TTL tetap dipotong stoknya saat checkout.
+    """
+
+    def __init__(self, shards=STOCK_CACHE_SHARDS, ttl=STOCK_CACHE_TTL):
+        self.ttl = ttl
+        self._shards = [({}, threading.Lock()) for _ in range(shards)]
+
+    def _shard(self, key):
+        return self._shards[hash(key) % len(self._shards)]
+
+    def get(self, key):
+        data, lock = self._shard(key)
+        with lock:
+            entry = data.get(key)
+        if entry is None or time.monotonic() - entry[1] > self.ttl:
+            return _STOCK_MISSING
+        return entry[0]
+
+    def set(self, key, available):
+        data, lock = self._shard(key)
+        with lock:
+            data[key] = (available, time.monotonic())
+
+    def invalidate(self, key):
+        data, lock = self._shard(key)
+        with lock:
+            data.pop(key, None)
+
+
+class InventoryStore:
+    """
+    Stok per item per outlet, dengan reservasi per session kasir
+
+    Tabel:
+        stock(outlet, item_id, available)
+            Hanya item yang di-track punya baris. Item tanpa baris =
+            stok tidak dibatasi (menu lama tetap jalan seperti biasa).
+        stock_reservations(sid, outlet, item_id, qty, expires)
+            Stok yang sedang "dipegang" cart session sid.
+
+    Alur:
+        - Add ke cart: reserve() memindahkan stok available → reservasi
+          dengan UPDATE bersyarat (available >= qty). Tidak ada
+          read-modify-write, jadi dua kasir tidak bisa mengambil unit
+          yang sama walaupun beda worker.
+        - Checkout: commit() menghapus reservasi (stok sudah berkurang).
+          Jika reservasi kurang (session lama / sudah kadaluarsa),
+          kekurangannya diambil langsung dari stok di transaksi yang sama.
+        - Minus / remove / clear / logout / kadaluarsa: release()
+          mengembalikan reservasi ke stok.
+
+    Semua transaksi pendek (beberapa statement via primary key), lock
+    tulis SQLite hanya dipegang sebentar.
+    """
+
+    def __init__(self):
+        self.cache = StockCache()
+        self._ready = set()
+
+    def _connect(self):
+        conn = connect_db()
+        db_path = app.config["DATABASE"]
+
+        if db_path not in self._ready:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS stock ("
+                "outlet TEXT NOT NULL, item_id TEXT NOT NULL, "
+                "available INTEGER NOT NULL CHECK (available >= 0), "
+                "PRIMARY KEY (outlet, item_id))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS stock_reservations ("
+                "sid TEXT NOT NULL, outlet TEXT NOT NULL, item_id TEXT NOT NULL, "
+                "qty INTEGER NOT NULL, expires REAL NOT NULL, "
+                "PRIMARY KEY (sid, outlet, item_id))"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS stock_reservations_expires "
+                "ON stock_reservations (expires)"
+            )
+            self._ready.add(db_path)
+
+        return conn
+
+    def _expires(self):
+        return time.time() + app.config["STOCK_RESERVATION_TTL"]
+
+    def level(self, outlet, item_id):
+        """
+        Returns:
+            int: Stok available (belum di-reserve)
+            None: Item tidak di-track (stok tidak dibatasi)
+        """
+        key = (outlet, item_id)
+        available = self.cache.get(key)
+        if available is not _STOCK_MISSING:
+            return available
+
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT available FROM stock WHERE outlet = ? AND item_id = ?", key
+            ).fetchone()
+        finally:
+            conn.close()
+
+        available = row[0] if row else None
+        self.cache.set(key, available)
+        return available
+
+    def levels(self, outlet):
+        """Semua item yang di-track di outlet: {item_id: available}"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT item_id, available FROM stock WHERE outlet = ?", (outlet,)
+            ).fetchall()
+        finally:
+            conn.close()
+        return dict(rows)
+
+    def set_level(self, outlet, item_id, available):
+        """Set stok available item (None = berhenti men-track stok item)"""
+        conn = self._connect()
+        try:
+            if available is None:
+                conn.execute(
+                    "DELETE FROM stock WHERE outlet = ? AND item_id = ?",
+                    (outlet, item_id),
+                )
+            else:
+                conn.execute(
+                    "INSERT INTO stock (outlet, item_id, available) VALUES (?, ?, ?) "
+                    "ON CONFLICT (outlet, item_id) DO UPDATE SET available = excluded.available",
+                    (outlet, item_id, available),
+                )
+        finally:
+            conn.close()
+        self.cache.set((outlet, item_id), available)
+
+    def reserve(self, sid, outlet, item_id, qty):
+        """
+        Reserve qty unit item untuk cart session sid
+
+        Raises:
+            OutOfStock: Stok available kurang dari qty
+        """
+        key = (outlet, item_id)
+        cached = self.cache.get(key)
+        if cached is None:
+            return  # Tidak di-track: tanpa query database
+        if cached is not _STOCK_MISSING and cached < qty:
+            raise OutOfStock([item_id])
+
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "UPDATE stock SET available = available - ? "
+                "WHERE outlet = ? AND item_id = ? AND available >= ? "
+                "RETURNING available",
+                (qty, outlet, item_id, qty),
+            ).fetchone()
+
+            if row is None:
+                conn.execute("ROLLBACK")
+                self.cache.invalidate(key)
+                if self.level(outlet, item_id) is None:
+                    return
+                raise OutOfStock([item_id])
+
+            expires = self._expires()
+            conn.execute(
+                "INSERT INTO stock_reservations (sid, outlet, item_id, qty, expires) "
+                "VALUES (?, ?, ?, ?, ?) ON CONFLICT (sid, outlet, item_id) "
+                "DO UPDATE SET qty = qty + excluded.qty",
+                (sid, outlet, item_id, qty, expires),
+            )
+            # Session masih aktif: semua reservasinya diperpanjang
+            conn.execute(
+                "UPDATE stock_reservations SET expires = ? WHERE sid = ?",
+                (expires, sid),
+            )
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+        self.cache.set(key, row[0])
+
+    def _release_rows(self, conn, rows):
+        # rows: [(outlet, item_id, qty)], dipanggil di dalam transaksi
+        for outlet, item_id, qty in rows:
+            conn.execute(
+                "UPDATE stock SET available = available + ? "
+                "WHERE outlet = ? AND item_id = ?",
+                (qty, outlet, item_id),
+            )
+            self.cache.invalidate((outlet, item_id))
+
+    def release(self, sid, outlet, lines):
+        """
+        Kembalikan reservasi cart ke stok
+
+        Args:
+            lines (list): [(item_id, qty), ...]. qty dibatasi jumlah
+                          yang benar-benar di-reserve session ini.
+        """
+        conn = self._connect()
+        try:
+            # Hanya item yang benar-benar punya reservasi (read tanpa lock
+            # tulis). Session bisa saja me-reserve lewat worker lain
+            reserved = {
+                row[0]
+                for row in conn.execute(
+                    "SELECT item_id FROM stock_reservations WHERE sid = ? AND outlet = ?",
+                    (sid, outlet),
+                )
+            }
+            lines = [line for line in lines if line[0] in reserved]
+            if not lines:
+                return
+
+            conn.execute("BEGIN IMMEDIATE")
+            released = []
+
+            for item_id, qty in lines:
+                row = conn.execute(
+                    "SELECT qty FROM stock_reservations "
+                    "WHERE sid = ? AND outlet = ? AND item_id = ?",
+                    (sid, outlet, item_id),
+                ).fetchone()
+                if row is None:
+                    continue
+
+                qty = min(qty, row[0])
+                conn.execute(
+                    "UPDATE stock_reservations SET qty = qty - ? "
+                    "WHERE sid = ? AND outlet = ? AND item_id = ?",
+                    (qty, sid, outlet, item_id),
+                )
+                released.append((outlet, item_id, qty))
+
+            conn.execute(
+                "DELETE FROM stock_reservations WHERE sid = ? AND qty <= 0", (sid,)
+            )
+            self._release_rows(conn, released)
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def release_all(self, sid):
+        """Kembalikan semua reservasi session (logout / session habis)"""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                "DELETE FROM stock_reservations WHERE sid = ? "
+                "RETURNING outlet, item_id, qty",
+                (sid,),
+            ).fetchall()
+            self._release_rows(conn, rows)
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def release_expired(self):
+        """Kembalikan reservasi yang kadaluarsa ke stok"""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                "DELETE FROM stock_reservations WHERE expires < ? "
+                "RETURNING outlet, item_id, qty",
+                (time.time(),),
+            ).fetchall()
+            self._release_rows(conn, rows)
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+        return len(rows)
+
+    def commit(self, sid, outlet, lines):
+        """
+        Checkout: jadikan reservasi cart sebagai stok terjual
+
+        Semua item diproses dalam SATU transaksi: jika ada yang stoknya
+        tidak cukup, tidak ada perubahan sama sekali.
+
+        Args:
+            lines (list): [(item_id, qty), ...] isi cart yang dibayar
+
+        Raises:
+            OutOfStock: Item yang reservasi + stok available-nya kurang
+        """
+        conn = self._connect()
+        try:
+            # Item yang tidak di-track tidak perlu transaksi tulis sama
+            # sekali. Dicek ke SQLite, bukan cache (lihat StockCache).
+            # Item yang mulai di-track setelah read ini: penjualan ini
+            # tercatat sebelum stok awalnya di-set, jadi tidak oversell
+            item_ids = [item_id for item_id, _ in lines]
+            tracked = {
+                row[0]
+                for row in conn.execute(
+                    "SELECT item_id FROM stock WHERE outlet = ? AND item_id IN "
+                    f"({', '.join('?' * len(item_ids))})",
+                    (outlet, *item_ids),
+                )
+            }
+            lines = [line for line in lines if line[0] in tracked]
+            if not lines:
+                return
+
+            conn.execute("BEGIN IMMEDIATE")
+            missing = []
+
+            for item_id, qty in lines:
+                row = conn.execute(
+                    "SELECT qty FROM stock_reservations "
+                    "WHERE sid = ? AND outlet = ? AND item_id = ?",
+                    (sid, outlet, item_id),
+                ).fetchone()
+                reserved = min(qty, row[0]) if row else 0
+
+                if reserved:
+                    conn.execute(
+                        "UPDATE stock_reservations SET qty = qty - ? "
+                        "WHERE sid = ? AND outlet = ? AND item_id = ?",
+                        (reserved, sid, outlet, item_id),
+                    )
+
+                need = qty - reserved
+                if need:
+                    updated = conn.execute(
+                        "UPDATE stock SET available = available - ? "
+                        "WHERE outlet = ? AND item_id = ? AND available >= ?",
+                        (need, outlet, item_id, need),
+                    ).rowcount
+                    if not updated and conn.execute(
+                        "SELECT 1 FROM stock WHERE outlet = ? AND item_id = ?",
+                        (outlet, item_id),
+                    ).fetchone():
+                        missing.append(item_id)
+
+                self.cache.invalidate((outlet, item_id))
+
+            if missing:
+                conn.execute("ROLLBACK")
+                raise OutOfStock(missing)
+
+            conn.execute(
+                "DELETE FROM stock_reservations WHERE sid = ? AND qty <= 0", (sid,)
+            )
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+
+inventory = InventoryStore()
+_stock_swept_at = time.monotonic()
+
+
+def session_id():
+    """ID acak per session login (pemilik reservasi stok)"""
+    if "sid" not in session:
+        session["sid"] = secrets.token_urlsafe(16)
+    return session["sid"]
+
+
+@app.before_request
+def sweep_stock_reservations():
+    """
+    Kembalikan reservasi stok yang kadaluarsa (session ditinggal)
+
+    Dijalankan paling sering sekali per STOCK_SWEEP_INTERVAL detik.
+    """
+    global _stock_swept_at
+
+    now = time.monotonic()
+    if now - _stock_swept_at < app.config["STOCK_SWEEP_INTERVAL"]:
+        return
+
+    _stock_swept_at = now
+    try:
+        inventory.release_expired()
+    except sqlite3.Error as e:
+        app.logger.error(f"Error in sweep_stock_reservations: {str(e)}")
+
+
+def release_session_stock():
+    """Lepas semua reservasi stok session (dipanggil sebelum session.clear)"""
+    if "sid" not in session:
+        return
+    try:
+        inventory.release_all(session["sid"])
+    except sqlite3.Error as e:
+        app.logger.error(f"Error in release_session_stock: {str(e)}")
+
+
+# ========================================================================
+# HELPER CLASS - SHIFT KASIR (REKAP LACI UANG)
+# ========================================================================
+
+# Kolom total berjalan per shift (semua dalam rupiah, int)
+SHIFT_TOTALS = ("subtotal", "diskon", "ppn", "sales", "cash_in", "change_out")
+
+
+class ShiftStore:
+    """
+    Shift kasir (buka / tutup) dengan total berjalan di SQLite
+
+    Setiap checkout menambah total shift yang sedang buka dengan SATU
+    UPDATE (trx_count + 1, sales + total, cash_in + cash, ...), jadi
+    laporan tutup shift tidak perlu membaca ulang transaksi hari itu:
+    uang seharusnya di laci = opening_cash + cash_in - change_out.
+
+    Satu kasir hanya boleh punya satu shift terbuka (unique index
+    parsial pada email WHERE closed IS NULL).
+    """
+
+    COLUMNS = (
+        ("id", "outlet", "email", "opened", "closed", "opening_cash", "trx_count")
+        + SHIFT_TOTALS
+        + ("expected_cash", "counted_cash")
+    )
+
+    def __init__(self):
+        # Path database yang tabelnya sudah dibuat oleh proses ini
+        self._ready = set()
+
+    def _connect(self):
+        conn = connect_db()
+        db_path = app.config["DATABASE"]
+
+        if db_path not in self._ready:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS shifts ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "outlet TEXT NOT NULL, email TEXT NOT NULL, "
+                "opened REAL NOT NULL, closed REAL, "
+                "opening_cash INTEGER NOT NULL, trx_count INTEGER NOT NULL DEFAULT 0, "
+                + "".join(f"{column} INTEGER NOT NULL DEFAULT 0, " for column in SHIFT_TOTALS)
+                + "expected_cash INTEGER, counted_cash INTEGER)"
+            )
+            conn.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS shifts_open "
+                "ON shifts (email) WHERE closed IS NULL"
+            )
+            self._ready.add(db_path)
+
+        return conn
+
+    def _row(self, row):
+        if row is None:
+            return None
+        shift = dict(zip(self.COLUMNS, row))
+        if shift["expected_cash"] is None:
+            shift["expected_cash"] = (
+                shift["opening_cash"] + shift["cash_in"] - shift["change_out"]
+            )
+        return shift
+
+    def current(self, email):
+        """
+        Returns:
+            dict/None: Shift terbuka kasir (dengan expected_cash saat ini)
+        """
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM shifts "
+                "WHERE email = ? AND closed IS NULL",
+                (email,),
+            ).fetchone()
+        finally:
+            conn.close()
+
+        return self._row(row)
+
+    def open(self, email, outlet, opening_cash):
+        """
+        Buka shift baru
+
+        Raises:
+            ValueError: Kasir masih punya shift terbuka
+        """
+        conn = self._connect()
+        try:
+            try:
+                conn.execute(
+                    "INSERT INTO shifts (outlet, email, opened, opening_cash) "
+                    "VALUES (?, ?, ?, ?)",
+                    (outlet, email, time.time(), opening_cash),
+                )
+            except sqlite3.IntegrityError:
+                raise ValueError("Shift sebelumnya belum ditutup")
+        finally:
+            conn.close()
+
+        return self.current(email)
+
+    def record(self, email, outlet, subtotal, diskon, ppn, total, cash, kembalian):
+        """
+        Tambahkan satu transaksi ke total shift terbuka kasir (O(1))
+
+        Jika kasir belum membuka shift, shift dibuka otomatis dengan
+        modal awal 0 (transaksi tidak boleh hilang dari rekap).
+        """
+        values = (subtotal, diskon, ppn, total, cash, kembalian)
+        assignments = ", ".join(f"{column} = {column} + ?" for column in SHIFT_TOTALS)
+
+        conn = self._connect()
+        try:
+            while True:
+                updated = conn.execute(
+                    f"UPDATE shifts SET trx_count = trx_count + 1, {assignments} "
+                    "WHERE email = ? AND closed IS NULL",
+                    values + (email,),
+                ).rowcount
+                if updated:
+                    return
+
+                # Shift belum ada: buka, lalu ulangi UPDATE. Jika request
+                # lain membuka shift lebih dulu, INSERT diabaikan.
+                conn.execute(
+                    "INSERT INTO shifts (outlet, email, opened, opening_cash) "
+                    "VALUES (?, ?, ?, 0) ON CONFLICT DO NOTHING",
+                    (outlet, email, time.time()),
+                )
+        finally:
+            conn.close()
+
+    def close(self, email, counted_cash):
+        """
+        Tutup shift terbuka kasir
+
+        expected_cash dibekukan di statement yang sama dengan penutupan,
+        jadi checkout yang berjalan bersamaan masuk ke shift ini ATAU ke
+        shift berikutnya, tidak pernah hilang.
+
+        Returns:
+            dict/None: Shift yang ditutup, None jika tidak ada shift terbuka
+        """
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "UPDATE shifts SET closed = ?, counted_cash = ?, "
+                "expected_cash = opening_cash + cash_in - change_out "
+                "WHERE email = ? AND closed IS NULL "
+                f"RETURNING {', '.join(self.COLUMNS)}",
+                (time.time(), counted_cash, email),
+            ).fetchone()
+        finally:
+            conn.close()
+
+        return self._row(row)
+
+
+shifts = ShiftStore()
+
+
+# ========================================================================
+# HELPER CLASS - JURNAL & ARSIP TRANSAKSI (KOLOM, MMAP)
+# ========================================================================
+
+# Folder arsip transaksi (file segmen kolom, read-only setelah ditulis)
+app.config["ARCHIVE_DIR"] = "data/archive"
+
+# Transaksi lebih tua dari ini (detik) dipindah dari jurnal ke arsip
+# oleh "flask --app main archive-transactions" (jalankan via cron)
+app.config["ARCHIVE_AFTER"] = 24 * 3600
+
+# Maksimal transaksi per file segmen
+ARCHIVE_SEGMENT_MAX_TRX = 200000
+
+ARCHIVE_MAGIC = b"KSRARC1\n"
+
+
+class TransactionJournal:
+    """
+    Jurnal transaksi selesai (satu baris per checkout) di SQLite
+
+    Menyimpan snapshot checkout (session["pembeli"]) apa adanya, plus
+    kolom total dari hitung_total (subtotal, diskon, ppn, total), cash,
+    dan kembalian untuk query. Baris lama dipindah ke arsip kolom
+    (TransactionArchive), jadi jurnal hanya berisi transaksi terbaru.
+    """
+
+    def __init__(self):
+        # Path database yang tabelnya sudah dibuat oleh proses ini
+        self._ready = set()
+
+    def _connect(self):
+        conn = connect_db()
+        db_path = app.config["DATABASE"]
+
+        if db_path not in self._ready:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS trx_journal ("
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, trx_id TEXT NOT NULL UNIQUE, "
+                "outlet TEXT NOT NULL, email TEXT NOT NULL, waktu REAL NOT NULL, "
+                "subtotal INTEGER NOT NULL, diskon INTEGER NOT NULL, "
+                "ppn INTEGER NOT NULL, total INTEGER NOT NULL, "
+                "cash INTEGER NOT NULL, kembalian INTEGER NOT NULL, "
+                "pembeli TEXT NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS trx_journal_waktu ON trx_journal (waktu)"
+            )
+            self._ready.add(db_path)
+
+        return conn
+
+    def append(self, outlet, email, pembeli):
+        """
+        Catat satu transaksi
+
+        Args:
+            outlet (str): Kode outlet
+            email (str): Kasir
+            pembeli (dict): Snapshot transaksi dari checkout
+        """
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT INTO trx_journal (trx_id, outlet, email, waktu, subtotal, "
+                "diskon, ppn, total, cash, kembalian, pembeli) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    pembeli["trx_id"],
+                    outlet,
+                    email,
+                    pembeli["waktu"],
+                    pembeli["subtotal"],
+                    pembeli["diskon"],
+                    pembeli["ppn"],
+                    pembeli["total"],
+                    pembeli["cash"],
+                    pembeli["kembalian"],
+                    json.dumps(pembeli, separators=(",", ":")),
+                ),
+            )
+        finally:
+            conn.close()
+
+    def rows(self, after_seq=0, start=None, end=None, limit=None):
+        """
+        Transaksi di jurnal, urut seq
+
+        Args:
+            after_seq (int): Hanya seq > after_seq
+            start, end (float/None): Filter waktu [start, end)
+            limit (int/None): Maksimal jumlah baris
+
+        Returns:
+            list: [(seq, trx_id, outlet, email, waktu, subtotal, diskon,
+                    ppn, total, cash, kembalian, pembeli), ...]
+                  pembeli sudah di-decode (dict snapshot checkout)
+        """
+        sql = "SELECT * FROM trx_journal WHERE seq > ?"
+        params = [after_seq]
+        if start is not None:
+            sql += " AND waktu >= ?"
+            params.append(start)
+        if end is not None:
+            sql += " AND waktu < ?"
+            params.append(end)
+        sql += " ORDER BY seq"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        conn = self._connect()
+        try:
+            rows = conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+        return [row[:-1] + (json.loads(row[-1]),) for row in rows]
+
+    def get(self, trx_id):
+        """
+        Satu transaksi berdasarkan trx_id
+
+        Returns:
+            tuple: Baris seperti rows(), None jika tidak ada di jurnal
+                   (belum pernah tercatat atau sudah dipindah ke arsip)
+        """
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT * FROM trx_journal WHERE trx_id = ?", (trx_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+
+        if row is None:
+            return None
+        return row[:-1] + (json.loads(row[-1]),)
+
+    def scan(self, start=None, end=None, batch_size=500):
+        """
+        Generator semua transaksi dalam rentang waktu, per batch seq
+
+        Memory tetap kecil berapa pun jumlah transaksinya: setiap batch
+        query sendiri (lanjut dari seq terakhir), koneksi tidak ditahan
+        selama consumer memproses baris.
+
+        Yields:
+            tuple: Baris seperti rows()
+        """
+        after_seq = 0
+        while True:
+            batch = self.rows(after_seq, start, end, limit=batch_size)
+            yield from batch
+
+            if len(batch) < batch_size:
+                return
+            after_seq = batch[-1][0]
+
+    def delete_upto(self, seq):
+        """Hapus baris jurnal yang sudah ada di arsip (seq <= seq)"""
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM trx_journal WHERE seq <= ?", (seq,))
+        finally:
+            conn.close()
+
+
+class ArchiveSegment:
+    """
+    Satu file segmen arsip, di-mmap read-only
+
+    Layout file:
+        ARCHIVE_MAGIC
+        uint64 panjang header + header JSON (daftar item, range seq &
+        waktu, posisi setiap kolom)
+        kolom fixed-width (array native, rata 8 byte)
+
+    Kolom transaksi (urut waktu): ts, outlet, subtotal, diskon, ppn,
+    total, cash, kembalian, item_count, line_start.
+    Kolom line (urut transaksi): item (index ke header["items"]), qty, price.
+    Line transaksi ke-i = line_start[i] .. line_start[i + 1].
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap[: len(ARCHIVE_MAGIC)] != ARCHIVE_MAGIC:
+            raise ValueError(f"Bukan file arsip transaksi: {path}")
+
+        start = len(ARCHIVE_MAGIC)
+        (header_size,) = array.array("Q", self._mmap[start : start + 8])
+        self.header = json.loads(self._mmap[start + 8 : start + 8 + header_size])
+        if self.header["byteorder"] != sys.byteorder:
+            raise ValueError(f"Byte order arsip tidak cocok: {path}")
+
+    def column(self, name):
+        """memoryview kolom (tanpa copy)"""
+        typecode, offset, count = self.header["columns"][name]
+        size = array.array(typecode).itemsize
+        return memoryview(self._mmap)[offset : offset + count * size].cast(typecode)
+
+    def array(self, name):
+        """numpy array kolom (tanpa copy, read-only)"""
+        typecode, offset, count = self.header["columns"][name]
+        return numpy.frombuffer(
+            self._mmap, dtype=numpy.dtype(typecode), count=count, offset=offset
+        )
+
+
+class TransactionArchive:
+    """
+    Arsip transaksi kolom (fixed-width) untuk analitik
+
+    Agregasi (penjualan, PPN, rata-rata basket, item per jam, item
+    terlaris) adalah scan per kolom di memory-map: dengan numpy
+    tervektorisasi (sum / bincount), tanpa numpy memakai array stdlib.
+    Rentang waktu dicari dengan binary search di kolom ts (urut).
+    """
+
+    TRX_COLUMNS = (
+        ("ts", "q"),
+        ("outlet", "I"),
+        ("subtotal", "q"),
+        ("diskon", "q"),
+        ("ppn", "q"),
+        ("total", "q"),
+        ("cash", "q"),
+        ("kembalian", "q"),
+        ("item_count", "q"),
+        ("line_start", "q"),
+    )
+    LINE_COLUMNS = (("item", "I"), ("qty", "q"), ("price", "q"))
+
+    def __init__(self):
+        self._segments = {}
+        self._lock = threading.Lock()
+
+    def segments(self):
+        """Semua segmen di ARCHIVE_DIR (urut nama = urut seq)"""
+        directory = app.config["ARCHIVE_DIR"]
+        try:
+            names = sorted(
+                name for name in os.listdir(directory) if name.endswith(".col")
+            )
+        except FileNotFoundError:
+            return []
+
+        with self._lock:
+            segments = []
+            for name in names:
+                path = os.path.join(directory, name)
+                if path not in self._segments:
+                    self._segments[path] = ArchiveSegment(path)
+                segments.append(self._segments[path])
+            return segments
+
+    def last_seq(self):
+        """seq jurnal terakhir yang sudah ada di arsip (0 jika kosong)"""
+        segments = self.segments()
+        return segments[-1].header["seq_last"] if segments else 0
+
+    def write_segment(self, rows):
+        """
+        Tulis baris jurnal (TransactionJournal.rows) menjadi satu segmen
+
+        File ditulis ke .tmp lalu di-rename (atomic): segmen yang ada
+        selalu lengkap, walaupun proses mati di tengah penulisan.
+        """
+        rows = sorted(rows, key=lambda row: row[4])  # urut waktu
+        items, outlets = {}, {}
+        trx = {name: array.array(typecode) for name, typecode in self.TRX_COLUMNS}
+        lines = {name: array.array(typecode) for name, typecode in self.LINE_COLUMNS}
+
+        for row in rows:
+            _, _, outlet, _, waktu, subtotal, diskon, ppn, total, cash, kembalian, pembeli = row
+            trx["ts"].append(int(waktu))
+            trx["outlet"].append(outlets.setdefault(outlet, len(outlets)))
+            trx["subtotal"].append(subtotal)
+            trx["diskon"].append(diskon)
+            trx["ppn"].append(ppn)
+            trx["total"].append(total)
+            trx["cash"].append(cash)
+            trx["kembalian"].append(kembalian)
+            trx["line_start"].append(len(lines["item"]))
+            trx["item_count"].append(sum(line["qty"] for line in pembeli["items"]))
+            for line in pembeli["items"]:
+                lines["item"].append(items.setdefault(str(line["id"]), len(items)))
+                lines["qty"].append(line["qty"])
+                lines["price"].append(line["price"])
+
+        columns = {**trx, **lines}
+        seq_first = min(row[0] for row in rows)
+        seq_last = max(row[0] for row in rows)
+        header = {
+            "byteorder": sys.byteorder,
+            "seq_first": seq_first,
+            "seq_last": seq_last,
+            "ts_min": trx["ts"][0],
+            "ts_max": trx["ts"][-1],
+            "trx_count": len(rows),
+            "line_count": len(lines["item"]),
+            "items": list(items),
+            "outlets": list(outlets),
+            "columns": {},
+        }
+
+        # Posisi kolom dihitung setelah ukuran header diketahui: header
+        # di-encode ulang sampai offset-nya stabil
+        data_start = 0
+        while True:
+            offset = data_start
+            for name, values in columns.items():
+                header["columns"][name] = [values.typecode, offset, len(values)]
+                offset += -(-len(values) * values.itemsize // 8) * 8
+            encoded = json.dumps(header, separators=(",", ":")).encode("utf-8")
+            start = -(-(len(ARCHIVE_MAGIC) + 8 + len(encoded)) // 8) * 8
+            if start == data_start:
+                break
+            data_start = start
+
+        directory = app.config["ARCHIVE_DIR"]
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{seq_first:012d}-{seq_last:012d}.col")
+        tmp_path = path + ".tmp"
+
+        with open(tmp_path, "wb") as f:
+            f.write(ARCHIVE_MAGIC)
+            f.write(array.array("Q", [len(encoded)]).tobytes())
+            f.write(encoded)
+            for name, values in columns.items():
+                f.seek(header["columns"][name][1])
+                values.tofile(f)
+            f.truncate(offset)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        return path
+
+    def summary(self, start=None, end=None, segments=None):
+        """
+        Ringkasan penjualan dalam rentang waktu [start, end)
+
+        Args:
+            segments (list/None): Segmen yang di-scan (default: semua)
+
+        Returns:
+            dict: trx_count, items_sold, sales, subtotal, diskon, ppn,
+                  cash_in, change_out, items_per_hour (24 jam lokal),
+                  item_qty (Counter item_id → qty)
+        """
+        result = {
+            "trx_count": 0,
+            "items_sold": 0,
+            "sales": 0,
+            "subtotal": 0,
+            "diskon": 0,
+            "ppn": 0,
+            "cash_in": 0,
+            "change_out": 0,
+            "items_per_hour": [0] * 24,
+            "item_qty": Counter(),
+        }
+        utc_offset = int(datetime.datetime.now().astimezone().utcoffset().total_seconds())
+
+        for segment in self.segments() if segments is None else segments:
+            header = segment.header
+            if start is not None and header["ts_max"] < start:
+                continue
+            if end is not None and header["ts_min"] >= end:
+                continue
+
+            ts = segment.column("ts")
+            first = bisect.bisect_left(ts, start) if start is not None else 0
+            last = bisect.bisect_left(ts, end) if end is not None else len(ts)
+            if first >= last:
+                continue
+
+            line_start = segment.column("line_start")
+            line_first = line_start[first]
+            line_last = line_start[last] if last < len(ts) else header["line_count"]
+
+            if numpy is not None:
+                self._scan_numpy(segment, first, last, line_first, line_last, utc_offset, result)
+            else:
+                self._scan_array(segment, first, last, line_first, line_last, utc_offset, result)
+
+        return result
+
+    @staticmethod
+    def _scan_numpy(segment, first, last, line_first, line_last, utc_offset, result):
+        trx = slice(first, last)
+        result["trx_count"] += last - first
+        for key, column in (
+            ("sales", "total"),
+            ("subtotal", "subtotal"),
+            ("diskon", "diskon"),
+            ("ppn", "ppn"),
+            ("cash_in", "cash"),
+            ("change_out", "kembalian"),
+            ("items_sold", "item_count"),
+        ):
+            result[key] += int(segment.array(column)[trx].sum())
+
+        hours = (segment.array("ts")[trx] + utc_offset) // 3600 % 24
+        per_hour = numpy.bincount(hours, weights=segment.array("item_count")[trx], minlength=24)
+        for hour, qty in enumerate(per_hour.tolist()):
+            result["items_per_hour"][hour] += int(qty)
+
+        lines = slice(line_first, line_last)
+        items = segment.header["items"]
+        per_item = numpy.bincount(
+            segment.array("item")[lines],
+            weights=segment.array("qty")[lines],
+            minlength=len(items),
+        )
+        for index in numpy.flatnonzero(per_item).tolist():
+            result["item_qty"][items[index]] += int(per_item[index])
+
+    @staticmethod
+    def _scan_array(segment, first, last, line_first, line_last, utc_offset, result):
+        result["trx_count"] += last - first
+        for key, column in (
+            ("sales", "total"),
+            ("subtotal", "subtotal"),
+            ("diskon", "diskon"),
+            ("ppn", "ppn"),
+            ("cash_in", "cash"),
+            ("change_out", "kembalian"),
+            ("items_sold", "item_count"),
+        ):
+            result[key] += sum(segment.column(column)[first:last])
+
+        per_hour = result["items_per_hour"]
+        for ts, count in zip(
+            segment.column("ts")[first:last], segment.column("item_count")[first:last]
+        ):
+            per_hour[(ts + utc_offset) // 3600 % 24] += count
+
+        per_item = [0] * len(segment.header["items"])
+        for item, qty in zip(
+            segment.column("item")[line_first:line_last],
+            segment.column("qty")[line_first:line_last],
+        ):
+            per_item[item] += qty
+        for item_id, qty in zip(segment.header["items"], per_item):
+            if qty:
+                result["item_qty"][item_id] += qty
+
+
+trx_journal = TransactionJournal()
+trx_archive = TransactionArchive()
+
+
+def compact_transactions(now=None):
+    """
+    Pindahkan transaksi lama (> ARCHIVE_AFTER) dari jurnal ke arsip
+
+    Aman dijalankan ulang: segmen menyimpan seq terakhir, baris jurnal
+    baru dihapus SETELAH segmennya tersimpan. Jika proses mati di antara
+    keduanya, run berikutnya hanya menghapus sisa baris tersebut.
+
+    Returns:
+        tuple: (jumlah segmen baru, jumlah transaksi yang diarsip)
+    """
+    now = time.time() if now is None else now
+    before = now - app.config["ARCHIVE_AFTER"]
+
+    archived_seq = trx_archive.last_seq()
+    trx_journal.delete_upto(archived_seq)
+
+    segments = archived = 0
+    while True:
+        rows = trx_journal.rows(after_seq=archived_seq, limit=ARCHIVE_SEGMENT_MAX_TRX)
+
+        # Hanya awalan urut seq yang sudah cukup lama: baris setelahnya
+        # tidak boleh ikut terhapus oleh delete_upto
+        for index, row in enumerate(rows):
+            if row[4] >= before:
+                rows = rows[:index]
+                break
+        if not rows:
+            break
+
+        trx_archive.write_segment(rows)
+        archived_seq = rows[-1][0]
+        trx_journal.delete_upto(archived_seq)
+
+        segments += 1
+        archived += len(rows)
+
+    return segments, archived
+
+
+# ========================================================================
+# HELPER CLASS - CHECKOUT OFFLINE (DEDUP SINKRONISASI)
+# ========================================================================
+
+
+class OfflineCheckoutStore:
+    """
+    Daftar checkout offline yang sudah diterima server
+
+    Client mengirim ulang antrian yang sama sampai mendapat jawaban,
+    jadi satu transaksi bisa masuk berkali-kali (response hilang, tab
+    ganda, sync dobel). client_id (UUID dari browser) adalah PRIMARY
+    KEY: klaim kedua untuk client_id yang sama selalu gagal, walaupun
+    datang bersamaan dari worker berbeda.
+
+    Tabel:
+        offline_checkouts(client_id, email, trx_id, synced)
+    """
+
+    def __init__(self):
+        # Path database yang tabelnya sudah dibuat oleh proses ini
+        self._ready = set()
+
+    def _connect(self):
+        conn = connect_db()
+        db_path = app.config["DATABASE"]
+
+        if db_path not in self._ready:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS offline_checkouts ("
+                "client_id TEXT PRIMARY KEY, email TEXT NOT NULL, "
+                "trx_id TEXT NOT NULL, synced REAL NOT NULL)"
+            )
+            self._ready.add(db_path)
+
+        return conn
+
+    def get(self, client_id):
+        """trx_id transaksi yang sudah diterima, None jika belum pernah"""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT trx_id FROM offline_checkouts WHERE client_id = ?", (client_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+        return row[0] if row else None
+
+    def claim(self, client_id, email, trx_id):
+        """
+        Tandai client_id sebagai sudah diterima dengan nomor trx_id
+
+        Returns:
+            None: Klaim berhasil (transaksi baru)
+            str: trx_id dari klaim sebelumnya (duplikat)
+        """
+        conn = self._connect()
+        try:
+            inserted = conn.execute(
+                "INSERT INTO offline_checkouts (client_id, email, trx_id, synced) "
+                "VALUES (?, ?, ?, ?) ON CONFLICT (client_id) DO NOTHING",
+                (client_id, email, trx_id, time.time()),
+            ).rowcount
+            if inserted:
+                return None
+            return conn.execute(
+                "SELECT trx_id FROM offline_checkouts WHERE client_id = ?", (client_id,)
+            ).fetchone()[0]
+        finally:
+            conn.close()
+
+    def release(self, client_id):
+        """Batalkan klaim (transaksi gagal disimpan, boleh dikirim ulang)"""
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM offline_checkouts WHERE client_id = ?", (client_id,))
+        finally:
+            conn.close()
+
+
+offline_checkouts = OfflineCheckoutStore()
+
+
+# ========================================================================
+# API ENDPOINT - CART UPDATE
+# ========================================================================
+
+
+@app.route("/cart/update", methods=["POST"])
+@login_required
+def cart_update():
+    """
+    Endpoint untuk menangani semua operasi pada cart
+
+    Supported Actions:
+        - "add": Tambah item baru atau increase qty jika sudah ada
+        - "plus": Increase quantity item yang sudah ada
+        - "minus": Decrease quantity, auto-remove jika qty = 0
+        - "remove": Hapus item dari cart (regardless of qty)
+
+    Request Body (JSON):
+        {
+            "action": "add|plus|minus|remove",
+            "id": "item_id"
+        }
+
+    Response (JSON):
+        Success (200):
+        {
+            "cart": [...],           # Updated cart data
+            "count": 5,              # Total quantity for badge
+            "subtotal": 100000,      # Total sebelum diskon
+            "diskon": 10000,         # Potongan harga
+            "ppn": 9000,             # Pajak
+            "total": 99000           # Total akhir
+        }
+
+        Error (400/404/500):
+        {
+            "error": "Error message"
+        }
+
+    HTTP Status Codes:
+        200: Success
+        400: Bad request (invalid input)
+        404: Item not found
+        500: Internal server error
+    """
+
+    try:
+        # ============================================================
+        # STEP 1: VALIDASI REQUEST & EXTRACT PARAMETERS
+        # ============================================================
+
+        # Parse JSON dari request body
+        # request.get_json() return None jika:
+        # - Request tidak mengandung JSON
+        # - Content-Type header bukan application/json
+        # - JSON syntax error (invalid format)
+        data = request.get_json()
+
+        # Validasi: pastikan request body mengandung JSON
+        # Return 400 Bad Request jika tidak ada data
+        if not data:
+            return jsonify({"error": "Invalid request"}), 400
+
+        # Extract action dan item_id dari JSON payload
+        # .get() method return None jika key tidak ada (safe)
+        action = data.get("action")  # Expected: "add"|"plus"|"minus"|"remove"
+        item_id = data.get("id")  # Expected: string atau integer ID
+
+        # Validasi: pastikan parameter wajib tersedia
+        # action harus ada dan tidak empty string
+        # item_id harus ada (boleh 0, tapi tidak boleh None)
+        if not action or item_id is None:
+            return jsonify({"error": "Missing parameters"}), 400
+
+        # ============================================================
+        # STEP 2: LOAD CART & FIND TARGET ITEM
+        # ============================================================
+
+        # Ambil cart dari session
+        # Default ke empty list jika:
+        # - Session baru (first time user)
+        # - Cart sudah di-clear sebelumnya
+        # - Session expired dan di-reset
+        cart = get_cart()
+
+        # Cari apakah item dengan ID ini sudah ada di cart
+        # find_item_in_cart return:
+        # - Reference ke line [item_id, qty] jika ada (modifiable)
+        # - None jika tidak ada
+        target = find_item_in_cart(cart, item_id)
+
+        # Item yang sudah ada di cart belum tentu masih dijual
+        # (outlet session diganti / menu di-reload): qty tidak boleh ditambah
+        if target and action in ("add", "plus") and not find_menu_item(item_id):
+            return jsonify({"error": "Item not found"}), 404
+
+        # ============================================================
+        # STEP 3: HANDLE ACTION - ADD
+        # ============================================================
+
+        if action == "add":
+            # ADD action punya 2 skenario berbeda
+
+            # SKENARIO 1: Item BELUM ada di cart (target = None)
+            if not target:
+                # Item baru, perlu ambil data lengkap dari menu database
+                menu_item = find_menu_item(item_id)
+
+                # Validasi: pastikan item exists di menu
+                # Bisa tidak ada jika:
+                # - ID invalid/typo
+                # - Item sudah dihapus dari menu
+                # - Bug di frontend yang kirim ID salah
+                if not menu_item:
+                    return jsonify({"error": "Item not found"}), 404
+
+                # Reserve stok dulu (raise OutOfStock jika habis)
+                inventory.reserve(session_id(), current_outlet(), menu_item.id, 1)
+
+                # Buat item baru di cart dengan qty = 1
+                add_to_cart(cart, menu_item)
+
+            # SKENARIO 2: Item SUDAH ada di cart (target != None)
+            else:
+                # Tinggal tambah quantity
+                # target adalah reference, jadi modifikasi langsung affect cart
+                inventory.reserve(session_id(), current_outlet(), target[CART_ID], 1)
+                target[CART_QTY] += 1
+
+        # ============================================================
+        # STEP 4: HANDLE ACTION - PLUS
+        # ============================================================
+
+        elif action == "plus":
+            # PLUS hanya bisa dilakukan pada item yang SUDAH ada
+            # Validasi: jika item tidak ada, return error
+            # Seharusnya tidak terjadi karena button plus hanya muncul di cart
+            # Tapi kita tetap validate untuk robustness
+            if not target:
+                return jsonify({"error": "Item not in cart"}), 404
+
+            # Tambah quantity
+            # Logic sama dengan ADD skenario 2
+            inventory.reserve(session_id(), current_outlet(), target[CART_ID], 1)
+            target[CART_QTY] += 1
+
+        # ============================================================
+        # STEP 5: HANDLE ACTION - MINUS
+        # ============================================================
+
+        elif action == "minus":
+            # MINUS juga hanya untuk item yang sudah ada
+            if not target:
+                return jsonify({"error": "Item not in cart"}), 404
+
+            # Kurangi quantity (1 unit stok kembali tersedia)
+            inventory.release(session_id(), current_outlet(), [(target[CART_ID], 1)])
+            target[CART_QTY] -= 1
+
+            # CRITICAL LOGIC: Auto-remove jika qty = 0
+            # Ini memberikan UX yang baik:
+            # - User tidak perlu klik remove button terpisah
+            # - Tinggal tekan minus sampai item hilang
+            # - Lebih intuitive untuk mobile users
+            if target[CART_QTY] <= 0:
+                # Hapus item dari cart
+                # cart.remove() mencari dan menghapus object dari list
+                cart.remove(target)
+
+        # ============================================================
+        # STEP 6: HANDLE ACTION - REMOVE
+        # ============================================================
+
+        elif action == "remove":
+            # REMOVE menghapus item regardless of quantity
+            # Validasi: item harus ada
+            if not target:
+                return jsonify({"error": "Item not in cart"}), 404
+
+            # Hapus item dari cart
+            # Tidak peduli qty-nya berapa, langsung dihapus
+            # Di frontend ada confirmation dialog untuk prevent accidental delete
+            inventory.release(session_id(), current_outlet(), [tuple(target)])
+            cart.remove(target)
+
+        # ============================================================
+        # STEP 7: HANDLE INVALID ACTION
+        # ============================================================
+
+        else:
             # Action tidak dikenali (bukan add/plus/minus/remove)
             # Ini defensive programming - jangan assume input selalu valid
             # Bisa terjadi jika:
@@ -737,621 +4315,2680 @@ def cart_update():
             # - API misuse
             return jsonify({"error": "Invalid action"}), 400
 
-        # ============================================================
-        # STEP 8: UPDATE SESSION & CALCULATE TOTALS
-        # ============================================================
+        # ============================================================
+        # STEP 8: UPDATE SESSION & CALCULATE TOTALS
+        # ============================================================
+
+        # Simpan cart yang sudah dimodifikasi ke session
+        # Function ini juga menghitung cart_count untuk badge
+        update_session_cart(cart)
+
+        # Lengkapi line cart dengan data katalog untuk response
+        # lalu hitung semua total finansial
+        # calculate_totals return tuple: (subtotal, diskon, ppn, total)
+        lines = expand_cart(cart)
+        subtotal, diskon, ppn, total = calculate_totals(lines)
+
+        # ============================================================
+        # STEP 9: RETURN SUCCESS RESPONSE
+        # ============================================================
+
+        # Return JSON response dengan semua data yang dibutuhkan frontend
+        # Status code 200 (OK) adalah default untuk return tanpa error
+        return jsonify(
+            {
+                "cart": cart_json(lines),  # List lengkap items di cart
+                "count": session["cart_count"],  # Total qty untuk badge
+                "subtotal": subtotal,  # Total sebelum diskon
+                "diskon": diskon,  # Potongan harga
+                "ppn": ppn,  # Pajak
+                "total": total,  # Total akhir yang harus dibayar
+            }
+        )
+
+    # ============================================================
+    # EXCEPTION HANDLING
+    # ============================================================
+
+    except OutOfStock as e:
+        # Stok item tidak cukup: cart tidak diubah
+        return jsonify({"error": "Stok tidak cukup", "items": e.items}), 409
+
+    except Exception as e:
+        # Catch-all untuk unexpected errors
+        # Contoh errors yang bisa terjadi:
+        # - KeyError jika item structure tidak sesuai
+        # - TypeError jika ada type mismatch
+        # - Any runtime errors
+
+        # Log error untuk debugging
+        # Di production, log ini akan masuk ke file atau monitoring system
+        app.logger.error(f"Error in cart_update: {str(e)}")
+
+        # Return generic error message
+        # JANGAN expose detail error ke client untuk security
+        # Status code 500 = Internal Server Error
+        return jsonify({"error": "Internal server error"}), 500
+
+
+# ========================================================================
+# API ENDPOINT - SCAN BARCODE / PLU
+# ========================================================================
+
+# Batas jumlah kode dalam 1 request batch scan
+SCAN_MAX_CODES = 100
+
+
+@app.route("/cart/scan", methods=["POST"])
+@login_required
+def cart_scan():
+    """
+    Tambah item ke cart berdasarkan barcode / PLU dari scanner
+
+    Scanner bisa mengirim banyak kode dalam waktu singkat. Client
+    mengumpulkan kode yang masuk selama request sebelumnya masih
+    berjalan lalu mengirimnya sekaligus dalam "codes", sehingga burst
+    scan = sedikit request, dan cart di session tidak saling timpa.
+    Setiap kode di-resolve O(1) lewat index barcode katalog outlet.
+
+    Request Body (JSON):
+        {"code": "8991234567890"}
+        atau
+        {"codes": ["8991234567890", "8991234567890", "1001"]}
+
+    Response (JSON):
+        Sama seperti /cart/update, ditambah:
+        {
+            ...,
+            "added": 3,            # Jumlah kode yang berhasil ditambahkan
+            "not_found": ["999"]   # Kode yang tidak dikenal
+        }
+
+    HTTP Status Codes:
+        200: Minimal 1 kode berhasil ditambahkan
+        400: Request tidak valid
+        404: Semua kode tidak dikenal
+    """
+
+    try:
+        data = request.get_json(silent=True)
+        if not data:
+            return jsonify({"error": "Invalid request"}), 400
+
+        codes = data.get("codes")
+        if codes is None:
+            codes = [data.get("code")]
+
+        if (
+            not isinstance(codes, list)
+            or not codes
+            or len(codes) > SCAN_MAX_CODES
+            or any(not isinstance(c, (str, int)) or c == "" for c in codes)
+        ):
+            return jsonify({"error": "Kode tidak valid"}), 400
+
+        # Kode yang sama di-scan berkali-kali = qty bertambah
+        counts = OrderedDict()
+        for code in codes:
+            code = str(code).strip()
+            counts[code] = counts.get(code, 0) + 1
+
+        cart = get_cart()
+        added = 0
+        not_found = []
+        out_of_stock = []
+
+        for code, qty in counts.items():
+            menu_item = find_menu_item_by_code(code)
+            if not menu_item:
+                not_found.append(code)
+                continue
+
+            try:
+                inventory.reserve(session_id(), current_outlet(), menu_item.id, qty)
+            except OutOfStock:
+                out_of_stock.append(code)
+                continue
+
+            add_to_cart(cart, menu_item, qty)
+            added += qty
+
+        if not added:
+            if out_of_stock:
+                return jsonify({"error": "Stok tidak cukup", "items": out_of_stock}), 409
+            return jsonify({"error": "Item not found", "not_found": not_found}), 404
+
+        update_session_cart(cart)
+        lines = expand_cart(cart)
+        subtotal, diskon, ppn, total = calculate_totals(lines)
+
+        return jsonify(
+            {
+                "cart": cart_json(lines),
+                "count": session["cart_count"],
+                "subtotal": subtotal,
+                "diskon": diskon,
+                "ppn": ppn,
+                "total": total,
+                "added": added,
+                "not_found": not_found,
+                "out_of_stock": out_of_stock,
+            }
+        )
+
+    except Exception as e:
+        app.logger.error(f"Error in cart_scan: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+# ========================================================================
+# API ENDPOINT - CHECKOUT
+# ========================================================================
+
+
+@app.route("/checkout", methods=["POST"])
+@login_required
+@idempotent("pembeli", "jumlahcart", "cart_count")
+def checkout():
+    """
+    Endpoint untuk memproses pembayaran
+
+    Proses checkout meliputi:
+    1. Validasi data pembeli (nama, cash)
+    2. Validasi cart tidak kosong
+    3. Hitung total pembayaran
+    4. Validasi uang cukup
+    5. Hitung kembalian
+    6. Freeze snapshot transaksi (items + total) ke session, kosongkan cart
+    7. Return rincian pembayaran + trx_id untuk download struk
+
+    Request Body (JSON):
+        {
+            "nama": "John Doe",
+            "cash": 150000
+        }
+
+    Request Headers (optional):
+        Idempotency-Key: <uuid per klik "Proses">
+        Retry dengan key yang sama mendapat response yang sama persis
+        (header Idempotent-Replayed: true) tanpa checkout dobel.
+
+    Response (JSON):
+        Success (200):
+        {
+            "nama": "John Doe",
+            "cash": 150000,
+            "subtotal": 100000,
+            "ppn": 9000,
+            "diskon": 10000,
+            "total": 99000,
+            "kembalian": 51000,
+            "trx_id": "K3-00000042",
+            "struk_url": "/struk/K3-00000042"
+        }
+
+        Error (400):
+        {
+            "error": "Error message"
+        }
+
+        Error (409): stok tidak cukup / item cart sudah tidak ada di menu
+        {
+            "error": "Error message",
+            "items": ["item_id", ...]
+        }
+
+    Validation Rules:
+        - Nama: tidak boleh kosong atau hanya spasi
+        - Cash: harus integer positif
+        - Cart: minimal 1 item
+        - Cash: harus >= total
+    """
+
+    try:
+        # ============================================================
+        # STEP 1: VALIDASI REQUEST & EXTRACT DATA
+        # ============================================================
+
+        # Parse JSON dari request body
+        data = request.get_json()
+
+        # Validasi: pastikan request mengandung JSON
+        if not data:
+            return jsonify({"error": "Invalid request"}), 400
+
+        # ============================================================
+        # STEP 2: VALIDASI NAMA PEMBELI
+        # ============================================================
+
+        # Extract nama pembeli
+        # .get("nama", "") return empty string jika key tidak ada
+        # .strip() remove leading/trailing whitespace
+        nama = data.get("nama", "").strip()
+
+        # Validasi: nama tidak boleh kosong
+        # Empty string atau hanya spasi akan fail validation
+        # Nama penting untuk:
+        # - Identifikasi pembeli di struk
+        # - Courtesy (sapaan ke customer)
+        # - Audit trail jika perlu
+        if not nama:
+            return jsonify({"error": "Nama tidak boleh kosong"}), 400
+
+        # ============================================================
+        # STEP 3: VALIDASI JUMLAH UANG (CASH)
+        # ============================================================
+
+        try:
+            # Convert cash ke integer
+            # Rupiah tidak menggunakan desimal, jadi int sudah cukup
+            # .get("cash", 0) return 0 jika key tidak ada
+            cash = int(data.get("cash", 0))
+
+        except (ValueError, TypeError):
+            # ValueError: jika input bukan angka (contoh: "abc", "12.5abc")
+            # TypeError: jika input adalah type yang tidak bisa di-convert
+
+            # Return error message yang user-friendly
+            # Jangan expose technical error (ValueError) ke user
+            return jsonify({"error": "Jumlah uang tidak valid"}), 400
+
+        # ============================================================
+        # STEP 4: VALIDASI CART TIDAK KOSONG
+        # ============================================================
+
+        # Ambil cart dari session, lengkapi dengan data katalog
+        cart = get_cart()
+        lines = expand_cart(cart)
+
+        # Item yang sudah tidak ada di katalog (menu di-reload) dilewati
+        # expand_cart. Checkout TIDAK boleh diam-diam menagih cart yang
+        # lebih kecil dari yang dilihat kasir: minta cart diperbarui dulu
+        found = {item["id"] for item in lines}
+        missing = [item_id for item_id, qty in cart if item_id not in found]
+        if missing:
+            return (
+                jsonify(
+                    {
+                        "error": "Sebagian item sudah tidak ada di menu, "
+                        "perbarui keranjang",
+                        "items": missing,
+                    }
+                ),
+                409,
+            )
+
+        # Validasi: cart minimal harus punya 1 item
+        # Empty cart bisa terjadi jika:
+        # - User langsung akses /checkout tanpa shopping
+        # - Session expired
+        # - Cart di-clear tapi user masih di checkout page
+        if not lines:
+            return jsonify({"error": "Keranjang kosong"}), 400
+
+        # ============================================================
+        # STEP 5: HITUNG TOTAL PEMBAYARAN
+        # ============================================================
+
+        # Hitung subtotal, diskon, ppn, dan total akhir
+        # Ini SATU-SATUNYA tempat total transaksi dihitung:
+        # struk nanti di-render dari snapshot, bukan dihitung ulang
+        subtotal, diskon, ppn, total = calculate_totals(lines)
+
+        # ============================================================
+        # STEP 6: VALIDASI UANG CUKUP
+        # ============================================================
+
+        # Cek apakah cash yang diberikan >= total yang harus dibayar
+        if cash < total:
+            # Uang tidak cukup, return error dengan detail
+            # Format angka dengan thousand separator (:,)
+            # Contoh: 99000 → "99,000"
+            # Ini memudahkan user untuk baca dan membandingkan
+            return (
+                jsonify(
+                    {
+                        "error": f"Uang tidak cukup. Total: Rp {total:,}, Uang: Rp {cash:,}"
+                    }
+                ),
+                400,
+            )
+
+        # ============================================================
+        # STEP 7: HITUNG KEMBALIAN
+        # ============================================================
+
+        # Kembalian = Uang yang diberikan - Total yang harus dibayar
+        # Contoh: Rp 150.000 - Rp 99.000 = Rp 51.000
+        kembalian = cash - total
+
+        # Nomor struk dialokasikan SEBELUM stok dipotong: jika counter
+        # gagal (sqlite3.Error), stok belum berubah. Sebaliknya jika stok
+        # tidak cukup, nomor ini hilang (celah di urutan nomor struk)
+        outlet = current_outlet()
+        trx_id = receipt_numbers_for(outlet).next_id()
+
+        # Stok: reservasi cart menjadi terjual
+        # Raise OutOfStock (tanpa mengubah stok apapun) jika ada item
+        # yang reservasinya sudah kadaluarsa dan stoknya tidak cukup lagi
+        inventory.commit(
+            session_id(),
+            outlet,
+            [(item["id"], item["qty"]) for item in lines],
+        )
+
+        # ============================================================
+        # STEP 8: FREEZE TRANSAKSI KE SESSION
+        # ============================================================
+
+        # Simpan snapshot transaksi ke session
+        # Data ini akan digunakan untuk:
+        # 1. Display rincian di halaman pembayaran
+        # 2. Generate PDF struk (langsung dari snapshot, tanpa hitung ulang)
+        # 3. Audit trail (bisa dipindah ke database nantinya)
+        #
+        # items adalah COPY dari cart saat ini, jadi struk tidak akan
+        # berbeda dengan rincian pembayaran walaupun cart berubah
+        session["pembeli"] = {
+            "trx_id": trx_id,  # Nomor struk (key cache struk)
+            "waktu": datetime.datetime.now().timestamp(),  # Waktu transaksi
+            "items": [
+                {
+                    "id": item["id"],
+                    "nama": item["nama"],
+                    "price": item["price"],
+                    "qty": item["qty"],
+                }
+                for item in lines
+            ],
+            "nama": nama,  # Nama customer
+            "order": session.get("order"),  # Nama pesanan / meja (jika ada)
+            "cash": cash,  # Uang yang dibayar
+            "subtotal": subtotal,  # Total sebelum diskon & pajak
+            "ppn": ppn,  # Pajak 10%
+            "diskon": diskon,  # Diskon 10%
+            "total": total,  # Total akhir
+            "kembalian": kembalian,  # Uang kembali
+        }
+
+        # Cart sudah terjual: kosongkan agar klik "Proses" berikutnya
+        # (Idempotency-Key baru) tidak memotong stok & mencatat dobel.
+        # Tidak lewat update_session_cart karena itu membuang pembeli
+        session["jumlahcart"] = []
+        session["cart_count"] = 0
+
+        # CRITICAL: Mark session as modified
+        # Tanpa ini, data pembeli tidak akan tersimpan
+        session.modified = True
+
+        # Kirim pesanan ke layar dapur (kitchen display)
+        publish_kitchen_order(outlet, session["pembeli"])
+
+        # Tambahkan ke total berjalan shift kasir (untuk rekap laci).
+        # Transaksi sudah final: gagal mencatat shift tidak membatalkannya.
+        try:
+            shifts.record(
+                session["email"], outlet, subtotal, diskon, ppn, total, cash, kembalian
+            )
+        except sqlite3.Error as e:
+            app.logger.error(f"Error in checkout (shift {trx_id}): {str(e)}")
+
+        # Jurnal transaksi (sumber arsip analitik)
+        try:
+            trx_journal.append(outlet, session["email"], session["pembeli"])
+        except sqlite3.Error as e:
+            app.logger.error(f"Error in checkout (jurnal {trx_id}): {str(e)}")
+
+        # ============================================================
+        # STEP 9: RETURN SUCCESS RESPONSE
+        # ============================================================
+
+        # Return semua data pembayaran ke frontend
+        # Frontend akan display data ini di rincian pembayaran
+        # dan download struk langsung lewat struk_url (1 request)
+        return jsonify(
+            {
+                "nama": nama,
+                "cash": cash,
+                "subtotal": subtotal,
+                "ppn": ppn,
+                "diskon": diskon,
+                "total": total,
+                "kembalian": kembalian,
+                "trx_id": trx_id,
+                "struk_url": url_for("download_struk", trx_id=trx_id),
+            }
+        )
+
+    # ============================================================
+    # EXCEPTION HANDLING
+    # ============================================================
+
+    except OutOfStock as e:
+        nama_items = [item["nama"] for item in lines if item["id"] in e.items]
+        return (
+            jsonify(
+                {
+                    "error": f"Stok tidak cukup: {', '.join(nama_items)}",
+                    "items": e.items,
+                }
+            ),
+            409,
+        )
+
+    except Exception as e:
+        # Catch-all untuk unexpected errors
+        # Log error untuk debugging
+        app.logger.error(f"Error in checkout: {str(e)}")
+
+        # Return generic error message
+        # Jangan expose detail error untuk security
+        return jsonify({"error": "Internal server error"}), 500
+
+
+# ========================================================================
+# API ENDPOINT - SINKRONISASI CHECKOUT OFFLINE
+# ========================================================================
+
+# Maksimal transaksi per request /checkout/sync
+OFFLINE_SYNC_MAX_BATCH = 100
+
+# Waktu transaksi offline boleh lebih maju dari jam server (detik)
+OFFLINE_CLOCK_SKEW = 300
+
+_client_id_pattern = re.compile(r"^[A-Za-z0-9._-]{8,64}$")
+
+# Transaksi offline yang lebih tua dari ini (detik) saat sync tidak
+# dikirim ke layar dapur: pesanannya sudah dibuat manual selama offline,
+# mengirimnya sekarang hanya membuat dapur memasak dua kali
+OFFLINE_KITCHEN_MAX_AGE = 600
+
+
+def offline_int(value):
+    """
+    Angka dari antrian offline (qty, harga, uang)
+
+    Client mengirim JSON number hasil hitungan integer, jadi selain int
+    dianggap rusak: 1.9 atau true TIDAK dibulatkan diam-diam seperti
+    int() di cash_amount.
+
+    Returns:
+        int/None: Nilai >= 0, None jika bukan int (termasuk bool)
+    """
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        return None
+    return value
+
+
+def validate_offline_checkout(entry):
+    """
+    Validasi ulang checkout offline yang SUDAH terjadi di outlet
+
+    Barang dan uang sudah berpindah tangan, jadi transaksi hanya ditolak
+    jika datanya rusak (tipe salah, keranjang kosong, waktu di masa
+    depan). Harga dicek terhadap harga yang tercatat saat transaksi
+    masuk antrian, bukan katalog sekarang: item yang sejak itu dihapus /
+    tidak tersedia, harga yang berubah, atau total client yang berbeda
+    dari hitung_total tetap dicatat, dengan catatan "review" untuk admin.
+
+    Total (subtotal, diskon, ppn, total) di snapshot selalu hasil
+    hitung_total dari harga tercatat. cash dan kembalian tetap angka dari
+    client, karena itu yang benar-benar masuk / keluar laci.
+
+    Args:
+        entry (dict): {client_id, waktu, nama, order, cash, items: [{id,
+                       nama, qty, price}], subtotal, diskon, ppn, total,
+                       kembalian}
+
+    Returns:
+        dict: Snapshot transaksi (format session["pembeli"], tanpa trx_id)
+              plus "review" (list catatan) jika ada yang perlu dicek
+
+    Raises:
+        ValueError: Data rusak (pesan untuk kasir)
+    """
+    nama = entry.get("nama")
+    if not isinstance(nama, str) or not nama.strip():
+        raise ValueError("Nama tidak boleh kosong")
+
+    waktu = entry.get("waktu")
+    if (
+        not isinstance(waktu, (int, float))
+        or isinstance(waktu, bool)
+        or not 0 < waktu <= time.time() + OFFLINE_CLOCK_SKEW
+    ):
+        raise ValueError("Waktu transaksi tidak valid")
+
+    items = entry.get("items")
+    if not isinstance(items, list) or not items:
+        raise ValueError("Keranjang kosong")
+
+    review = []
+    lines = []
+    for line in items:
+        if not isinstance(line, dict):
+            raise ValueError("Item tidak valid")
+
+        item_id = line.get("id")
+        if not isinstance(item_id, str) or not item_id:
+            raise ValueError("Item tidak valid")
+
+        menu_item = find_menu_item(item_id)
+        item_nama = line.get("nama")
+        if not isinstance(item_nama, str) or not item_nama.strip():
+            item_nama = menu_item.nama if menu_item else item_id
+
+        qty = offline_int(line.get("qty"))
+        if not qty:
+            raise ValueError(f"Jumlah {item_nama} tidak valid")
+        price = offline_int(line.get("price"))
+        if price is None:
+            raise ValueError(f"Harga {item_nama} tidak valid")
+
+        if not menu_item:
+            review.append(f"{item_id} tidak ada / tidak tersedia di menu saat sync")
+        elif menu_item.price != price:
+            review.append(f"Harga {item_nama} Rp {price:,} (menu sekarang Rp {menu_item.price:,})")
+
+        lines.append({"id": item_id, "nama": item_nama.strip(), "price": price, "qty": qty})
+
+    subtotal = sum(line["price"] * line["qty"] for line in lines)
+    diskon, ppn, total = hitung_total(subtotal)
+
+    cash = offline_int(entry.get("cash"))
+    kembalian = offline_int(entry.get("kembalian"))
+    if cash is None or kembalian is None or kembalian > cash:
+        raise ValueError("Jumlah uang tidak valid")
+
+    totals = {"subtotal": subtotal, "diskon": diskon, "ppn": ppn, "total": total}
+    client_totals = {**totals, "kembalian": cash - total}
+    for key, value in client_totals.items():
+        client_value = offline_int(entry.get(key))
+        if client_value is None:
+            raise ValueError(f"Total tidak valid ({key})")
+        if client_value != value:
+            review.append(f"{key} client Rp {client_value:,}, server Rp {value:,}")
+
+    if cash < total:
+        review.append(f"Uang Rp {cash:,} kurang dari total Rp {total:,}")
+
+    pembeli = {
+        "waktu": float(waktu),
+        "items": lines,
+        "nama": nama.strip(),
+        "order": order_name(entry.get("order")),
+        "cash": cash,
+        **totals,
+        "kembalian": kembalian,
+    }
+    if review:
+        pembeli["review"] = review
+    return pembeli
+
+
+def commit_offline_stock(sid, outlet, lines):
+    """
+    Kurangi stok untuk transaksi offline (best effort)
+
+    Barang sudah diserahkan ke pembeli, jadi transaksi tetap diterima
+    walaupun stok tercatat kurang: stok item tersebut dihabiskan (tidak
+    bisa negatif) dan item-nya dilaporkan agar stoknya dihitung ulang.
+
+    Returns:
+        list: item_id yang stoknya tidak cukup
+    """
+    try:
+        inventory.commit(sid, outlet, lines)
+        return []
+    except OutOfStock as e:
+        short = e.items
+
+    rest = []
+    for item_id, qty in lines:
+        if item_id in short:
+            qty = min(qty, inventory.level(outlet, item_id) or 0)
+        if qty:
+            rest.append((item_id, qty))
+
+    try:
+        inventory.commit(sid, outlet, rest)
+    except OutOfStock:
+        pass  # Stok berubah lagi di antara dua transaksi: cukup dilaporkan
+    return short
+
+
+def sync_offline_checkout(entry, outlet, email):
+    """
+    Terima satu checkout offline
+
+    Returns:
+        dict: Hasil per transaksi untuk response /checkout/sync
+    """
+    client_id = entry.get("client_id") if isinstance(entry, dict) else None
+    if not isinstance(client_id, str) or not _client_id_pattern.match(client_id):
+        return {"client_id": client_id, "status": "rejected", "error": "client_id tidak valid"}
+
+    # Sudah pernah diterima (response sebelumnya tidak sampai ke client)
+    trx_id = offline_checkouts.get(client_id)
+    if trx_id:
+        return {"client_id": client_id, "status": "duplicate", "trx_id": trx_id}
+
+    try:
+        pembeli = validate_offline_checkout(entry)
+    except ValueError as e:
+        return {"client_id": client_id, "status": "rejected", "error": str(e)}
+
+    trx_id = receipt_numbers_for(outlet).next_id()
+    previous = offline_checkouts.claim(client_id, email, trx_id)
+    if previous:
+        return {"client_id": client_id, "status": "duplicate", "trx_id": previous}
+
+    pembeli = {"trx_id": trx_id, **pembeli, "client_id": client_id, "offline": True}
+
+    # Jurnal = bukti transaksi: jika gagal, klaim dilepas dan client
+    # mengirim ulang di sync berikutnya
+    try:
+        trx_journal.append(outlet, email, pembeli)
+    except sqlite3.Error as e:
+        offline_checkouts.release(client_id)
+        app.logger.error(f"Error in checkout_sync (jurnal {trx_id}): {str(e)}")
+        return {"client_id": client_id, "status": "error", "error": "Gagal menyimpan transaksi"}
+
+    short = []
+    try:
+        short = commit_offline_stock(
+            f"offline:{client_id}",
+            outlet,
+            [(line["id"], line["qty"]) for line in pembeli["items"]],
+        )
+        if short:
+            app.logger.warning(f"Stok kurang untuk transaksi offline {trx_id}: {short}")
+    except sqlite3.Error as e:
+        app.logger.error(f"Error in checkout_sync (stok {trx_id}): {str(e)}")
+
+    try:
+        shifts.record(
+            email,
+            outlet,
+            pembeli["subtotal"],
+            pembeli["diskon"],
+            pembeli["ppn"],
+            pembeli["total"],
+            pembeli["cash"],
+            pembeli["kembalian"],
+        )
+    except sqlite3.Error as e:
+        app.logger.error(f"Error in checkout_sync (shift {trx_id}): {str(e)}")
+
+    # Hanya pesanan yang masih baru (koneksi putus sebentar); yang lama
+    # sudah ditangani dapur secara manual (lihat OFFLINE_KITCHEN_MAX_AGE)
+    if time.time() - pembeli["waktu"] <= OFFLINE_KITCHEN_MAX_AGE:
+        publish_kitchen_order(outlet, pembeli)
+
+    result = {"client_id": client_id, "status": "ok", "trx_id": trx_id, "stock_short": short}
+    if "review" in pembeli:
+        app.logger.warning(f"Transaksi offline {trx_id} perlu dicek: {pembeli['review']}")
+        result["review"] = pembeli["review"]
+    return result
+
+
+@app.route("/checkout/sync", methods=["POST"])
+@login_required
+def checkout_sync():
+    """
+    Bulk-ingest checkout yang dibuat saat kasir offline
+
+    Client (static/js/main.js) menyimpan checkout offline di antrian
+    localStorage lalu mengirimnya per batch saat koneksi kembali.
+    Aman dikirim ulang: transaksi yang sama (client_id) hanya diterima
+    sekali. Total setiap transaksi dihitung ulang dengan hitung_total dari
+    harga yang tercatat saat offline. Perbedaan dengan menu sekarang /
+    total client tidak membuat transaksi ditolak (penjualan sudah
+    terjadi), tapi dicatat sebagai "review". Hanya data rusak yang
+    ditolak, tanpa mempengaruhi transaksi lain di batch yang sama.
+
+    Request Body (JSON):
+        {
+            "checkouts": [
+                {
+                    "client_id": "7f0c...",     # UUID dari browser
+                    "waktu": 1735700000.5,      # Epoch detik saat checkout
+                    "nama": "John Doe",
+                    "order": "Meja 4",          # Optional
+                    "items": [{"id": "Mkn001", "nama": "Nasi goreng",
+                               "qty": 2, "price": 23000}],
+                    "subtotal": 46000, "diskon": 4600, "ppn": 4140,
+                    "total": 45540, "cash": 50000, "kembalian": 4460
+                },
+                ...
+            ]
+        }
+
+    Response (JSON):
+        {
+            "synced": 1,
+            "results": [
+                {"client_id": "7f0c...", "status": "ok", "trx_id": "K3-00000043",
+                 "stock_short": []},
+                {"client_id": "...", "status": "ok", "trx_id": "K3-00000044",
+                 "stock_short": [], "review": ["Harga ... (menu sekarang ...)"]},
+                {"client_id": "...", "status": "duplicate", "trx_id": "K3-00000040"},
+                {"client_id": "...", "status": "rejected", "error": "..."},
+                {"client_id": "...", "status": "error", "error": "..."}
+            ]
+        }
+        ok / duplicate: hapus dari antrian client
+        review: tercatat, tapi harga / total berbeda (dicek admin)
+        rejected: data rusak, perlu dicek manual oleh kasir
+        error: gagal sementara, kirim ulang nanti
+
+    HTTP Status Codes:
+        200: Batch diproses (lihat status per transaksi)
+        400: Request tidak valid / batch terlalu besar
+    """
+    try:
+        data = request.get_json(silent=True)
+        checkouts = data.get("checkouts") if isinstance(data, dict) else None
+
+        if not isinstance(checkouts, list) or not checkouts:
+            return jsonify({"error": "Invalid request"}), 400
+        if len(checkouts) > OFFLINE_SYNC_MAX_BATCH:
+            return (
+                jsonify({"error": f"Maksimal {OFFLINE_SYNC_MAX_BATCH} transaksi per sync"}),
+                400,
+            )
+
+        outlet = current_outlet()
+        email = session["email"]
+        results = [sync_offline_checkout(entry, outlet, email) for entry in checkouts]
+
+        return jsonify(
+            {
+                "synced": sum(1 for result in results if result["status"] == "ok"),
+                "results": results,
+            }
+        )
+
+    except Exception as e:
+        app.logger.error(f"Error in checkout_sync: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+# ========================================================================
+# API ENDPOINT - CLEAR CART
+# ========================================================================
+
+
+@app.route("/cart/clear", methods=["POST"])
+@login_required
+def cart_clear():
+    """
+    Endpoint untuk menghapus semua item dari cart
+
+    Fungsi ini:
+    1. Mengosongkan cart (set ke empty list)
+    2. Reset cart count ke 0
+    3. Mark session as modified
+    4. Return success response
+
+    Use Cases:
+        - User klik tombol "Clear All" / "Hapus Semua"
+        - Memulai transaksi baru setelah pembayaran
+        - Cancel order dan start over
+
+    Request:
+        POST /cart/clear
+        (No body required)
+
+    Response (JSON):
+        {
+            "success": true
+        }
+
+    Note:
+        - Tidak ada validasi atau error handling khusus
+        - Operation selalu berhasil (idempotent)
+        - Memanggil endpoint ini multiple times aman
+    """
+
+    # Stok yang di-reserve cart dikembalikan
+    inventory.release(session_id(), current_outlet(), [tuple(line) for line in get_cart()])
+
+    # Kosongkan cart dengan set ke empty list
+    # Ini akan menghapus semua items yang ada
+    # Previous cart data akan lost (tidak bisa undo)
+    session["jumlahcart"] = []
+
+    # Reset cart count badge ke 0
+    # Ini untuk update icon cart counter di navbar
+    session["cart_count"] = 0
+
+    # Transaksi terakhir ikut dibatalkan bersama cart
+    session.pop("pembeli", None)
+
+    # Cart aktif kosong lagi = bukan pesanan meja manapun
+    session.pop("order", None)
+
+    # CRITICAL: Mark session as modified
+    # Tanpa ini, cart tidak akan ter-clear di server
+    session.modified = True
+
+    # Return success response
+    # Frontend akan:
+    # 1. Clear display cart items
+    # 2. Reset all totals to "-" or 0
+    # 3. Reset form inputs
+    # 4. Update badge counter
+    # 5. Show success message (optional)
+    return jsonify({"success": True})
+
+
+# ========================================================================
+# API ENDPOINT - PESANAN PARKIR (MULTI MEJA)
+# ========================================================================
+
+
+def order_name(value):
+    """Validasi nama pesanan (contoh "Meja 5"), None jika tidak valid"""
+    name = str(value or "").strip()
+    if not name or len(name) > ORDER_NAME_MAX_LENGTH:
+        return None
+    return name
+
+
+def orders_response(cart):
+    """Response JSON cart aktif + daftar pesanan parkir kasir"""
+    lines = expand_cart(cart)
+    subtotal, diskon, ppn, total = calculate_totals(lines)
+
+    return jsonify(
+        {
+            "order": session.get("order"),  # Nama pesanan aktif
+            "orders": parked_orders.list(session["email"]),  # Pesanan parkir
+            "cart": cart_json(lines),
+            "count": session["cart_count"],
+            "subtotal": subtotal,
+            "diskon": diskon,
+            "ppn": ppn,
+            "total": total,
+        }
+    )
+
+
+@app.route("/orders", methods=["GET"])
+@login_required
+def orders_list():
+    """
+    Daftar pesanan parkir milik kasir + cart aktif
+
+    Response (JSON):
+        {
+            "order": "Meja 2",                          # Pesanan aktif
+            "orders": [{"name": "Meja 5", "count": 3,   # Pesanan parkir
+                        "updated": 1733650000.0}],
+            "cart": [...], "count": 2, "subtotal": ..., ...
+        }
+    """
+    try:
+        return orders_response(get_cart())
+
+    except Exception as e:
+        app.logger.error(f"Error in orders_list: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@app.route("/orders/park", methods=["POST"])
+@login_required
+def orders_park():
+    """
+    Parkir cart aktif, lalu mulai cart kosong
+
+    Request (JSON):
+        {"name": "Meja 5"}   # Optional jika pesanan aktif sudah punya nama
+
+    HTTP Status Codes:
+        200: Success (format sama dengan GET /orders)
+        400: Cart kosong / nama tidak valid
+        409: Nama sudah dipakai pesanan parkir lain
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        name = order_name(data.get("name") or session.get("order"))
+        if not name:
+            return jsonify({"error": "Nama pesanan wajib diisi"}), 400
+
+        cart = get_cart()
+        if not cart:
+            return jsonify({"error": "Keranjang kosong"}), 400
+
+        parked_orders.swap(session["email"], park=(name, cart))
+
+        session.pop("order", None)
+        update_session_cart([])
+        return orders_response([])
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 409
+
+    except Exception as e:
+        app.logger.error(f"Error in orders_park: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@app.route("/orders/switch", methods=["POST"])
+@login_required
+def orders_switch():
+    """
+    Pindah ke pesanan parkir lain
+
+    Cart aktif (jika tidak kosong) otomatis diparkir dengan namanya
+    sendiri, lalu pesanan yang dipilih dijadikan cart aktif.
+
+    Request (JSON):
+        {
+            "name": "Meja 5",      # Pesanan yang dibuka
+            "park_as": "Meja 2"    # Optional, nama untuk cart aktif
+                                   # jika belum punya nama
+        }
+
+    HTTP Status Codes:
+        200: Success (format sama dengan GET /orders)
+        400: Nama tidak valid / cart aktif belum punya nama
+        404: Pesanan tidak ditemukan
+        409: Nama cart aktif sudah dipakai pesanan parkir lain
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        name = order_name(data.get("name"))
+        if not name:
+            return jsonify({"error": "Nama pesanan wajib diisi"}), 400
+
+        park = None
+        cart = get_cart()
+        if cart:
+            current = order_name(session.get("order") or data.get("park_as"))
+            if not current:
+                return jsonify({"error": "Beri nama pesanan aktif dulu"}), 400
+            park = (current, cart)
+
+        cart = parked_orders.swap(session["email"], park=park, take=name)
+
+        session["order"] = name
+        update_session_cart(cart)
+        return orders_response(cart)
+
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 409
+
+    except Exception as e:
+        app.logger.error(f"Error in orders_switch: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
 
-        # Simpan cart yang sudah dimodifikasi ke session
-        # Function ini juga menghitung cart_count untuk badge
-        update_session_cart(cart)
+# ========================================================================
+# API ENDPOINT - SHIFT KASIR (BUKA / TUTUP LACI)
+# ========================================================================
+
+
+def cash_amount(value):
+    """
+    Validasi jumlah uang rupiah (sama seperti cash di /checkout)
+
+    Returns:
+        int/None: Jumlah >= 0, None jika tidak valid
+    """
+    try:
+        amount = int(value)
+    except (ValueError, TypeError):
+        return None
+    return amount if amount >= 0 else None
+
+
+@app.route("/shift", methods=["GET"])
+@login_required
+def shift_current():
+    """
+    Shift terbuka kasir beserta total berjalan
+
+    Response (JSON):
+        {"shift": {"id": 3, "opening_cash": 200000, "trx_count": 12,
+                   "sales": 850000, "cash_in": 900000, "change_out": 50000,
+                   "expected_cash": 1050000, ...}}
+        {"shift": null} jika belum buka shift
+    """
+    try:
+        return jsonify({"shift": shifts.current(session["email"])})
+
+    except Exception as e:
+        app.logger.error(f"Error in shift_current: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@app.route("/shift/open", methods=["POST"])
+@login_required
+def shift_open():
+    """
+    Buka shift kasir
+
+    Request Body (JSON):
+        {"opening_cash": 200000}   # Modal awal di laci
+
+    HTTP Status Codes:
+        201: Shift dibuka
+        400: opening_cash tidak valid
+        409: Shift sebelumnya belum ditutup
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        opening_cash = cash_amount(data.get("opening_cash", 0))
+        if opening_cash is None:
+            return jsonify({"error": "Modal awal tidak valid"}), 400
+
+        shift = shifts.open(session["email"], current_outlet(), opening_cash)
+        return jsonify({"shift": shift}), 201
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 409
+
+    except Exception as e:
+        app.logger.error(f"Error in shift_open: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@app.route("/shift/close", methods=["POST"])
+@login_required
+def shift_close():
+    """
+    Tutup shift kasir dan bandingkan uang laci dengan hasil hitung
+
+    Laporan diambil langsung dari total berjalan shift (tanpa membaca
+    ulang transaksi).
+
+    Request Body (JSON):
+        {"counted_cash": 1045000}   # Uang di laci hasil hitung kasir
+
+    Response (JSON):
+        {
+            "shift": {...},             # Total shift (lihat GET /shift)
+            "expected_cash": 1050000,   # opening_cash + cash_in - change_out
+            "counted_cash": 1045000,
+            "selisih": -5000            # counted - expected (minus = kurang)
+        }
+
+    HTTP Status Codes:
+        200: Shift ditutup
+        400: counted_cash tidak valid
+        404: Tidak ada shift terbuka
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        counted_cash = cash_amount(data.get("counted_cash"))
+        if counted_cash is None:
+            return jsonify({"error": "Jumlah uang laci tidak valid"}), 400
+
+        shift = shifts.close(session["email"], counted_cash)
+        if shift is None:
+            return jsonify({"error": "Tidak ada shift yang terbuka"}), 404
+
+        return jsonify(
+            {
+                "shift": shift,
+                "expected_cash": shift["expected_cash"],
+                "counted_cash": counted_cash,
+                "selisih": counted_cash - shift["expected_cash"],
+            }
+        )
+
+    except Exception as e:
+        app.logger.error(f"Error in shift_close: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+# ========================================================================
+# API ENDPOINT - ANALITIK PENJUALAN (ADMIN) & CLI ARSIP
+# ========================================================================
+
+
+def parse_date_range(args):
+    """
+    Query ?from=YYYY-MM-DD&to=YYYY-MM-DD (tanggal lokal, to inklusif)
+
+    Returns:
+        tuple: (start, end) timestamp [start, end), None = tanpa batas
+
+    Raises:
+        ValueError: Format tanggal salah
+    """
+    start = end = None
+    if args.get("from"):
+        start = datetime.datetime.strptime(args["from"], "%Y-%m-%d").timestamp()
+    if args.get("to"):
+        end = (
+            datetime.datetime.strptime(args["to"], "%Y-%m-%d") + datetime.timedelta(days=1)
+        ).timestamp()
+    return start, end
+
+
+def sales_summary(start=None, end=None):
+    """
+    Ringkasan penjualan: arsip kolom + transaksi yang masih di jurnal
+
+    Returns:
+        dict: Hasil TransactionArchive.summary + avg_basket, avg_items,
+              top_items (10 item terlaris)
+    """
+    # Daftar segmen diambil sekali: batas arsip / jurnal harus konsisten
+    segments = trx_archive.segments()
+    archived_seq = segments[-1].header["seq_last"] if segments else 0
+    result = trx_archive.summary(start, end, segments)
+
+    # Transaksi terbaru (belum diarsip) dihitung langsung dari jurnal
+    utc_offset = int(datetime.datetime.now().astimezone().utcoffset().total_seconds())
+    for row in trx_journal.rows(after_seq=archived_seq, start=start, end=end):
+        waktu, subtotal, diskon, ppn, total, cash, kembalian, pembeli = row[4:]
+        items_sold = sum(line["qty"] for line in pembeli["items"])
+
+        result["trx_count"] += 1
+        result["sales"] += total
+        result["subtotal"] += subtotal
+        result["diskon"] += diskon
+        result["ppn"] += ppn
+        result["cash_in"] += cash
+        result["change_out"] += kembalian
+        result["items_sold"] += items_sold
+        result["items_per_hour"][(int(waktu) + utc_offset) // 3600 % 24] += items_sold
+        for line in pembeli["items"]:
+            result["item_qty"][str(line["id"])] += line["qty"]
+
+    trx_count = result["trx_count"]
+    result["avg_basket"] = result["sales"] // trx_count if trx_count else 0
+    result["avg_items"] = round(result["items_sold"] / trx_count, 2) if trx_count else 0
+    result["top_items"] = [
+        {"id": item_id, "qty": qty} for item_id, qty in result.pop("item_qty").most_common(10)
+    ]
+    return result
+
+
+@app.route("/admin/analytics", methods=["GET"])
+@login_required
+@admin_required
+def admin_analytics():
+    """
+    Ringkasan penjualan dalam rentang tanggal
+
+    Query Parameters (optional):
+        from: Tanggal awal (YYYY-MM-DD)
+        to: Tanggal akhir, inklusif (YYYY-MM-DD)
+
+    Response (JSON):
+        {
+            "trx_count": 1250, "items_sold": 4100,
+            "sales": 98000000, "subtotal": ..., "diskon": ..., "ppn": ...,
+            "cash_in": ..., "change_out": ...,
+            "avg_basket": 78400,            # Rata-rata total per transaksi
+            "avg_items": 3.28,              # Rata-rata item per transaksi
+            "items_per_hour": [0, 0, ..., 310, 420, ...],   # Jam 0-23
+            "top_items": [{"id": "Mkn001", "qty": 520}, ...]
+        }
+
+    HTTP Status Codes:
+        200: Success
+        400: Format tanggal salah
+        403: Bukan admin
+    """
+    try:
+        try:
+            start, end = parse_date_range(request.args)
+        except ValueError:
+            return jsonify({"error": "Format tanggal harus YYYY-MM-DD"}), 400
+
+        return jsonify(sales_summary(start, end))
+
+    except Exception as e:
+        app.logger.error(f"Error in admin_analytics: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@app.cli.command("archive-transactions")
+def archive_transactions_command():
+    """Pindahkan transaksi lama dari jurnal SQLite ke arsip kolom."""
+    segments, archived = compact_transactions()
+    click.echo(f"{archived} transaksi diarsip ke {segments} segmen baru")
+
+
+# ========================================================================
+# HELPER FUNCTIONS - LAYOUT STRUK THERMAL
+# ========================================================================
+
+# THERMAL PAPER SIZE
+# 80mm width = 226.77 points (80mm * 72/25.4)
+# Tinggi halaman TIDAK fixed: dihitung dari isi struk (lihat layout_struk)
+THERMAL_WIDTH = 226.77  # 80mm in points
+LEFT_MARGIN = 10  # 10 points from left
+RIGHT_MARGIN = THERMAL_WIDTH - 10  # 10 points from right
+CENTER_X = THERMAL_WIDTH / 2  # 113.385 points
+STRUK_TOP_MARGIN = 10  # Jarak dari tepi atas kertas ke logo
+STRUK_BOTTOM_MARGIN = 20  # Sisa kertas setelah baris terakhir
+
+LOGO_PATH = "static/img/LogoUBSI.png"
+LOGO_SIZE = 60  # 60x60 points
+
+STORE_NAME = "RESTORAN KELOMPOK 3"
+STORE_ADDRESS = [
+    "Cikarang Square",
+    "Jl. Cibarusah Raya No.168",
+    "Pasirsari, Cikarang Sel",
+    "Kab.Bekasi, Jawa Barat 17550",
+]
+
+# Logo di-load sekali saja lalu dipakai ulang di setiap struk
+# None = belum dicoba, False = file logo tidak tersedia
+_logo_cache = None
+
+
+def get_logo():
+    """
+    Mengambil ImageReader logo struk (di-cache di memory)
+
+    Returns:
+        ImageReader: Logo siap digambar
+        None: Jika file logo tidak ditemukan / tidak valid
+    """
+    global _logo_cache
+
+    if _logo_cache is None:
+        try:
+            # File logo asli berukuran besar (1269x1280 px) padahal hanya
+            # dicetak 60pt. Resize sekali ke 3x ukuran cetak (~216 dpi,
+            # setara resolusi printer thermal) agar PDF jauh lebih kecil
+            logo = Image.open(LOGO_PATH)
+            logo.thumbnail((LOGO_SIZE * 3, LOGO_SIZE * 3))
+            _logo_cache = ImageReader(logo)
+        except Exception as e:
+            app.logger.warning(f"Logo not found: {str(e)}")
+            _logo_cache = False
+
+    return _logo_cache or None
+
+
+def layout_struk(data):
+    """
+    Menyusun layout struk thermal dalam 2 tahap: MEASURE lalu EMIT
+
+    Tahap measure menghitung posisi setiap elemen sebagai jarak dari
+    ATAS kertas (offset), sehingga tinggi total struk sudah diketahui
+    sebelum satupun elemen digambar. Hasilnya 1 halaman continuous
+    dengan tinggi pas, tanpa page break dan tanpa whitespace sisa.
+
+    Args:
+        data (dict): Data transaksi dengan keys:
+                    - nama, cash, subtotal, diskon, ppn, total, kembalian
+                    - items: list of {"nama", "qty", "price"}
+                    - waktu: datetime transaksi
+                    - nomor: nomor struk
+
+    Returns:
+        tuple: (height, ops)
+               height = tinggi halaman dalam points
+               ops = list of drawing commands, contoh:
+                     ("font", "Helvetica", 8)
+                     ("text", "left"|"right"|"center", x, offset, text)
+                     ("line", line_width, offset)
+                     ("image", x, offset, size)
+    """
+    ops = []
+    offset = STRUK_TOP_MARGIN
+
+    def font(name, size):
+        ops.append(("font", name, size))
+
+    def text(align, x, value):
+        ops.append(("text", align, x, offset, value))
+
+    def separator(width):
+        ops.append(("line", width, offset))
+
+    # ============================================================
+    # HEADER - LOGO, NAMA TOKO & ALAMAT
+    # ============================================================
+
+    if get_logo():
+        # Offset image = sisi BAWAH gambar (koordinat PDF mulai dari bawah)
+        offset += LOGO_SIZE
+        ops.append(("image", (THERMAL_WIDTH - LOGO_SIZE) / 2, offset, LOGO_SIZE))
+    offset += 20
+
+    font("Helvetica-Bold", 11)
+    text("center", CENTER_X, STORE_NAME)
+    offset += 15
+
+    font("Helvetica", 7)
+    for line in STORE_ADDRESS:
+        text("center", CENTER_X, line)
+        offset += 10
+
+    text("center", CENTER_X, data["waktu"].strftime("%d-%m-%Y %H:%M:%S"))
+    offset += 15
+
+    separator(0.5)
+    offset += 15
+
+    # ============================================================
+    # CUSTOMER NAME
+    # ============================================================
+
+    font("Helvetica", 8)
+    text("left", LEFT_MARGIN, f"Customer : {data['nama']}")
+    offset += 15
+
+    separator(0.5)
+    offset += 15
+
+    # ============================================================
+    # ITEMS LIST
+    # ============================================================
+
+    font("Helvetica-Bold", 8)
+    text("left", LEFT_MARGIN, "PESANAN")
+    text("right", RIGHT_MARGIN, "TOTAL")
+    offset += 12
+
+    separator(0.3)
+    offset += 12
+
+    font("Helvetica", 8)
+    for item in data["items"]:
+        # Nama panjang di-wrap sesuai lebar kertas (bukan di-truncate)
+        # simpleSplit mengukur lebar text dengan font metrics yang sama
+        for line in simpleSplit(
+            str(item["nama"]), "Helvetica", 8, RIGHT_MARGIN - LEFT_MARGIN
+        ):
+            text("left", LEFT_MARGIN, line)
+            offset += 10
+
+        item_total = item["price"] * item["qty"]
+        text("left", LEFT_MARGIN, f"  {item['qty']} x Rp {item['price']:,}")
+        text("right", RIGHT_MARGIN, f"Rp {item_total:,}")
+        offset += 15
+
+    # ============================================================
+    # TOTALS SECTION
+    # ============================================================
+
+    separator(0.5)
+    offset += 15
+
+    font("Helvetica", 8)
+    text("left", LEFT_MARGIN, "Subtotal")
+    text("right", RIGHT_MARGIN, f"Rp {data['subtotal']:,}")
+    offset += 12
+
+    text("left", LEFT_MARGIN, "Diskon (10%)")
+    text("right", RIGHT_MARGIN, f"Rp {data['diskon']:,}")
+    offset += 12
+
+    text("left", LEFT_MARGIN, "PPN (10%)")
+    text("right", RIGHT_MARGIN, f"Rp {data['ppn']:,}")
+    offset += 15
+
+    separator(1)
+    offset += 15
+
+    font("Helvetica-Bold", 10)
+    text("left", LEFT_MARGIN, "TOTAL")
+    text("right", RIGHT_MARGIN, f"Rp {data['total']:,}")
+    offset += 15
+
+    separator(0.5)
+    offset += 15
+
+    font("Helvetica", 8)
+    text("left", LEFT_MARGIN, "Bayar")
+    text("right", RIGHT_MARGIN, f"Rp {data['cash']:,}")
+    offset += 12
+
+    text("left", LEFT_MARGIN, "Kembali")
+    text("right", RIGHT_MARGIN, f"Rp {data['kembalian']:,}")
+    offset += 20
+
+    # ============================================================
+    # FOOTER
+    # ============================================================
+
+    separator(0.5)
+    offset += 15
+
+    font("Helvetica-Bold", 8)
+    text("center", CENTER_X, "TERIMA KASIH")
+    offset += 10
+
+    font("Helvetica", 7)
+    text("center", CENTER_X, "Atas Kunjungan Anda")
+    offset += 15
+
+    font("Helvetica", 6)
+    text("center", CENTER_X, "Powered by Kelompok 3")
+    offset += 10
+
+    text("center", CENTER_X, f"Struk: {data['nomor']}")
+
+    return offset + STRUK_BOTTOM_MARGIN, ops
+
+
+def draw_struk(pdf, height, ops):
+    """
+    Menggambar hasil layout_struk ke canvas dalam satu pass
+
+    Offset (jarak dari atas) dikonversi ke koordinat PDF (dari bawah)
+    dengan rumus: y = height - offset
+    """
+    pdf.setPageSize((THERMAL_WIDTH, height))
+
+    for op in ops:
+        kind = op[0]
+
+        if kind == "font":
+            pdf.setFont(op[1], op[2])
+
+        elif kind == "text":
+            _, align, x, offset, value = op
+            if align == "center":
+                pdf.drawCentredString(x, height - offset, value)
+            elif align == "right":
+                pdf.drawRightString(x, height - offset, value)
+            else:
+                pdf.drawString(x, height - offset, value)
+
+        elif kind == "line":
+            _, width, offset = op
+            pdf.setLineWidth(width)
+            pdf.line(LEFT_MARGIN, height - offset, RIGHT_MARGIN, height - offset)
+
+        elif kind == "image":
+            _, x, offset, size = op
+            pdf.drawImage(
+                get_logo(),
+                x,
+                height - offset,
+                width=size,
+                height=size,
+                preserveAspectRatio=True,
+            )
+
+    pdf.showPage()
+
+
+def render_struk(data):
+    """
+    Render struk thermal menjadi bytes PDF (1 halaman, tinggi pas)
+
+    invariant=1 membuat output deterministik (tanpa timestamp/ID acak
+    dari reportlab), sehingga data yang sama selalu menghasilkan bytes
+    yang sama. pageCompression=1 mengompres content stream halaman.
+
+    Args:
+        data (dict): Data transaksi (format sama seperti layout_struk)
+
+    Returns:
+        bytes: Isi file PDF
+    """
+    height, ops = layout_struk(data)
+
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(
+        buffer,
+        pagesize=(THERMAL_WIDTH, height),
+        pageCompression=1,
+        invariant=1,
+    )
+    draw_struk(pdf, height, ops)
+    pdf.save()
+
+    return buffer.getvalue()
+
+
+# ========================================================================
+# HELPER CLASS - CACHE STRUK (REPRINT)
+# ========================================================================
+
+
+class StrukCache:
+    """
+    LRU cache untuk bytes PDF struk, di-key dengan transaction id
+
+    Struk yang sama (reprint / browser retry download) cukup di-render
+    sekali. Request berikutnya langsung dilayani dari cache tanpa
+    menghitung ulang total dan tanpa memanggil reportlab.
+
+    Layer cache:
+        1. Memory: OrderedDict LRU per proses, dibatasi total ukuran bytes
+        2. Disk (optional): file <trx_id>.pdf di disk_dir. Folder ini
+           adalah satu-satunya sumber kebenaran untuk layer disk (tidak
+           ada index per proses), jadi struk yang ditulis worker lain
+           langsung terlihat dan cache tetap ada setelah worker restart.
+           Batas ukuran dihitung dari isi folder (mtime = urutan LRU)
+
+    Setiap entry menyimpan ETag (hash isi PDF) untuk conditional GET.
+    """
+
+    # Folder di-scan ulang setiap proses ini menulis sebanyak
+    # disk_max_bytes / DISK_PRUNE_FRACTION bytes
+    DISK_PRUNE_FRACTION = 16
+
+    def __init__(self, max_bytes, disk_dir=None, disk_max_bytes=0):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+
+        # trx_id -> (pdf_bytes, etag)
+        self._memory = OrderedDict()
+        self._memory_size = 0
+
+        # Bytes yang ditulis proses ini ke disk sejak scan terakhir
+        self._disk_written = 0
+
+        self._lock = threading.Lock()
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self.prune_disk()
+
+    @staticmethod
+    def make_etag(pdf_bytes):
+        return hashlib.sha1(pdf_bytes).hexdigest()
+
+    def _disk_path(self, trx_id):
+        return os.path.join(self.disk_dir, f"{trx_id}.pdf")
+
+    def _remember(self, trx_id, pdf_bytes, etag):
+        # Dipanggil dengan lock sudah dipegang
+        old = self._memory.pop(trx_id, None)
+        if old:
+            self._memory_size -= len(old[0])
+
+        self._memory[trx_id] = (pdf_bytes, etag)
+        self._memory_size += len(pdf_bytes)
+
+        # Evict entry paling lama sampai ukuran kembali di bawah batas
+        while self._memory_size > self.max_bytes and len(self._memory) > 1:
+            _, (evicted, _) = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted)
+
+    def get(self, trx_id, promote=True):
+        """
+        Args:
+            trx_id (str): Nomor struk
+            promote (bool): False untuk baca massal (export): entry tidak
+                            ditandai baru dipakai dan hit dari disk tidak
+                            masuk memory, jadi tidak menggeser struk yang
+                            baru di-reprint kasir
+
+        Returns:
+            tuple: (pdf_bytes, etag) jika ada di cache
+            None: Jika cache miss (memory dan disk)
+        """
+        with self._lock:
+            entry = self._memory.get(trx_id)
+            if entry:
+                if promote:
+                    self._memory.move_to_end(trx_id)
+                return entry
+
+        if not self.disk_dir:
+            return None
+
+        # Baca langsung dari folder: file bisa saja ditulis worker lain
+        path = self._disk_path(trx_id)
+        try:
+            with open(path, "rb") as file:
+                pdf_bytes = file.read()
+        except OSError:
+            return None
+
+        etag = self.make_etag(pdf_bytes)
+        if not promote:
+            return pdf_bytes, etag
+
+        # Tandai baru dipakai, supaya tidak dihapus duluan oleh prune_disk
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        with self._lock:
+            self._remember(trx_id, pdf_bytes, etag)
+        return pdf_bytes, etag
+
+    def put(self, trx_id, pdf_bytes):
+        """
+        Simpan PDF ke cache memory (dan disk jika diaktifkan)
+
+        Returns:
+            str: ETag dari PDF yang disimpan
+        """
+        etag = self.make_etag(pdf_bytes)
+
+        with self._lock:
+            self._remember(trx_id, pdf_bytes, etag)
+
+        if self.disk_dir:
+            self._write_disk(trx_id, pdf_bytes)
+
+        return etag
+
+    def _write_disk(self, trx_id, pdf_bytes):
+        path = self._disk_path(trx_id)
+
+        try:
+            # Tulis ke file sementara lalu rename (atomic)
+            # Worker lain tidak pernah membaca file yang setengah jadi
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as file:
+                file.write(pdf_bytes)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            app.logger.warning(f"Gagal menyimpan cache struk: {str(e)}")
+            return
+
+        with self._lock:
+            self._disk_written += len(pdf_bytes)
+            due = self._disk_written * self.DISK_PRUNE_FRACTION >= self.disk_max_bytes
+            if due:
+                self._disk_written = 0
+
+        if due:
+            self.prune_disk()
+
+    def prune_disk(self):
+        """
+        Hapus file paling lama (mtime) sampai total isi folder di bawah
+        disk_max_bytes
+
+        Dihitung dari folder bersama, bukan counter per proses, jadi
+        batasnya berlaku untuk semua worker sekaligus. Di antara dua scan
+        folder bisa melewati batas paling banyak
+        disk_max_bytes / DISK_PRUNE_FRACTION per worker.
+
+        Returns:
+            int: Jumlah file yang dihapus
+        """
+        entries = []
+        total = 0
+        try:
+            with os.scandir(self.disk_dir) as it:
+                for entry in it:
+                    if not entry.name.endswith(".pdf"):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue  # Sudah dihapus worker lain
+                    entries.append((stat.st_mtime, entry.path, stat.st_size))
+                    total += stat.st_size
+        except OSError as e:
+            app.logger.warning(f"Gagal scan cache struk: {str(e)}")
+            return 0
+
+        if total <= self.disk_max_bytes:
+            return 0
+
+        removed = 0
+        entries.sort()
+        for _, path, size in entries:
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass  # Sudah dihapus worker lain
+            total -= size
+
+        return removed
+
+
+# Ukuran cache bisa diatur lewat config
+# STRUK_CACHE_DIR = None berarti cache hanya di memory
+app.config.setdefault("STRUK_CACHE_MAX_BYTES", 32 * 1024 * 1024)
+app.config.setdefault("STRUK_CACHE_DIR", None)
+app.config.setdefault("STRUK_CACHE_DISK_MAX_BYTES", 256 * 1024 * 1024)
+
+struk_cache = StrukCache(
+    app.config["STRUK_CACHE_MAX_BYTES"],
+    disk_dir=app.config["STRUK_CACHE_DIR"],
+    disk_max_bytes=app.config["STRUK_CACHE_DISK_MAX_BYTES"],
+)
+
+
+def send_struk(pdf_bytes, etag, filename):
+    """
+    Membuat response download PDF struk dengan dukungan ETag
+
+    Jika browser mengirim If-None-Match yang cocok, response otomatis
+    menjadi 304 Not Modified tanpa body.
+    """
+    response = app.response_class(pdf_bytes, mimetype="application/pdf")
+    response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    response.set_etag(etag)
+
+    return response.make_conditional(request)
+
+
+# ========================================================================
+# API ENDPOINT - DOWNLOAD STRUK PDF
+# ========================================================================
+
+
+def struk_data(pembeli):
+    """
+    Convert snapshot transaksi (session["pembeli"]) ke format layout_struk
+
+    Tidak ada perhitungan di sini: semua angka sudah di-freeze oleh
+    /checkout, hanya timestamp yang di-convert kembali ke datetime.
+    """
+    return {
+        **pembeli,
+        "waktu": datetime.datetime.fromtimestamp(pembeli["waktu"]),
+        "nomor": pembeli["trx_id"],
+    }
+
+
+def struk_owner_snapshot(trx_id):
+    """
+    Snapshot transaksi trx_id, HANYA jika user yang login boleh melihatnya
+
+    Boleh melihat struk:
+        - Transaksi terakhir di session ini (hasil /checkout)
+        - Transaksi di jurnal yang dibuat oleh kasir yang sama
+        - Admin: semua transaksi di jurnal
+
+    trx_id berurutan (K3-00000001, ...), jadi pengecekan ini wajib
+    dilakukan sebelum struk_cache dibaca: tanpa ini user mana pun bisa
+    menebak trx_id dan melihat nama, item, dan uang customer lain.
+
+    Returns:
+        dict: Snapshot pembeli, None jika tidak ada / bukan milik user
+    """
+    pembeli = session.get("pembeli")
+    if pembeli and pembeli.get("trx_id") == trx_id:
+        return pembeli
+
+    row = trx_journal.get(trx_id)
+    if row is None:
+        return None
+
+    email = session.get("email")
+    if row[3] != email and email not in ADMINS:
+        return None
+
+    return row[-1]
+
+
+@app.route("/struk/<trx_id>", methods=["GET"])
+@login_required
+def download_struk(trx_id):
+    """
+    Download / reprint PDF struk thermal (80mm) berdasarkan transaction id
+    Format struk seperti Indomaret/Alfamart
+
+    Alur:
+        1. Cek hak akses (struk_owner_snapshot) → 404 jika bukan milik user
+        2. Cek struk_cache → jika ada, kirim bytes langsung (reprint/retry)
+        3. Jika belum ada, render dari snapshot transaksi (session atau
+           jurnal) lalu simpan ke cache
+        Total TIDAK dihitung ulang dan cash TIDAK divalidasi ulang:
+        semua sudah di-freeze saat checkout.
+
+    Response:
+        200: File PDF (dengan header ETag)
+        304: Not Modified jika If-None-Match cocok
+        404: Transaksi tidak ditemukan / bukan milik user
+    """
+
+    try:
+        # Cek akses dulu, termasuk untuk cache hit. Transaksi milik user
+        # lain dijawab 404 (bukan 403) supaya trx_id tidak bisa di-probe
+        pembeli = struk_owner_snapshot(trx_id)
+        if not pembeli:
+            return jsonify({"error": "Struk tidak ditemukan"}), 404
 
-        # Hitung semua total finansial untuk response
-        # calculate_totals return tuple: (subtotal, diskon, ppn, total)
-        subtotal, diskon, ppn, total = calculate_totals(cart)
+        cached = struk_cache.get(trx_id)
 
-        # ============================================================
-        # STEP 9: RETURN SUCCESS RESPONSE
-        # ============================================================
+        if not cached:
+            pdf_bytes = render_struk(struk_data(pembeli))
+            app.logger.debug(f"PDF struk {trx_id}: {len(pdf_bytes)} bytes")
 
-        # Return JSON response dengan semua data yang dibutuhkan frontend
-        # Status code 200 (OK) adalah default untuk return tanpa error
-        return jsonify(
-            {
-                "cart": cart,  # List lengkap items di cart
-                "count": sum(i["qty"] for i in cart),  # Total qty untuk badge
-                "subtotal": subtotal,  # Total sebelum diskon
-                "diskon": diskon,  # Potongan harga
-                "ppn": ppn,  # Pajak
-                "total": total,  # Total akhir yang harus dibayar
-            }
-        )
+            cached = (pdf_bytes, struk_cache.put(trx_id, pdf_bytes))
 
-    # ============================================================
-    # EXCEPTION HANDLING
-    # ============================================================
+        return send_struk(cached[0], cached[1], f"struk-{trx_id}.pdf")
 
     except Exception as e:
-        # Catch-all untuk unexpected errors
-        # Contoh errors yang bisa terjadi:
-        # - KeyError jika item structure tidak sesuai
-        # - TypeError jika ada type mismatch
-        # - Any runtime errors
+        app.logger.error(f"Error in download_struk: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
 
-        # Log error untuk debugging
-        # Di production, log ini akan masuk ke file atau monitoring system
-        app.logger.error(f"Error in cart_update: {str(e)}")
 
-        # Return generic error message
-        # JANGAN expose detail error ke client untuk security
-        # Status code 500 = Internal Server Error
-        return jsonify({"error": "Internal server error"}), 500
+@app.route("/generate_struk", methods=["POST"])
+@login_required
+def generate_struk():
+    """
+    Endpoint lama untuk download struk (compatibility)
+
+    Sekarang hanya men-download struk dari transaksi terakhir hasil
+    /checkout. Client baru sebaiknya langsung memakai struk_url dari
+    response /checkout.
+
+    Tanpa @idempotent: request ini tidak mengubah apapun (aman diulang),
+    dan body PDF tidak perlu ikut disimpan di idempotency_keys.
+    """
+    pembeli = session.get("pembeli")
+    if not pembeli:
+        return jsonify({"error": "Silakan proses pembayaran terlebih dahulu"}), 400
+
+    return download_struk(pembeli["trx_id"])
 
 
 # ========================================================================
-# API ENDPOINT - CHECKOUT
+# API ENDPOINT - EXPORT PENJUALAN HARIAN (CSV & ZIP STRUK)
 # ========================================================================
 
+# Chunk CSV dikirim setiap buffer mencapai ukuran ini
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+EXPORT_CSV_HEADER = (
+    "trx_id",
+    "waktu",
+    "outlet",
+    "kasir",
+    "pembeli",
+    "order",
+    "item_id",
+    "item",
+    "qty",
+    "harga",
+    "jumlah",
+)
+
 
-@app.route("/checkout", methods=["POST"])
-@login_required
-def checkout():
+class ExportStream:
     """
-    Endpoint untuk memproses pembayaran
+    Tujuan tulis zipfile untuk response streaming
 
-    Proses checkout meliputi:
-    1. Validasi data pembeli (nama, cash)
-    2. Validasi cart tidak kosong
-    3. Hitung total pembayaran
-    4. Validasi uang cukup
-    5. Hitung kembalian
-    6. Simpan data transaksi ke session
-    7. Return rincian pembayaran
+    Tidak seekable (tidak ada tell/seek), jadi zipfile menulis entry
+    secara berurutan dengan data descriptor. Isi yang sudah ditulis
+    diambil dengan drain() lalu di-yield ke client.
+    """
 
-    Request Body (JSON):
-        {
-            "nama": "John Doe",
-            "cash": 150000
-        }
+    def __init__(self):
+        self._chunks = []
 
-    Response (JSON):
-        Success (200):
-        {
-            "nama": "John Doe",
-            "cash": 150000,
-            "subtotal": 100000,
-            "ppn": 9000,
-            "diskon": 10000,
-            "total": 99000,
-            "kembalian": 51000
-        }
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
 
-        Error (400):
-        {
-            "error": "Error message"
-        }
+    def flush(self):
+        pass
 
-    Validation Rules:
-        - Nama: tidak boleh kosong atau hanya spasi
-        - Cash: harus integer positif
-        - Cart: minimal 1 item
-        - Cash: harus >= total
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def export_date_range(args):
+    """
+    Rentang export: ?from=&to= seperti /admin/analytics, default hari ini
+
+    Returns:
+        tuple: (start, end, label) - label untuk nama file
+
+    Raises:
+        ValueError: Format tanggal salah
+    """
+    if not args.get("from") and not args.get("to"):
+        today = datetime.date.today().isoformat()
+        args = {"from": today, "to": today}
+
+    start, end = parse_date_range(args)
+    label = "_".join(args[key] for key in ("from", "to") if args.get(key))
+    if args.get("from") == args.get("to"):
+        label = args["from"]
+    return start, end, label
+
+
+def export_archived(start, end):
+    """
+    Cek apakah sebagian rentang sudah dipindah ke arsip kolom
+
+    Arsip hanya menyimpan angka (tanpa nomor struk / nama), jadi
+    export hanya bisa dari jurnal.
+    """
+    for segment in trx_archive.segments():
+        header = segment.header
+        if (start is None or header["ts_max"] >= start) and (
+            end is None or header["ts_min"] < end
+        ):
+            return True
+    return False
+
+
+def export_csv_chunks(rows):
+    """
+    Generator CSV line item (satu baris per item per transaksi)
+
+    Args:
+        rows (iterable): Baris jurnal (TransactionJournal.scan)
+
+    Yields:
+        bytes: Chunk CSV UTF-8, masing-masing sekitar EXPORT_CHUNK_SIZE
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_CSV_HEADER)
+
+    for row in rows:
+        _, trx_id, outlet, email, waktu = row[:5]
+        pembeli = row[-1]
+        waktu = datetime.datetime.fromtimestamp(waktu).strftime("%Y-%m-%d %H:%M:%S")
+
+        for line in pembeli["items"]:
+            writer.writerow(
+                (
+                    trx_id,
+                    waktu,
+                    outlet,
+                    email,
+                    pembeli.get("nama") or "",
+                    pembeli.get("order") or "",
+                    line["id"],
+                    line["nama"],
+                    line["qty"],
+                    line["price"],
+                    line["price"] * line["qty"],
+                )
+            )
+
+        if buffer.tell() >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue().encode("utf-8")
+
+
+def export_struk_chunks(rows):
+    """
+    Generator file ZIP berisi PDF struk setiap transaksi
+
+    Layout struk sama persis dengan /struk/<trx_id> (render_struk +
+    struk_data dari snapshot checkout). Struk yang masih ada di
+    struk_cache dipakai langsung tanpa render ulang. Cache dibaca dengan
+    promote=False dan hasil render baru tidak dimasukkan ke cache,
+    supaya export tidak mengusir struk yang sedang sering di-reprint. PDF sudah terkompres, jadi entry ZIP
+    disimpan tanpa kompresi (ZIP_STORED).
+
+    Yields:
+        bytes: Chunk ZIP, satu per struk (+ central directory di akhir)
+    """
+    stream = ExportStream()
+
+    with zipfile.ZipFile(stream, "w", zipfile.ZIP_STORED) as archive:
+        for row in rows:
+            trx_id, pembeli = row[1], row[-1]
+
+            cached = struk_cache.get(trx_id, promote=False)
+            pdf_bytes = cached[0] if cached else render_struk(struk_data(pembeli))
+
+            info = zipfile.ZipInfo(
+                f"struk-{trx_id}.pdf",
+                date_time=time.localtime(pembeli["waktu"])[:6],
+            )
+            archive.writestr(info, pdf_bytes)
+            yield stream.drain()
+
+    yield stream.drain()
+
+
+def export_response(chunks, mimetype, filename):
+    """Response streaming untuk file export (tidak di-buffer / dikompres)"""
+    response = app.response_class(chunks, mimetype=mimetype)
+    response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+
+@app.route("/admin/export/penjualan.csv", methods=["GET"])
+@login_required
+@admin_required
+def export_sales_csv():
     """
+    Export line item penjualan (CSV) untuk akuntansi, streaming
+
+    Query Parameters (optional):
+        from: Tanggal awal (YYYY-MM-DD), default hari ini
+        to: Tanggal akhir, inklusif (YYYY-MM-DD), default hari ini
 
+    Response:
+        text/csv, kolom: trx_id, waktu, outlet, kasir, pembeli, order,
+        item_id, item, qty, harga, jumlah
+
+    HTTP Status Codes:
+        200: Success (dikirim bertahap)
+        400: Format tanggal salah
+        403: Bukan admin
+        410: Sebagian transaksi sudah dipindah ke arsip
+    """
     try:
-        # ============================================================
-        # STEP 1: VALIDASI REQUEST & EXTRACT DATA
-        # ============================================================
+        try:
+            start, end, label = export_date_range(request.args)
+        except ValueError:
+            return jsonify({"error": "Format tanggal harus YYYY-MM-DD"}), 400
 
-        # Parse JSON dari request body
-        data = request.get_json()
+        if export_archived(start, end):
+            return jsonify({"error": "Transaksi pada tanggal ini sudah diarsip"}), 410
 
-        # Validasi: pastikan request mengandung JSON
-        if not data:
-            return jsonify({"error": "Invalid request"}), 400
+        return export_response(
+            export_csv_chunks(trx_journal.scan(start, end)),
+            "text/csv",
+            f"penjualan-{label}.csv",
+        )
 
-        # ============================================================
-        # STEP 2: VALIDASI NAMA PEMBELI
-        # ============================================================
+    except Exception as e:
+        app.logger.error(f"Error in export_sales_csv: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
 
-        # Extract nama pembeli
-        # .get("nama", "") return empty string jika key tidak ada
-        # .strip() remove leading/trailing whitespace
-        nama = data.get("nama", "").strip()
 
-        # Validasi: nama tidak boleh kosong
-        # Empty string atau hanya spasi akan fail validation
-        # Nama penting untuk:
-        # - Identifikasi pembeli di struk
-        # - Courtesy (sapaan ke customer)
-        # - Audit trail jika perlu
-        if not nama:
-            return jsonify({"error": "Nama tidak boleh kosong"}), 400
+@app.route("/admin/export/struk.zip", methods=["GET"])
+@login_required
+@admin_required
+def export_struk_zip():
+    """
+    Export semua struk PDF dalam satu file ZIP, streaming
 
-        # ============================================================
-        # STEP 3: VALIDASI JUMLAH UANG (CASH)
-        # ============================================================
+    Query Parameters (optional):
+        from: Tanggal awal (YYYY-MM-DD), default hari ini
+        to: Tanggal akhir, inklusif (YYYY-MM-DD), default hari ini
+
+    Response:
+        application/zip berisi struk-<trx_id>.pdf per transaksi
 
+    HTTP Status Codes:
+        200: Success (dikirim bertahap)
+        400: Format tanggal salah
+        403: Bukan admin
+        410: Sebagian transaksi sudah dipindah ke arsip
+    """
+    try:
         try:
-            # Convert cash ke integer
-            # Rupiah tidak menggunakan desimal, jadi int sudah cukup
-            # .get("cash", 0) return 0 jika key tidak ada
-            cash = int(data.get("cash", 0))
+            start, end, label = export_date_range(request.args)
+        except ValueError:
+            return jsonify({"error": "Format tanggal harus YYYY-MM-DD"}), 400
 
-        except (ValueError, TypeError):
-            # ValueError: jika input bukan angka (contoh: "abc", "12.5abc")
-            # TypeError: jika input adalah type yang tidak bisa di-convert
+        if export_archived(start, end):
+            return jsonify({"error": "Transaksi pada tanggal ini sudah diarsip"}), 410
 
-            # Return error message yang user-friendly
-            # Jangan expose technical error (ValueError) ke user
-            return jsonify({"error": "Jumlah uang tidak valid"}), 400
+        return export_response(
+            export_struk_chunks(trx_journal.scan(start, end)),
+            "application/zip",
+            f"struk-{label}.zip",
+        )
 
-        # ============================================================
-        # STEP 4: VALIDASI CART TIDAK KOSONG
-        # ============================================================
+    except Exception as e:
+        app.logger.error(f"Error in export_struk_zip: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
 
-        # Ambil cart dari session
-        cart = session.get("jumlahcart", [])
 
-        # Validasi: cart minimal harus punya 1 item
-        # Empty cart bisa terjadi jika:
-        # - User langsung akses /checkout tanpa shopping
-        # - Session expired
-        # - Cart di-clear tapi user masih di checkout page
-        if not cart:
-            return jsonify({"error": "Keranjang kosong"}), 400
+# ========================================================================
+# API ENDPOINT - PILIH OUTLET
+# ========================================================================
 
-        # ============================================================
-        # STEP 5: HITUNG TOTAL PEMBAYARAN
-        # ============================================================
 
-        # Hitung subtotal dari semua item di cart
-        # sum() dengan generator expression
-        # Loop setiap item, kalikan price × qty, lalu jumlahkan
-        subtotal = sum(int(item["price"]) * int(item["qty"]) for item in cart)
+@app.route("/outlet", methods=["GET", "POST"])
+@login_required
+def outlet_select():
+    """
+    Melihat / mengganti outlet yang dipakai session kasir
 
-        # Hitung diskon, ppn, dan total akhir
-        # Menggunakan helper function hitung_total()
-        # yang mengapply semua logic perpajakan
-        diskon, ppn, total = hitung_total(subtotal)
+    Outlet menentukan katalog (harga & item yang dijual), nomor struk,
+    stok, dan cache menu yang dipakai. Outlet hanya bisa diganti saat
+    cart kosong: reservasi stok cart tercatat di outlet lama, dan
+    checkout / minus / clear selalu memakai outlet aktif.
 
-        # ============================================================
-        # STEP 6: VALIDASI UANG CUKUP
-        # ============================================================
+    Request (POST JSON):
+        {"outlet": "K5"}
 
-        # Cek apakah cash yang diberikan >= total yang harus dibayar
-        if cash < total:
-            # Uang tidak cukup, return error dengan detail
-            # Format angka dengan thousand separator (:,)
-            # Contoh: 99000 → "99,000"
-            # Ini memudahkan user untuk baca dan membandingkan
+    Response (JSON):
+        {
+            "outlet": "K5",                # Outlet aktif
+            "outlets": ["K3", "K5"],       # Semua outlet yang tersedia
+            "version": "6f1c0e1d9a7b2c44"  # Versi katalog outlet aktif
+        }
+
+    HTTP Status Codes:
+        200: Success
+        404: Outlet tidak dikenal
+        409: Cart belum kosong
+    """
+    if request.method == "POST":
+        data = request.get_json(silent=True) or {}
+        outlet = str(data.get("outlet", "")).strip()
+
+        if outlet not in catalogs:
+            return jsonify({"error": "Outlet tidak ditemukan"}), 404
+
+        if outlet != current_outlet() and get_cart():
             return (
-                jsonify(
-                    {
-                        "error": f"Uang tidak cukup. Total: Rp {total:,}, Uang: Rp {cash:,}"
-                    }
-                ),
-                400,
+                jsonify({"error": "Kosongkan keranjang sebelum ganti outlet"}),
+                409,
             )
 
-        # ============================================================
-        # STEP 7: HITUNG KEMBALIAN
-        # ============================================================
+        session["outlet"] = outlet
+        session.modified = True
 
-        # Kembalian = Uang yang diberikan - Total yang harus dibayar
-        # Contoh: Rp 150.000 - Rp 99.000 = Rp 51.000
-        kembalian = cash - total
+    return jsonify(
+        {
+            "outlet": current_outlet(),
+            "outlets": sorted(catalogs),
+            "version": current_catalog().version,
+        }
+    )
 
-        # ============================================================
-        # STEP 8: SIMPAN DATA TRANSAKSI KE SESSION
-        # ============================================================
 
-        # Simpan semua data pembayaran ke session
-        # Data ini akan digunakan untuk:
-        # 1. Display rincian di halaman pembayaran
-        # 2. Generate PDF struk
-        # 3. Audit trail (bisa dipindah ke database nantinya)
-        session["pembeli"] = {
-            "nama": nama,  # Nama customer
-            "cash": cash,  # Uang yang dibayar
-            "subtotal": subtotal,  # Total sebelum diskon & pajak
-            "ppn": ppn,  # Pajak 10%
-            "diskon": diskon,  # Diskon 10%
-            "total": total,  # Total akhir
-            "kembalian": kembalian,  # Uang kembali
+# ========================================================================
+# API ENDPOINT - KETERSEDIAAN MENU (SOLD OUT)
+# ========================================================================
+
+
+def outlet_overlay_path(outlet):
+    return os.path.join(OUTLETS_DIR, f"{outlet}.json")
+
+
+def set_item_availability(outlet, item_id, available):
+    """
+    Tandai item habis / tersedia lagi di satu outlet
+
+    Status disimpan di overlay outlet (field "unavailable"), jadi ikut
+    tersimpan saat restart dan terbaca oleh semua worker lewat reload
+    otomatis. Worker ini langsung reload, dan reload_menu yang
+    mengirim event SSE ke semua tablet.
+
+    Returns:
+        CatalogView: View outlet setelah perubahan
+    """
+    path = outlet_overlay_path(outlet)
+
+    with _overlay_write_lock:
+        if os.path.exists(path):
+            overlay, _ = load_outlet_overlay(path)
+            if overlay is None:
+                raise ValueError("Overlay outlet tidak valid, perbaiki file dulu")
+        else:
+            overlay = {}
+
+        unavailable = [str(i) for i in overlay.get("unavailable", [])]
+        if available:
+            unavailable = [i for i in unavailable if i != item_id]
+        elif item_id not in unavailable:
+            unavailable.append(item_id)
+        overlay["unavailable"] = unavailable
+
+        # Tulis atomic: file sementara lalu rename
+        os.makedirs(OUTLETS_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(overlay, file, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+        reload_menu()
+
+    return catalogs[outlet]
+
+
+@app.route("/admin/availability", methods=["POST"])
+@login_required
+@admin_required
+def admin_availability():
+    """
+    Toggle ketersediaan item (sold out / tersedia lagi)
+
+    Request (JSON):
+        {
+            "id": "Mn003",        # ID item
+            "available": false,   # false = habis, true = tersedia lagi
+            "outlet": "K3"        # Optional, default outlet session
         }
 
-        # CRITICAL: Mark session as modified
-        # Tanpa ini, data pembeli tidak akan tersimpan
-        session.modified = True
+    Response (JSON):
+        {"id": "Mn003", "outlet": "K3", "available": false, "version": "..."}
 
-        # ============================================================
-        # STEP 9: RETURN SUCCESS RESPONSE
-        # ============================================================
+    HTTP Status Codes:
+        200: Success
+        400: Request tidak valid
+        403: Bukan admin
+        404: Item / outlet tidak ditemukan
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not data or not isinstance(data.get("available"), bool):
+            return jsonify({"error": "Invalid request"}), 400
+
+        item_id = str(data.get("id", "")).strip()
+        outlet = str(data.get("outlet") or current_outlet())
+
+        if outlet not in catalogs:
+            return jsonify({"error": "Outlet tidak ditemukan"}), 404
+        if item_id not in base_catalog.by_id:
+            return jsonify({"error": "Item not found"}), 404
+
+        view = set_item_availability(outlet, item_id, data["available"])
 
-        # Return semua data pembayaran ke frontend
-        # Frontend akan display data ini di rincian pembayaran
-        # dan enable tombol download struk
         return jsonify(
             {
-                "nama": nama,
-                "cash": cash,
-                "subtotal": subtotal,
-                "ppn": ppn,
-                "diskon": diskon,
-                "total": total,
-                "kembalian": kembalian,
+                "id": item_id,
+                "outlet": outlet,
+                "available": item_id not in view.unavailable,
+                "version": view.version,
             }
         )
 
-    # ============================================================
-    # EXCEPTION HANDLING
-    # ============================================================
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
     except Exception as e:
-        # Catch-all untuk unexpected errors
-        # Log error untuk debugging
-        app.logger.error(f"Error in checkout: {str(e)}")
-
-        # Return generic error message
-        # Jangan expose detail error untuk security
+        app.logger.error(f"Error in admin_availability: {str(e)}")
         return jsonify({"error": "Internal server error"}), 500
 
 
-# ========================================================================
-# API ENDPOINT - CLEAR CART
-# ========================================================================
-
-
-@app.route("/cart/clear", methods=["POST"])
+@app.route("/stream/availability", methods=["GET"])
 @login_required
-def cart_clear():
+def stream_availability():
     """
-    Endpoint untuk menghapus semua item dari cart
-
-    Fungsi ini:
-    1. Mengosongkan cart (set ke empty list)
-    2. Reset cart count ke 0
-    3. Mark session as modified
-    4. Return success response
+    Stream SSE perubahan ketersediaan menu untuk outlet session
 
-    Use Cases:
-        - User klik tombol "Clear All" / "Hapus Semua"
-        - Memulai transaksi baru setelah pembayaran
-        - Cancel order dan start over
+    Events:
+        snapshot: dikirim sekali saat connect (dan setiap reconnect)
+            {"outlet": "K3", "version": "...", "unavailable": ["Mn003"]}
+        availability: setiap ada item habis / tersedia lagi
+            {"outlet": "K3", "version": "...", "id": "Mn003", "available": false}
 
-    Request:
-        POST /cart/clear
-        (No body required)
+    Semua koneksi dilayani satu publisher (availability_broker), bukan
+    polling per tablet.
+    """
+    outlet = current_outlet()
 
-    Response (JSON):
-        {
-            "success": true
-        }
+    def snapshot():
+        view = catalogs.get(outlet) or base_catalog
+        return format_sse(
+            "snapshot",
+            {
+                "outlet": outlet,
+                "version": view.version,
+                "unavailable": sorted(view.unavailable),
+            },
+        )
 
-    Note:
-        - Tidak ada validasi atau error handling khusus
-        - Operation selalu berhasil (idempotent)
-        - Memanggil endpoint ini multiple times aman
-    """
+    return sse_response(availability_broker, outlet, snapshot)
 
-    # Kosongkan cart dengan set ke empty list
-    # Ini akan menghapus semua items yang ada
-    # Previous cart data akan lost (tidak bisa undo)
-    session["jumlahcart"] = []
 
-    # Reset cart count badge ke 0
-    # Ini untuk update icon cart counter di navbar
-    session["cart_count"] = 0
+@app.route("/menu/grid", methods=["GET"])
+@login_required
+def menu_grid():
+    """
+    Fragment HTML grid menu outlet session (untuk refresh tanpa reload)
 
-    # CRITICAL: Mark session as modified
-    # Tanpa ini, cart tidak akan ter-clear di server
-    session.modified = True
+    Dipakai main.js saat item tersedia lagi: grid diambil ulang dari
+    fragment cache, bukan render ulang seluruh halaman.
+    """
+    catalog = current_catalog()
 
-    # Return success response
-    # Frontend akan:
-    # 1. Clear display cart items
-    # 2. Reset all totals to "-" or 0
-    # 3. Reset form inputs
-    # 4. Update badge counter
-    # 5. Show success message (optional)
-    return jsonify({"success": True})
+    response = app.make_response(render_menu_grid())
+    response.set_etag(f"{catalog.version}-{template_version()}")
+    response.headers["X-Catalog-Version"] = catalog.version
+    return response.make_conditional(request)
 
 
 # ========================================================================
-# API ENDPOINT - DOWNLOAD STRUK PDF
+# API ENDPOINT - STOK ITEM (ADMIN)
 # ========================================================================
 
 
-@app.route("/generate_struk", methods=["POST"])
+@app.route("/admin/stock", methods=["GET", "POST"])
 @login_required
-def generate_struk():
-    """
-    Generate dan download PDF struk pembayaran format thermal (80mm)
-    Format struk seperti Indomaret/Alfamart
+@admin_required
+def admin_stock():
     """
+    Melihat / mengatur stok item per outlet
+
+    Hanya item yang punya stok (di-track) yang dibatasi penjualannya.
+    Stok yang sedang di-reserve cart kasir tidak termasuk "available".
+
+    Request (POST JSON):
+        {
+            "id": "Mkn001",      # ID item
+            "available": 25,     # Stok baru, null = stok tidak dibatasi
+            "outlet": "K3"       # Optional, default outlet session
+        }
+
+    Response (JSON):
+        {"outlet": "K3", "stock": {"Mkn001": 25, ...}}
 
+    HTTP Status Codes:
+        200: Success
+        400: Request tidak valid
+        403: Bukan admin
+        404: Item / outlet tidak ditemukan
+    """
     try:
-        # ============================================================
-        # STEP 1-4: VALIDASI & PERHITUNGAN (Sama seperti sebelumnya)
-        # ============================================================
+        outlet = current_outlet()
 
-        cart = session.get("jumlahcart", [])
-        if not cart:
-            return jsonify({"error": "Keranjang kosong"}), 400
+        if request.method == "POST":
+            data = request.get_json(silent=True) or {}
+            outlet = str(data.get("outlet") or outlet)
+            item_id = str(data.get("id", "")).strip()
+            available = data.get("available")
 
-        if request.is_json:
-            data = request.get_json()
-        else:
-            data = request.form.to_dict()
+            if available is not None and (type(available) is not int or available < 0):
+                return jsonify({"error": "Stok harus angka bulat >= 0"}), 400
+            if outlet not in catalogs:
+                return jsonify({"error": "Outlet tidak ditemukan"}), 404
+            if item_id not in base_catalog.by_id:
+                return jsonify({"error": "Item not found"}), 404
 
-        nama = data.get("nama", "").strip()
+            inventory.set_level(outlet, item_id, available)
 
-        try:
-            cash = int(data.get("cash", 0))
-        except (ValueError, TypeError):
-            return jsonify({"error": "Jumlah uang tidak valid"}), 400
+        return jsonify({"outlet": outlet, "stock": inventory.levels(outlet)})
 
-        subtotal = sum(item["price"] * item["qty"] for item in cart)
-        diskon, ppn, total = hitung_total(subtotal)
-        kembalian = cash - total
+    except Exception as e:
+        app.logger.error(f"Error in admin_stock: {str(e)}")
+        return jsonify({"error": "Internal server error"}), 500
 
-        if cash < total:
-            return jsonify({"error": "Uang tidak cukup"}), 400
 
-        # ============================================================
-        # STEP 5: INISIALISASI PDF - THERMAL SIZE (80mm width)
-        # ============================================================
+# ========================================================================
+# API ENDPOINT - KITCHEN DISPLAY (ANTRIAN PESANAN DAPUR)
+# ========================================================================
 
-        buffer = io.BytesIO()
+# Station dapur -> kategori menu yang dikerjakan (None = semua kategori)
+app.config["KITCHEN_STATIONS"] = {
+    "semua": None,
+    "makanan": ["Makanan", "Makanan ringan"],
+    "minuman": ["Minuman"],
+}
 
-        # THERMAL PAPER SIZE
-        # 80mm width = 226.77 points (80mm * 72/25.4)
-        # Height flexible untuk accommodate content
-        # Common thermal: 80mm x 200mm or longer
-        THERMAL_WIDTH = 226.77  # 80mm in points
-        THERMAL_HEIGHT = 600  # Flexible height, akan adjust otomatis
+# Jumlah pesanan terakhir yang disimpan untuk replay layar yang reconnect
+app.config["KITCHEN_REPLAY_SIZE"] = 200
 
-        pdf = canvas.Canvas(buffer, pagesize=(THERMAL_WIDTH, THERMAL_HEIGHT))
+# Publisher pesanan dapur (topic = "<outlet>:<station>")
+kitchen_broker = EventBroker(replay=app.config["KITCHEN_REPLAY_SIZE"])
 
-        # ============================================================
-        # MARGINS & POSITIONING untuk thermal receipt
-        # ============================================================
 
-        LEFT_MARGIN = 10  # 10 points from left
-        RIGHT_MARGIN = 216.77  # 10 points from right (226.77 - 10)
-        CENTER_X = THERMAL_WIDTH / 2  # 113.385 points
+def publish_kitchen_order(outlet, pembeli):
+    """
+    Kirim pesanan yang sudah dibayar ke semua station dapur outlet
 
-        # Start from top
-        y = THERMAL_HEIGHT - 70  # Start 40 points from top
+    Setiap station hanya menerima item dari kategori miliknya, jadi
+    pesan di-encode sekali per station (bukan per layar). Station yang
+    tidak punya item di pesanan ini tidak dikirimi apa-apa.
 
-        # ============================================================
-        # STEP 6: HEADER - LOGO (Smaller, centered)
-        # ============================================================
+    Args:
+        outlet (str): Kode outlet
+        pembeli (dict): Snapshot transaksi dari checkout (session["pembeli"])
+    """
+    items = []
+    for line in pembeli["items"]:
+        item = base_catalog.by_id.get(str(line["id"]))
+        items.append(
+            {
+                "id": line["id"],
+                "nama": line["nama"],
+                "qty": line["qty"],
+                "kategori": item.kategori if item is not None else "",
+            }
+        )
 
-        try:
-            logo = ImageReader("static/img/LogoUBSI.png")
+    for station, kategori in app.config["KITCHEN_STATIONS"].items():
+        station_items = [
+            item for item in items if kategori is None or item["kategori"] in kategori
+        ]
+        if not station_items:
+            continue
 
-            # Logo lebih kecil untuk thermal receipt
-            logo_size = 60  # 50x50 points
-            logo_x = (THERMAL_WIDTH - logo_size) / 2  # Center horizontally
+        kitchen_broker.publish(
+            f"{outlet}:{station}",
+            "order",
+            {
+                "trx_id": pembeli["trx_id"],
+                "station": station,
+                "nama": pembeli["nama"],
+                "order": pembeli.get("order"),
+                "waktu": pembeli["waktu"],
+                "items": station_items,
+            },
+        )
 
-            pdf.drawImage(
-                logo,
-                logo_x,
-                y,
-                width=logo_size,
-                height=logo_size,
-                preserveAspectRatio=True,
-            )
-            y -= 20  # Move down after logo
 
-        except Exception as e:
-            app.logger.warning(f"Logo not found: {str(e)}")
+@app.route("/kitchen", methods=["GET"])
+@login_required
+def kitchen():
+    """
+    Halaman layar dapur (kitchen display)
 
-        # ============================================================
-        # STEP 7: HEADER - STORE NAME & INFO
-        # ============================================================
+    Query Parameters:
+        station: Station dapur, contoh ?station=minuman (default "semua")
+    """
+    station = request.args.get("station", "semua")
+    if station not in app.config["KITCHEN_STATIONS"]:
+        return jsonify({"error": "Station tidak ditemukan"}), 404
 
-        # Store name - Bold, slightly larger
-        pdf.setFont("Helvetica-Bold", 11)
-        pdf.drawCentredString(CENTER_X, y, "RESTORAN KELOMPOK 3")
-        y -= 15
+    return render_template(
+        "kitchen.html",
+        station=station,
+        stations=list(app.config["KITCHEN_STATIONS"]),
+        outlet=current_outlet(),
+    )
 
-        # Address - Smaller font for thermal
-        pdf.setFont("Helvetica", 7)
 
-        # Multi-line address untuk thermal receipt
-        address_lines = [
-            "Cikarang Square",
-            "Jl. Cibarusah Raya No.168",
-            "Pasirsari, Cikarang Sel",
-            "Kab.Bekasi, Jawa Barat 17550",
-        ]
+@app.route("/kitchen/stream", methods=["GET"])
+@login_required
+def kitchen_stream():
+    """
+    Stream SSE pesanan baru untuk satu station dapur
 
-        for line in address_lines:
-            pdf.drawCentredString(CENTER_X, y, line)
-            y -= 10
+    Query Parameters:
+        station: Station dapur (default "semua")
+        last_event_id: Optional, ID event terakhir yang sudah ditampilkan
+            (untuk layar yang baru dibuka ulang). Saat reconnect otomatis,
+            browser mengirim header Last-Event-ID sendiri.
 
-        # Date & Time
-        pdf.drawCentredString(
-            CENTER_X, y, datetime.datetime.now().strftime("%d-%m-%Y %H:%M:%S")
-        )
-        y -= 15
+    Events:
+        order: {"trx_id", "station", "nama", "order", "waktu", "items": [...]}
+        gap: pesanan yang terlewat sudah tidak ada di buffer replay
 
-        # Separator line
-        pdf.setLineWidth(0.5)
-        pdf.line(LEFT_MARGIN, y, RIGHT_MARGIN, y)
-        y -= 15
+    HTTP Status Codes:
+        200: Stream
+        400: last_event_id tidak valid
+        404: Station tidak ditemukan
+    """
+    station = request.args.get("station", "semua")
+    if station not in app.config["KITCHEN_STATIONS"]:
+        return jsonify({"error": "Station tidak ditemukan"}), 404
 
-        # ============================================================
-        # STEP 8: CUSTOMER NAME
-        # ============================================================
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get(
+        "last_event_id"
+    )
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return jsonify({"error": "last_event_id tidak valid"}), 400
 
-        pdf.setFont("Helvetica", 8)
-        pdf.drawString(LEFT_MARGIN, y, f"Customer : {nama}")
-        y -= 15
+    outlet = current_outlet()
+    return sse_response(
+        kitchen_broker, f"{outlet}:{station}", last_event_id=last_event_id
+    )
 
-        # Separator
-        pdf.line(LEFT_MARGIN, y, RIGHT_MARGIN, y)
-        y -= 15
 
-        # ============================================================
-        # STEP 9: ITEMS LIST
-        # ============================================================
+# ========================================================================
+# API ENDPOINT - MENU JSON
+# ========================================================================
 
-        pdf.setFont("Helvetica-Bold", 8)
-        pdf.drawString(LEFT_MARGIN, y, "PESANAN")
-        pdf.drawRightString(RIGHT_MARGIN, y, "TOTAL")
-        y -= 12
+# (versi katalog, kategori, page, per_page) -> (json_bytes, etag)
+# Dibatasi MENU_API_CACHE_SIZE entry (LRU), di-reset saat versi berubah
+_menu_api_cache = OrderedDict()
+_menu_api_lock = threading.Lock()
 
-        # Thin separator
-        pdf.setLineWidth(0.3)
-        pdf.line(LEFT_MARGIN, y, RIGHT_MARGIN, y)
-        y -= 12
+MENU_API_CACHE_SIZE = 256
+MENU_API_MAX_PER_PAGE = 200
 
-        # Items - Regular font
-        pdf.setFont("Helvetica", 8)
 
-        for item in cart:
-            # Item name
-            item_name = item["nama"]
+def serialize_menu_page(catalog, kategori, page, per_page):
+    """
+    Serialize potongan katalog menjadi bytes JSON (tanpa cache)
 
-            # Truncate long names untuk fit thermal width
-            # if len(item_name) > 25:
-            #     item_name = item_name[:22] + "..."
+    Args:
+        catalog (CatalogView): Katalog outlet
+        kategori (str/None): Filter kategori, None = semua kategori
+        page (int/None): Nomor halaman (mulai 1), None = semua item
+        per_page (int): Jumlah item per halaman
 
-            pdf.drawString(LEFT_MARGIN, y, item_name)
-            y -= 10
+    Returns:
+        bytes: Body response JSON
+    """
+    items = [
+        {**item, "kategori": nama_kategori}
+        for nama_kategori, daftar in catalog.menu.items()
+        if kategori is None or nama_kategori == kategori
+        for item in daftar
+    ]
+    total = len(items)
+
+    if page is not None:
+        start = (page - 1) * per_page
+        items = items[start : start + per_page]
+
+    body = {
+        "version": catalog.version,
+        "kategori": list(catalog.menu.keys()),
+        "total": total,
+        "page": page,
+        "per_page": per_page if page is not None else total,
+        "items": items,
+    }
+    return encode_json(body)
+
+
+@app.route("/api/menu", methods=["GET"])
+@login_required
+def api_menu():
+    """
+    Katalog menu dalam format JSON untuk tablet / client
 
-            # Quantity and price on next line, indented
-            qty_price_text = f"  {item['qty']} x Rp {item['price']:,}"
-            item_total = item["price"] * item["qty"]
+    Body JSON di-serialize sekali per versi katalog + kombinasi filter,
+    lalu disimpan sebagai bytes. Polling berikutnya cukup kirim header
+    If-None-Match: jika katalog belum berubah, response 304 tanpa body.
 
-            pdf.drawString(LEFT_MARGIN, y, qty_price_text)
-            pdf.drawRightString(RIGHT_MARGIN, y, f"Rp {item_total:,}")
-            y -= 15
+    Query Parameters (optional):
+        kategori: Filter kategori, contoh ?kategori=Minuman
+        page: Nomor halaman (mulai 1). Tanpa page = semua item
+        per_page: Item per halaman (default 50, max 200)
 
-            # Check if need new page (thermal roll continues)
-            if y < 100:
-                pdf.showPage()
-                y = THERMAL_HEIGHT - 40
+    Response (JSON):
+        {
+            "version": "bc1301e00e8601bd",   # Versi katalog
+            "kategori": ["Makanan", ...],    # Semua kategori
+            "total": 12,                     # Total item (setelah filter)
+            "page": 1,
+            "per_page": 50,
+            "items": [{"id": "...", "nama": "...", "price": ..., "img": "...",
+                       "kategori": "Makanan"}, ...]
+        }
 
-        # ============================================================
-        # STEP 10: TOTALS SECTION
-        # ============================================================
+    HTTP Status Codes:
+        200: Success
+        304: Not Modified (katalog belum berubah)
+        400: Parameter tidak valid
+        404: Kategori tidak ada
+    """
+    kategori = request.args.get("kategori") or None
 
-        # Separator before totals
-        pdf.setLineWidth(0.5)
-        pdf.line(LEFT_MARGIN, y, RIGHT_MARGIN, y)
-        y -= 15
-
-        pdf.setFont("Helvetica", 8)
-
-        # Subtotal
-        pdf.drawString(LEFT_MARGIN, y, "Subtotal")
-        pdf.drawRightString(RIGHT_MARGIN, y, f"Rp {subtotal:,}")
-        y -= 12
-
-        # Discount
-        pdf.drawString(LEFT_MARGIN, y, "Diskon (10%)")
-        pdf.drawRightString(RIGHT_MARGIN, y, f"Rp {diskon:,}")
-        y -= 12
-
-        # Tax
-        pdf.drawString(LEFT_MARGIN, y, "PPN (10%)")
-        pdf.drawRightString(RIGHT_MARGIN, y, f"Rp {ppn:,}")
-        y -= 15
-
-        # Bold separator for total
-        pdf.setLineWidth(1)
-        pdf.line(LEFT_MARGIN, y, RIGHT_MARGIN, y)
-        y -= 15
-
-        # TOTAL - Bold and larger
-        pdf.setFont("Helvetica-Bold", 10)
-        pdf.drawString(LEFT_MARGIN, y, "TOTAL")
-        pdf.drawRightString(RIGHT_MARGIN, y, f"Rp {total:,}")
-        y -= 15
-
-        # Separator
-        pdf.setLineWidth(0.5)
-        pdf.line(LEFT_MARGIN, y, RIGHT_MARGIN, y)
-        y -= 15
-
-        # Payment details
-        pdf.setFont("Helvetica", 8)
-        pdf.drawString(LEFT_MARGIN, y, "Bayar")
-        pdf.drawRightString(RIGHT_MARGIN, y, f"Rp {cash:,}")
-        y -= 12
-
-        pdf.drawString(LEFT_MARGIN, y, "Kembali")
-        pdf.drawRightString(RIGHT_MARGIN, y, f"Rp {kembalian:,}")
-        y -= 20
+    try:
+        page = int(request.args["page"]) if "page" in request.args else None
+        per_page = int(request.args.get("per_page", 50))
+    except ValueError:
+        return jsonify({"error": "Parameter halaman tidak valid"}), 400
 
-        # ============================================================
-        # STEP 11: FOOTER
-        # ============================================================
+    if page is not None and page < 1:
+        return jsonify({"error": "Parameter halaman tidak valid"}), 400
+    if not 1 <= per_page <= MENU_API_MAX_PER_PAGE:
+        return jsonify({"error": "Parameter halaman tidak valid"}), 400
 
-        # Separator
-        pdf.setLineWidth(0.5)
-        pdf.line(LEFT_MARGIN, y, RIGHT_MARGIN, y)
-        y -= 15
+    catalog = current_catalog()
+    if kategori is not None and kategori not in catalog.menu:
+        return jsonify({"error": "Kategori tidak ditemukan"}), 404
 
-        # Thank you message - centered
-        pdf.setFont("Helvetica-Bold", 8)
-        pdf.drawCentredString(CENTER_X, y, "TERIMA KASIH")
-        y -= 10
+    key = (catalog.version, kategori, page, per_page)
 
-        pdf.setFont("Helvetica", 7)
-        pdf.drawCentredString(CENTER_X, y, "Atas Kunjungan Anda")
-        y -= 15
+    with _menu_api_lock:
+        cached = _menu_api_cache.get(key)
+        if cached:
+            _menu_api_cache.move_to_end(key)
 
-        # Footer info
-        pdf.setFont("Helvetica", 6)
-        pdf.drawCentredString(CENTER_X, y, "Powered by Kelompok 3")
-        y -= 10
+    if cached is None:
+        body = serialize_menu_page(catalog, kategori, page, per_page)
+        cached = (body, hashlib.sha1(body).hexdigest())
 
-        pdf.drawCentredString(
-            CENTER_X, y, f"Struk: {datetime.datetime.now().strftime('%d%m%Y%H%M%S')}"
-        )
+        with _menu_api_lock:
+            # Buang entry dari versi katalog lama
+            live = {view.version for view in catalogs.values()}
+            for k in [k for k in _menu_api_cache if k[0] not in live]:
+                del _menu_api_cache[k]
 
-        # ============================================================
-        # STEP 12-18: FINALIZE & RETURN (Sama seperti sebelumnya)
-        # ============================================================
+            _menu_api_cache[key] = cached
+            while len(_menu_api_cache) > MENU_API_CACHE_SIZE:
+                _menu_api_cache.popitem(last=False)
 
-        pdf.showPage()
-        pdf.save()
-        buffer.seek(0)
+    response = app.response_class(cached[0], mimetype="application/json")
+    response.set_etag(cached[1])
+    return response.make_conditional(request)
 
-        print("PDF SIZE:", buffer.getbuffer().nbytes)
 
-        tanggal = datetime.datetime.now().strftime("%d-%m-%Y-%H%M%S")
-        fileDownload = f"struk-{tanggal}.pdf"
+# ========================================================================
+# API ENDPOINT - SEARCH MENU
+# ========================================================================
 
-        response = send_file(
-            buffer,
-            mimetype="application/pdf",
-            as_attachment=True,
-            download_name=fileDownload,
-        )
 
-        response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
-        response.headers["Pragma"] = "no-cache"
-        response.headers["Expires"] = "0"
-        response.headers["Content-Disposition"] = (
-            f'attachment; filename="{fileDownload}"'
-        )
-        response.headers["Content-Length"] = str(buffer.getbuffer().nbytes)
+@app.route("/menu/search", methods=["GET"])
+@login_required
+def menu_search():
+    """
+    Pencarian menu untuk kasir (nama / id, toleran typo)
 
-        return response
+    Query Parameters:
+        q: Text pencarian, contoh ?q=nasi gor atau ?q=capucino
+        limit: Maksimal hasil (default 20, max 100)
 
-    except Exception as e:
-        print("ERROR:", e)
+    Response (JSON):
+        {
+            "query": "nasi gor",
+            "items": [{"id": "...", "nama": "...", "price": ..., "img": "...",
+                       "kategori": "Makanan"}, ...]
+        }
+    """
+    query = request.args.get("q", "").strip()
 
-        if request.is_json:
-            return jsonify({"error": str(e)}), 500
-        else:
-            return f"<html><body><h1>Error: {str(e)}</h1></body></html>", 500
+    try:
+        limit = min(max(int(request.args.get("limit", 20)), 1), 100)
+    except ValueError:
+        return jsonify({"error": "Parameter limit tidak valid"}), 400
+
+    results = current_catalog().search(query, limit) if query else []
+
+    return jsonify(
+        {
+            "query": query,
+            "items": [{**item, "kategori": kategori} for kategori, item in results],
+        }
+    )
 
 
 # ========================================================================
@@ -1416,7 +7053,7 @@ def cart_get():
         # - Session baru (first visit)
         # - Cart sudah di-clear
         # - Session expired
-        cart = session.get("jumlahcart", [])
+        lines = expand_cart(get_cart())
 
         # ============================================================
         # STEP 2: CALCULATE TOTALS
@@ -1425,7 +7062,7 @@ def cart_get():
         # Hitung semua totals even jika cart kosong
         # Jika cart = [], calculate_totals akan return (0, 0, 0, 0)
         # Ini lebih consistent daripada conditional calculation
-        subtotal, diskon, ppn, total = calculate_totals(cart)
+        subtotal, diskon, ppn, total = calculate_totals(lines)
 
         # ============================================================
         # STEP 3: RETURN JSON RESPONSE
@@ -1435,8 +7072,9 @@ def cart_get():
         # API consistency = easier frontend implementation
         return jsonify(
             {
-                "cart": cart,  # List semua items
-                "count": sum(i["qty"] for i in cart),  # Total qty untuk badge
+                "cart": cart_json(lines),  # List semua items
+                "count": sum(item["qty"] for item in lines),  # Total qty untuk badge
+                "order": session.get("order"),  # Nama pesanan aktif (meja)
                 "subtotal": subtotal,  # Total before discount
                 "diskon": diskon,  # Discount amount
                 "ppn": ppn,  # Tax amount
@@ -1466,5 +7104,314 @@ def cart_get():
         return jsonify({"error": "Internal server error"}), 500
 
 
+# ========================================================================
+# ASGI ENTRYPOINT (MODE ASYNC)
+# ========================================================================
+
+# Mode WSGI (python main.py / gunicorn): setiap koneksi SSE memegang satu
+# thread worker selama terbuka. Mode ASGI:
+#
+#     uvicorn main:asgi_app --workers 4
+#
+# Handler Flask tetap sync dan dijalankan di thread pool (render struk,
+# SQLite, dll tidak memblok event loop), sedangkan stream SSE dilayani
+# langsung oleh event loop: ratusan tablet / layar dapur tanpa thread.
+
+# Jumlah thread handler Flask per worker ASGI. Stream SSE tidak memakai
+# thread ini, jadi cukup sebesar jumlah request biasa yang berjalan
+# bersamaan.
+app.config["ASGI_WORKER_THREADS"] = 16
+
+_asgi_executor = None
+_asgi_executor_lock = threading.Lock()
+_asgi_reload_future = None
+
+
+def asgi_executor():
+    """Thread pool handler Flask (dibuat saat pertama dipakai, per proses)"""
+    global _asgi_executor
+
+    if _asgi_executor is None:
+        with _asgi_executor_lock:
+            if _asgi_executor is None:
+                _asgi_executor = ThreadPoolExecutor(
+                    max_workers=app.config["ASGI_WORKER_THREADS"],
+                    thread_name_prefix="asgi",
+                )
+    return _asgi_executor
+
+
+class AsyncSubscriber:
+    """
+    Queue subscriber EventBroker untuk event loop asyncio
+
+    publish() dipanggil dari thread handler mana pun: put_nowait() hanya
+    menambah pesan ke deque lalu membangunkan coroutine lewat
+    loop.call_soon_threadsafe. put_nowait/get_nowait memakai exception
+    yang sama dengan queue.Queue (queue.Full / queue.Empty), jadi
+    EventBroker tidak perlu membedakan subscriber thread dan async.
+    """
+
+    def __init__(self, loop, maxsize):
+        self.loop = loop
+        self.maxsize = maxsize
+        self._messages = deque()
+        self._lock = threading.Lock()
+        self._ready = asyncio.Event()
+
+    def put_nowait(self, message):
+        with self._lock:
+            if message is not None and len(self._messages) >= self.maxsize:
+                raise queue.Full
+            self._messages.append(message)
+        try:
+            self.loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            pass  # event loop sudah ditutup (server shutdown)
+
+    def get_nowait(self):
+        with self._lock:
+            if not self._messages:
+                raise queue.Empty
+            return self._messages.popleft()
+
+    async def get(self, timeout):
+        """
+        Tunggu pesan berikutnya
+
+        Raises:
+            asyncio.TimeoutError: Tidak ada pesan selama timeout detik
+        """
+        while True:
+            try:
+                return self.get_nowait()
+            except queue.Empty:
+                pass
+            self._ready.clear()
+            # Cek ulang setelah clear: pesan yang masuk di antara
+            # get_nowait dan clear tidak boleh terlewat
+            try:
+                return self.get_nowait()
+            except queue.Empty:
+                pass
+            await asyncio.wait_for(self._ready.wait(), timeout)
+
+
+def asgi_environ(scope, body):
+    """
+    Bangun environ WSGI dari scope ASGI HTTP
+
+    Args:
+        scope (dict): Scope ASGI (type "http")
+        body (bytes): Body request lengkap
+
+    Returns:
+        dict: environ WSGI (+ ASGI_ENVIRON_KEY)
+    """
+    script_name = scope.get("root_path", "").encode("utf-8").decode("latin-1")
+    path_info = scope["path"].encode("utf-8").decode("latin-1")
+    if script_name and path_info.startswith(script_name):
+        path_info = path_info[len(script_name) :]
+
+    server = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": script_name,
+        "PATH_INFO": path_info,
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.input_terminated": True,
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+        ASGI_ENVIRON_KEY: True,
+    }
+    if scope.get("client"):
+        environ["REMOTE_ADDR"] = scope["client"][0]
+
+    for name, value in scope.get("headers", []):
+        name = name.decode("latin-1").upper().replace("-", "_")
+        if name not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            name = "HTTP_" + name
+        value = value.decode("latin-1")
+        if name in environ:
+            # Header yang sama dikirim lebih dari sekali (RFC 9110: gabung)
+            separator = "; " if name == "HTTP_COOKIE" else ","
+            value = environ[name] + separator + value
+        environ[name] = value
+
+    return environ
+
+
+def asgi_call_app(environ):
+    """
+    Jalankan app Flask (WSGI) untuk satu request, di thread executor
+
+    Chunk body pertama ikut diambil di sini: response biasa (JSON, HTML,
+    PDF) selesai dalam satu kali lompat ke thread pool.
+
+    Returns:
+        tuple: (status, headers, app_iter, iterator, first_chunk)
+            first_chunk None jika body kosong
+    """
+    started = []
+
+    def start_response(status, headers, exc_info=None):
+        started[:] = [status, headers]
+        return lambda data: None  # write() tidak dipakai Flask
+
+    app_iter = app(environ, start_response)
+    iterator = iter(app_iter)
+    first_chunk = next(iterator, None)
+    status, headers = started
+    return status, headers, app_iter, iterator, first_chunk
+
+
+async def asgi_sse(receive, send, loop, broker, topic, snapshot, last_event_id):
+    """
+    Stream SSE di event loop (pengganti generator sse_response di WSGI)
+
+    Koneksi ditutup jika client disconnect (http.disconnect) atau
+    subscriber diputus broker karena terlalu lambat.
+    """
+
+    async def body(data):
+        await send({"type": "http.response.body", "body": data, "more_body": True})
+
+    subscriber = broker.subscribe(
+        topic, last_event_id, lambda maxsize: AsyncSubscriber(loop, maxsize)
+    )
+
+    async def watch_disconnect():
+        while (await receive())["type"] != "http.disconnect":
+            pass
+        subscriber.put_nowait(None)
+
+    watcher = loop.create_task(watch_disconnect())
+    idle = 0
+    try:
+        if snapshot is not None:
+            await body(snapshot())
+
+        while True:
+            try:
+                message = await subscriber.get(SSE_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                asgi_check_menu_reload(loop)
+
+                idle += SSE_POLL_INTERVAL
+                if idle >= SSE_KEEPALIVE_INTERVAL:
+                    idle = 0
+                    await body(b": keepalive\n\n")
+                continue
+
+            if message is None:
+                break
+
+            idle = 0
+            await body(message)
+    finally:
+        watcher.cancel()
+        broker.unsubscribe(topic, subscriber)
+
+    await send({"type": "http.response.body", "body": b""})
+
+
+def asgi_check_menu_reload(loop):
+    """
+    check_menu_reload() untuk worker yang hanya melayani stream SSE
+
+    Dijalankan di executor (reload menu bisa berat), maksimal satu per
+    proses sekaligus walaupun banyak koneksi idle bersamaan.
+    """
+    global _asgi_reload_future
+
+    if _asgi_reload_future is None or _asgi_reload_future.done():
+        _asgi_reload_future = loop.run_in_executor(asgi_executor(), check_menu_reload)
+
+
+async def asgi_lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            asgi_executor()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            if _asgi_executor is not None:
+                _asgi_executor.shutdown(wait=False)
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def asgi_app(scope, receive, send):
+    """
+    Aplikasi ASGI: request biasa → Flask di thread pool, SSE → event loop
+
+    Jalankan dengan server ASGI, contoh:
+        uvicorn main:asgi_app --workers 4
+    """
+    if scope["type"] == "lifespan":
+        return await asgi_lifespan(receive, send)
+    if scope["type"] != "http":
+        raise ValueError(f"Scope ASGI tidak didukung: {scope['type']}")
+
+    body = bytearray()
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            break
+
+    loop = asyncio.get_running_loop()
+    executor = asgi_executor()
+    environ = asgi_environ(scope, bytes(body))
+    status, headers, app_iter, iterator, chunk = await loop.run_in_executor(
+        executor, asgi_call_app, environ
+    )
+
+    try:
+        content_length = None
+        response_headers = []
+        for name, value in headers:
+            if name.lower() == "content-length":
+                content_length = int(value)
+            response_headers.append((name.lower().encode("latin-1"), value.encode("latin-1")))
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": int(status.split(" ", 1)[0]),
+                "headers": response_headers,
+            }
+        )
+
+        sse = environ.get(ASGI_SSE_KEY)
+        if sse is not None:
+            return await asgi_sse(receive, send, loop, *sse)
+
+        sent = 0
+        while chunk is not None:
+            if chunk:
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+                sent += len(chunk)
+            if content_length is not None and sent >= content_length:
+                break
+            # Response streaming (generator): chunk berikutnya bisa lambat
+            chunk = await loop.run_in_executor(executor, next, iterator, None)
+
+        await send({"type": "http.response.body", "body": b""})
+    finally:
+        if hasattr(app_iter, "close"):
+            app_iter.close()
+
+
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,75 @@
+// ===================================== KITCHEN DISPLAY
+// Pesanan baru diterima lewat SSE (/kitchen/stream), tanpa polling.
+// ID event terakhir disimpan di localStorage supaya layar yang dibuka
+// ulang hanya menerima pesanan yang belum tampil.
+
+const ordersEl = document.getElementById("kitchenOrders");
+const station = ordersEl.dataset.station;
+const storageKey = `kitchen:${ordersEl.dataset.outlet}:${station}:lastEventId`;
+
+function escapeHtml(text) {
+  const div = document.createElement("div");
+  div.textContent = text;
+  return div.innerHTML;
+}
+
+function setStatus(text, online) {
+  const el = document.getElementById("kitchenStatus");
+  el.textContent = text;
+  el.className = `badge ${online ? "bg-success" : "bg-secondary"}`;
+}
+
+function renderOrder(order) {
+  const waktu = new Date(order.waktu * 1000).toLocaleTimeString("id-ID", {
+    hour: "2-digit",
+    minute: "2-digit",
+  });
+
+  // order.order = nama pesanan parkir / meja (null jika tidak diberi nama),
+  // ditampilkan sebagai badge sebelum nama pembeli
+  const col = document.createElement("div");
+  col.className = "col-lg-3 col-md-4";
+  col.innerHTML = `
+    <div class="card h-100">
+      <div class="card-header d-flex justify-content-between">
+        <strong>${escapeHtml(order.trx_id)}</strong>
+        <span>${waktu}</span>
+      </div>
+      <div class="card-body">
+        <h6 class="card-title">${order.order ? `<span class="badge bg-warning text-dark me-1">${escapeHtml(order.order)}</span>` : ""}${escapeHtml(order.nama)}</h6>
+        <ul class="list-unstyled m-0">
+          ${order.items.map((item) => `<li><strong>${item.qty}×</strong> ${escapeHtml(item.nama)}</li>`).join("")}
+        </ul>
+      </div>
+      <div class="card-footer text-end">
+        <button class="btn btn-sm btn-success btn-done">Selesai</button>
+      </div>
+    </div>`;
+
+  col.querySelector(".btn-done").addEventListener("click", () => col.remove());
+  ordersEl.appendChild(col);
+}
+
+function connectKitchen() {
+  // Layar baru dibuka: lanjut dari ID terakhir yang pernah tampil
+  const lastEventId = localStorage.getItem(storageKey);
+  const params = new URLSearchParams({ station });
+  if (lastEventId) params.set("last_event_id", lastEventId);
+
+  // Reconnect otomatis oleh browser (mengirim header Last-Event-ID)
+  const source = new EventSource(`/kitchen/stream?${params}`);
+
+  source.addEventListener("open", () => setStatus("Online", true));
+  source.addEventListener("error", () => setStatus("Offline, menghubungkan ulang...", false));
+
+  source.addEventListener("order", (e) => {
+    renderOrder(JSON.parse(e.data));
+    localStorage.setItem(storageKey, e.lastEventId);
+  });
+
+  source.addEventListener("gap", () => {
+    document.getElementById("kitchenGap").classList.remove("d-none");
+  });
+}
+
+document.addEventListener("DOMContentLoaded", connectKitchen);
@@ -1,5 +1,6 @@
 let cart = {};
 let isProcessing = false; // Prevent double-click
+let strukUrl = null; // URL struk dari transaksi terakhir (/checkout)
 
 // ===================================== HELPER FUNCTIONS
 function showWarning(message) {
@@ -35,6 +36,33 @@ function validateCash(cash) {
   return true;
 }
 
+// Key unik per aksi checkout, dikirim ulang apa adanya saat retry
+// Server akan mengembalikan hasil yang sama tanpa checkout dobel
+function newIdempotencyKey() {
+  if (window.crypto && crypto.randomUUID) {
+    return crypto.randomUUID();
+  }
+  return `${Date.now()}-${Math.random().toString(16).slice(2)}`;
+}
+
+// Retry otomatis HANYA untuk network error (Wi-Fi putus / timeout)
+// Response error dari server (4xx/5xx) tidak di-retry
+function fetchWithRetry(url, options, retries = 2) {
+  return fetchOnline(url, options).catch((error) => {
+    if (retries <= 0) throw error;
+    return new Promise((resolve) => setTimeout(resolve, 1000)).then(() => fetchWithRetry(url, options, retries - 1));
+  });
+}
+
+// fetch yang menandai error jaringan (error.offline = true), supaya bisa
+// dibedakan dari response error server (4xx/5xx) di .catch()
+function fetchOnline(url, options) {
+  return fetch(url, options).catch((error) => {
+    error.offline = true;
+    throw error;
+  });
+}
+
 function disableButtons(disable) {
   const buttons = document.querySelectorAll(".btn-cart, .btn-plus, .btn-minus, .btn-remove, .btn-proses, .btn-clear, .btn-struk");
   buttons.forEach((btn) => {
@@ -102,14 +130,50 @@ function renderCart() {
   });
 }
 
+// ===================================== APPLY CART RESPONSE
+// Dipakai oleh semua endpoint yang mengembalikan cart (/cart/update, /cart/scan)
+function applyCartData(data) {
+  // Update cart display
+  updateCartDisplay(data.cart);
+
+  // Bandingkan total dari server dengan perhitungan lokal (mode offline)
+  if (!offlineMode) verifyTotals(data);
+
+  // Update cart count badge
+  const cartBadge = document.getElementById("jumlahcart");
+  if (cartBadge) {
+    cartBadge.innerHTML = `<span>${data.count}</span>`;
+  }
+
+  // Update subtotal otomatis
+  const testTotal = document.getElementById("testTotal");
+  if (testTotal) {
+    testTotal.innerText = data.count > 0 ? `Rp ${formatRupiah(data.subtotal)}` : "-";
+  }
+
+  // Cart berubah = transaksi sebelumnya batal di server
+  strukUrl = null;
+
+  // Reset form pembayaran jika cart kosong
+  if (data.count === 0) {
+    resetPaymentForm();
+  }
+}
+
 // ===================================== UPDATE CART (UNIFIED FUNCTION)
 function updateCart(action, id) {
   if (isProcessing) return;
 
+  if (!navigator.onLine) enterOfflineMode();
+  if (offlineMode) {
+    updateCartOffline(action, id);
+    return;
+  }
+
   isProcessing = true;
   disableButtons(true);
 
-  fetch("/cart/update", {
+  fetchOnline("/cart/update", {
     method: "POST",
     headers: { "Content-Type": "application/json" },
     body: JSON.stringify({ action: action, id: id }),
@@ -123,27 +187,14 @@ function updateCart(action, id) {
       return res.json();
     })
     .then((data) => {
-      // Update cart display
-      updateCartDisplay(data.cart);
-
-      // Update cart count badge
-      const cartBadge = document.getElementById("jumlahcart");
-      if (cartBadge) {
-        cartBadge.innerHTML = `<span>${data.count}</span>`;
-      }
-
-      // Update subtotal otomatis
-      const testTotal = document.getElementById("testTotal");
-      if (testTotal) {
-        testTotal.innerText = data.count > 0 ? `Rp ${formatRupiah(data.subtotal)}` : "-";
-      }
-
-      // Reset form pembayaran jika cart kosong
-      if (data.count === 0) {
-        resetPaymentForm();
-      }
+      applyCartData(data);
     })
     .catch((error) => {
+      if (error.offline) {
+        enterOfflineMode();
+        updateCartOffline(action, id);
+        return;
+      }
       console.error("Error updating cart:", error);
       showWarning(error.message || "Gagal mengupdate keranjang");
     })
@@ -310,12 +361,21 @@ function prosesPembayaran() {
     return;
   }
 
+  if (!navigator.onLine) enterOfflineMode();
+  if (offlineMode) {
+    checkoutOffline(nama, cash);
+    return;
+  }
+
   isProcessing = true;
   disableButtons(true);
 
-  fetch("/checkout", {
+  fetchWithRetry("/checkout", {
     method: "POST",
-    headers: { "Content-Type": "application/json" },
+    headers: {
+      "Content-Type": "application/json",
+      "Idempotency-Key": newIdempotencyKey(),
+    },
     body: JSON.stringify({ nama: nama, cash: cash }),
   })
     .then((res) => {
@@ -327,6 +387,10 @@ function prosesPembayaran() {
       return res.json();
     })
     .then((data) => {
+      // Cart di server sudah dikosongkan: tampilan ikut dikosongkan agar
+      // klik "Proses" berikutnya tidak mengirim transaksi yang sama
+      applyCartData({ cart: [], count: 0 });
+
       // Update rincian pembayaran
       updateElement("Subtotal", `Rp ${formatRupiah(data.subtotal)}`);
       updateElement("ppn", `Rp ${formatRupiah(data.ppn)}`);
@@ -335,10 +399,21 @@ function prosesPembayaran() {
       updateElement("uangBayar", `Rp ${formatRupiah(data.cash)}`);
       updateElement("kembalian", `Rp ${formatRupiah(data.kembalian)}`);
 
+      // Struk di-render dari snapshot transaksi ini (tanpa hitung ulang)
+      strukUrl = data.struk_url;
+      verifyTotals(data);
+
       showSuccess("Pembayaran berhasil diproses!");
     })
     .catch((error) => {
       console.error("Error processing payment:", error);
+      if (error.offline) {
+        // Request mungkin sudah sampai ke server sebelum koneksi putus:
+        // checkout TIDAK otomatis diulang sebagai transaksi offline
+        enterOfflineMode();
+        showWarning("Koneksi terputus. Cek dulu apakah pembayaran sudah tercatat sebelum memproses ulang (mode offline).");
+        return;
+      }
       showWarning(error.message || "Gagal memproses pembayaran");
     })
     .finally(() => {
@@ -368,10 +443,16 @@ function initClearButton() {
 function clearCart() {
   if (isProcessing) return;
 
+  if (!navigator.onLine) enterOfflineMode();
+  if (offlineMode) {
+    clearCartOffline();
+    return;
+  }
+
   isProcessing = true;
   disableButtons(true);
 
-  fetch("/cart/clear", {
+  fetchOnline("/cart/clear", {
     method: "POST",
   })
     .then((res) => {
@@ -405,6 +486,11 @@ function clearCart() {
       }
     })
     .catch((error) => {
+      if (error.offline) {
+        enterOfflineMode();
+        clearCartOffline();
+        return;
+      }
       console.error("Error clearing cart:", error);
       showWarning(error.message || "Gagal menghapus keranjang");
     })
@@ -422,6 +508,7 @@ function resetPaymentForm() {
   updateElement("total", "-");
   updateElement("uangBayar", "-");
   updateElement("kembalian", "-");
+  strukUrl = null;
 
   // Clear form inputs
   const namaInput = document.getElementById("inputNamaPembeli");
@@ -442,76 +529,23 @@ document.addEventListener("click", (e) => {
 function downloadStruk() {
   if (isProcessing) return;
 
-  const nama = document.getElementById("inputNamaPembeli")?.value.trim();
-  const cashInput = document.getElementById("inputCash")?.value;
-  const cash = parseInt(cashInput);
-
-  // Validasi input
-  if (!validateNama(nama)) return;
-  if (!validateCash(cash)) return;
-
   // Cek apakah sudah diproses pembayaran
-  const totalElement = document.getElementById("total");
-  if (!totalElement || totalElement.innerText === "-") {
+  if (!strukUrl) {
     showWarning("Silakan proses pembayaran terlebih dahulu!");
     return;
   }
 
-  isProcessing = true;
-  disableButtons(true);
-
-  // Generate filename SEBELUM request
-  const today = new Date();
-  const dateStr = today.toLocaleDateString("id-ID").split("/").reverse().join("-");
-  const filename = `struk-${dateStr}.pdf`;
-
-  // METODE BARU: Gunakan direct link download (compatible dengan IDM)
-  const form = document.createElement("form");
-  form.method = "POST";
-  form.action = "/generate_struk";
-  form.style.display = "none";
-
-  // Add CSRF token if you use it
-  // const csrfInput = document.createElement('input');
-  // csrfInput.name = 'csrf_token';
-  // csrfInput.value = 'YOUR_CSRF_TOKEN';
-  // form.appendChild(csrfInput);
-
-  const namaInput = document.createElement("input");
-  namaInput.name = "nama";
-  namaInput.value = nama;
-  form.appendChild(namaInput);
-
-  const cashInputField = document.createElement("input");
-  cashInputField.name = "cash";
-  cashInputField.value = cash;
-  form.appendChild(cashInputField);
-
-  document.body.appendChild(form);
-  form.submit();
-
-  // Cleanup form setelah submit
-  setTimeout(() => {
-    document.body.removeChild(form);
-    isProcessing = false;
-    disableButtons(false);
-    showSuccess("Struk sedang diunduh...");
-  }, 500);
+  // Direct link download (compatible dengan IDM)
+  // Server mengirim Content-Disposition: attachment, jadi halaman tidak berpindah
+  window.location.href = strukUrl;
+  showSuccess("Struk sedang diunduh...");
 }
 
 // ALTERNATIF: Jika tetap ingin pakai fetch (tapi kurang compatible dengan IDM)
 function downloadStrukWithFetch() {
   if (isProcessing) return;
 
-  const nama = document.getElementById("inputNamaPembeli")?.value.trim();
-  const cashInput = document.getElementById("inputCash")?.value;
-  const cash = parseInt(cashInput);
-
-  if (!validateNama(nama)) return;
-  if (!validateCash(cash)) return;
-
-  const totalElement = document.getElementById("total");
-  if (!totalElement || totalElement.innerText === "-") {
+  if (!strukUrl) {
     showWarning("Silakan proses pembayaran terlebih dahulu!");
     return;
   }
@@ -519,10 +553,8 @@ function downloadStrukWithFetch() {
   isProcessing = true;
   disableButtons(true);
 
-  fetch("/generate_struk", {
-    method: "POST",
-    headers: { "Content-Type": "application/json" },
-    body: JSON.stringify({ nama: nama, cash: cash }),
+  fetch(strukUrl, {
+    method: "GET",
   })
     .then(async (res) => {
       const contentType = res.headers.get("content-type");
@@ -552,10 +584,7 @@ function downloadStrukWithFetch() {
       const a = document.createElement("a");
       a.style.display = "none";
       a.href = url;
-
-      const today = new Date();
-      const dateStr = today.toLocaleDateString("id-ID").split("/").reverse().join("-");
-      a.download = `struk-${dateStr}.pdf`;
+      a.download = `struk-${strukUrl.split("/").pop()}.pdf`;
 
       document.body.appendChild(a);
 
@@ -582,7 +611,7 @@ function downloadStrukWithFetch() {
 
 // ===================================== LOAD CART FROM SERVER
 function loadCartFromServer() {
-  fetch("/cart/get", {
+  fetchOnline("/cart/get", {
     method: "GET",
   })
     .then((res) => {
@@ -607,19 +636,711 @@ function loadCartFromServer() {
         testTotal.innerText = data.count > 0 ? `Rp ${formatRupiah(data.subtotal)}` : "-";
       }
 
+      verifyTotals(data);
       console.log("Cart loaded from server:", data.count, "items");
     })
     .catch((error) => {
       console.error("Error loading cart:", error);
+      // Halaman dibuka dari cache service worker saat offline
+      if (error.offline) enterOfflineMode();
       // Jika error, tetap tampilkan cart kosong
       cart = {};
       renderCart();
     });
 }
 
+// ===================================== BARCODE SCANNER
+// Scanner USB/Bluetooth bekerja seperti keyboard: mengetik kode dengan
+// sangat cepat lalu menekan Enter. Kode yang masuk saat request scan
+// sebelumnya masih berjalan dikumpulkan di antrian lalu dikirim sekaligus.
+const SCAN_KEY_INTERVAL = 50; // ms, jeda maksimal antar karakter dari scanner
+const SCAN_MAX_CODES = 100; // sama dengan batas di server
+
+let scanBuffer = "";
+let scanLastKey = 0;
+let scanQueue = [];
+let scanInFlight = false;
+
+document.addEventListener("keydown", (e) => {
+  // Ketikan di form (nama, cash, search) bukan hasil scan
+  if (e.target.tagName === "INPUT" || e.target.tagName === "TEXTAREA") return;
+
+  const now = Date.now();
+  if (now - scanLastKey > SCAN_KEY_INTERVAL) {
+    scanBuffer = "";
+  }
+  scanLastKey = now;
+
+  if (e.key === "Enter") {
+    if (scanBuffer.length >= 3) {
+      e.preventDefault();
+      scanQueue.push(scanBuffer);
+      flushScanQueue();
+    }
+    scanBuffer = "";
+    return;
+  }
+
+  if (e.key.length === 1) {
+    scanBuffer += e.key;
+  }
+});
+
+function flushScanQueue() {
+  if (scanInFlight || scanQueue.length === 0) return;
+
+  const codes = scanQueue.splice(0, SCAN_MAX_CODES);
+
+  if (offlineMode) {
+    scanOffline(codes);
+    flushScanQueue();
+    return;
+  }
+
+  scanInFlight = true;
+
+  fetchOnline("/cart/scan", {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ codes: codes }),
+  })
+    .then((res) => res.json())
+    .then((data) => {
+      if (data.cart) {
+        applyCartData(data);
+      }
+      if (data.not_found && data.not_found.length > 0) {
+        showWarning(`Kode tidak dikenal: ${data.not_found.join(", ")}`);
+      } else if (data.error) {
+        showWarning(data.error);
+      }
+    })
+    .catch((error) => {
+      if (error.offline) {
+        enterOfflineMode();
+        scanOffline(codes);
+        return;
+      }
+      console.error("Error scanning item:", error);
+      showWarning("Gagal menambahkan hasil scan");
+    })
+    .finally(() => {
+      scanInFlight = false;
+      flushScanQueue();
+    });
+}
+
+// ===================================== SEARCH MENU
+let searchTimer = null;
+
+function renderSearchResults(items) {
+  const container = document.getElementById("searchResults");
+  if (!container) return;
+
+  container.innerHTML = items
+    .map(
+      (item) => `
+      <div class="col-lg-3 mb-4">
+        <div class="card d-flex justify-content-center align-items-center">
+          <img src="${item.img}" class="img-thumbnail" alt="${item.nama}" />
+          <div class="card-body p-2 text-center">
+            <h5 class="card-title" style="max-width: 250px">~ ${item.nama} ~</h5>
+            <h5 class="card-text mb-2">Rp ${formatRupiah(item.price)}</h5>
+            <a href="#" class="btn btn-cart" data-id="${item.id}"> Add to cart </a>
+          </div>
+        </div>
+      </div>`
+    )
+    .join("");
+}
+
+function searchMenu(query) {
+  if (!query) {
+    renderSearchResults([]);
+    return;
+  }
+
+  fetch(`/menu/search?q=${encodeURIComponent(query)}`)
+    .then((res) => {
+      if (!res.ok) {
+        throw new Error("Gagal mencari menu");
+      }
+      return res.json();
+    })
+    .then((data) => {
+      // Abaikan hasil request lama jika user sudah mengetik lagi
+      const input = document.getElementById("inputSearchMenu");
+      if (input && input.value.trim() === data.query) {
+        renderSearchResults(data.items);
+      }
+    })
+    .catch((error) => {
+      console.error("Error searching menu:", error);
+    });
+}
+
+function initSearchMenu() {
+  const input = document.getElementById("inputSearchMenu");
+  if (!input) return;
+
+  // Debounce: request dikirim setelah user berhenti mengetik 150ms
+  input.addEventListener("input", () => {
+    clearTimeout(searchTimer);
+    searchTimer = setTimeout(() => searchMenu(input.value.trim()), 150);
+  });
+}
+
+// ===================================== KETERSEDIAAN MENU (SSE)
+// Versi katalog yang sedang tampil di grid menu
+let catalogVersion = null;
+
+function hideMenuItem(id) {
+  delete offlineMenu[id];
+
+  // Sembunyikan card item di grid menu & hasil pencarian
+  document.querySelectorAll(".btn-cart").forEach((btn) => {
+    if (btn.dataset.id === id) {
+      const card = btn.closest(".col-lg-3");
+      if (card) card.classList.add("d-none");
+    }
+  });
+}
+
+function refreshMenuGrid() {
+  fetch("/menu/grid")
+    .then((res) => {
+      if (!res.ok) {
+        throw new Error("Gagal memuat menu");
+      }
+      catalogVersion = res.headers.get("X-Catalog-Version");
+      return res.text();
+    })
+    .then((html) => {
+      const grid = document.getElementById("menuGrid");
+      if (grid) grid.innerHTML = html;
+      indexOfflineMenu();
+    })
+    .catch((error) => {
+      console.error("Error refreshing menu:", error);
+    });
+}
+
+function initAvailabilityStream() {
+  const grid = document.getElementById("menuGrid");
+  if (!grid || !window.EventSource) return;
+
+  catalogVersion = grid.dataset.version;
+
+  // EventSource otomatis reconnect jika koneksi putus
+  const source = new EventSource("/stream/availability");
+
+  source.addEventListener("snapshot", (e) => {
+    const data = JSON.parse(e.data);
+    // Ada perubahan yang terlewat (halaman lama / sempat disconnect)
+    if (data.version !== catalogVersion) {
+      refreshMenuGrid();
+    }
+  });
+
+  source.addEventListener("availability", (e) => {
+    const data = JSON.parse(e.data);
+    if (data.available) {
+      // Item tersedia lagi: card-nya belum ada di grid, ambil ulang grid
+      refreshMenuGrid();
+    } else {
+      hideMenuItem(data.id);
+      catalogVersion = data.version;
+    }
+  });
+}
+
+// ===================================== PESANAN PARKIR (MULTI MEJA)
+// Hanya pesanan aktif yang ada di session, pesanan lain disimpan server
+function applyOrdersData(data) {
+  applyCartData(data);
+
+  const input = document.getElementById("inputOrderName");
+  if (input) input.value = data.order || "";
+
+  const select = document.getElementById("selectOrder");
+  if (!select) return;
+
+  // Option dibuat lewat DOM: nama pesanan adalah input bebas dari kasir
+  select.replaceChildren(
+    new Option(`Pesanan parkir (${data.orders.length})`, ""),
+    ...data.orders.map((order) => new Option(`${order.name} (${order.count} item)`, order.name))
+  );
+}
+
+function postOrders(url, body) {
+  if (isProcessing) return;
+
+  isProcessing = true;
+  disableButtons(true);
+
+  fetch(url, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify(body),
+  })
+    .then((res) => {
+      if (!res.ok) {
+        return res.json().then((err) => {
+          throw new Error(err.error || "Terjadi kesalahan");
+        });
+      }
+      return res.json();
+    })
+    .then((data) => {
+      applyOrdersData(data);
+    })
+    .catch((error) => {
+      console.error("Error parked orders:", error);
+      showWarning(error.message || "Gagal memproses pesanan");
+    })
+    .finally(() => {
+      isProcessing = false;
+      disableButtons(false);
+    });
+}
+
+function initParkedOrders() {
+  const input = document.getElementById("inputOrderName");
+  const parkButton = document.getElementById("btn-park");
+  const select = document.getElementById("selectOrder");
+  if (!input || !parkButton || !select) return;
+
+  parkButton.addEventListener("click", () => {
+    postOrders("/orders/park", { name: input.value.trim() });
+  });
+
+  select.addEventListener("change", () => {
+    if (!select.value) return;
+    postOrders("/orders/switch", { name: select.value, park_as: input.value.trim() });
+  });
+
+  fetch("/orders")
+    .then((res) => (res.ok ? res.json() : null))
+    .then((data) => {
+      if (data) applyOrdersData(data);
+    })
+    .catch((error) => {
+      console.error("Error loading orders:", error);
+    });
+}
+
+// ===================================== SHIFT KASIR (BUKA / TUTUP LACI)
+function postShift(url, body) {
+  return fetch(url, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify(body),
+  }).then((res) =>
+    res.json().then((data) => {
+      if (!res.ok) throw new Error(data.error || "Terjadi kesalahan");
+      return data;
+    })
+  );
+}
+
+function parseRupiah(text) {
+  // "1.250.000" / "1250000" → 1250000, null jika batal / tidak valid
+  if (text === null) return null;
+  const digits = text.replace(/[.\s]/g, "");
+  return /^\d+$/.test(digits) ? parseInt(digits, 10) : NaN;
+}
+
+function openShift() {
+  const openingCash = parseRupiah(prompt("Buka shift\nModal awal di laci (Rp):", "0"));
+  if (openingCash === null) return;
+  if (Number.isNaN(openingCash)) return showWarning("Jumlah uang tidak valid");
+
+  postShift("/shift/open", { opening_cash: openingCash })
+    .then((data) => showSuccess(`Shift dibuka. Modal awal: Rp ${formatRupiah(data.shift.opening_cash)}`))
+    .catch((error) => showWarning(error.message));
+}
+
+function closeShift(shift) {
+  // Blind count: uang seharusnya TIDAK ditampilkan sebelum kasir menghitung
+  const countedCash = parseRupiah(
+    prompt(`Tutup shift (${shift.trx_count} transaksi)\nUang di laci hasil hitung (Rp):`)
+  );
+  if (countedCash === null) return;
+  if (Number.isNaN(countedCash)) return showWarning("Jumlah uang tidak valid");
+
+  postShift("/shift/close", { counted_cash: countedCash })
+    .then((data) => {
+      const s = data.shift;
+      showSuccess(
+        [
+          "Rekap shift",
+          `Transaksi: ${s.trx_count}`,
+          `Penjualan: Rp ${formatRupiah(s.sales)}`,
+          `Diskon: Rp ${formatRupiah(s.diskon)}`,
+          `PPN: Rp ${formatRupiah(s.ppn)}`,
+          `Uang masuk: Rp ${formatRupiah(s.cash_in)}`,
+          `Kembalian: Rp ${formatRupiah(s.change_out)}`,
+          `Modal awal: Rp ${formatRupiah(s.opening_cash)}`,
+          `Seharusnya di laci: Rp ${formatRupiah(data.expected_cash)}`,
+          `Hasil hitung: Rp ${formatRupiah(data.counted_cash)}`,
+          `Selisih: Rp ${formatRupiah(data.selisih)}`,
+        ].join("\n")
+      );
+    })
+    .catch((error) => showWarning(error.message));
+}
+
+function initShift() {
+  const button = document.getElementById("btn-shift");
+  if (!button) return;
+
+  button.addEventListener("click", (event) => {
+    event.preventDefault();
+    fetch("/shift")
+      .then((res) => res.json())
+      .then((data) => (data.shift ? closeShift(data.shift) : openShift()))
+      .catch((error) => {
+        console.error("Error shift:", error);
+        showWarning("Gagal memuat data shift");
+      });
+  });
+}
+
+// ===================================== MODE OFFLINE (CART LOKAL + ANTRIAN CHECKOUT)
+// Saat koneksi outlet putus, cart dihitung di browser dan checkout disimpan
+// di localStorage. Antrian dikirim per batch ke /checkout/sync saat online;
+// server menolak duplikat (client_id) dan menghitung ulang semua total.
+const OFFLINE_QUEUE_KEY = "kasir.offlineQueue";
+const OFFLINE_REJECTED_KEY = "kasir.offlineRejected"; // ditolak server, cek manual
+const OFFLINE_SYNC_BATCH = 50; // server menerima maksimal 100 per request
+const OFFLINE_RETRY_INTERVAL = 30000; // ms, coba online / sync ulang
+
+let offlineMode = false;
+let offlineCartDirty = false; // cart lokal berubah saat offline → cart di server usang
+let offlineMathOk = true; // false jika hitungTotal() pernah berbeda dengan server
+let offlineSyncing = false;
+let offlineMenu = {}; // {id: {id, nama, price, img}} dari grid menu
+
+// Tarif dari server dalam basis point (1000 = 10%), lihat index()
+const DISKON_BP = parseInt(document.body.dataset.diskonBp, 10);
+const PAJAK_BP = parseInt(document.body.dataset.pajakBp, 10);
+
+// amount × bp / 10000 dibulatkan ke bawah, dengan aritmatika integer
+// (sama dengan int(Decimal) di server, tanpa error floating point)
+function bagiBasisPoint(amount, bp) {
+  const scaled = amount * bp;
+  return (scaled - (scaled % 10000)) / 10000;
+}
+
+// Mirror hitung_total() di server: diskon dari subtotal, PPN dari DPP
+function hitungTotal(subtotal) {
+  const diskon = bagiBasisPoint(subtotal, DISKON_BP);
+  const dpp = subtotal - diskon;
+  const ppn = bagiBasisPoint(dpp, PAJAK_BP);
+  return { subtotal: subtotal, diskon: diskon, ppn: ppn, total: dpp + ppn };
+}
+
+// Setiap response cart / checkout dari server dicocokkan dengan hitungTotal()
+// Jika pernah berbeda, checkout offline dimatikan (server akan menolaknya)
+function verifyTotals(data) {
+  if (data.total === undefined) return;
+
+  const lokal = hitungTotal(data.subtotal);
+  if (lokal.diskon !== data.diskon || lokal.ppn !== data.ppn || lokal.total !== data.total) {
+    offlineMathOk = false;
+    console.error("Perhitungan total lokal berbeda dengan server:", lokal, data);
+  }
+}
+
+function indexOfflineMenu() {
+  offlineMenu = {};
+  document.querySelectorAll("#menuGrid .btn-cart").forEach((btn) => {
+    offlineMenu[btn.dataset.id] = {
+      id: btn.dataset.id,
+      nama: btn.dataset.nama,
+      price: parseInt(btn.dataset.price, 10),
+      img: btn.dataset.img,
+    };
+  });
+}
+
+function loadQueue(key = OFFLINE_QUEUE_KEY) {
+  try {
+    return JSON.parse(localStorage.getItem(key)) || [];
+  } catch (error) {
+    return [];
+  }
+}
+
+function saveQueue(queue, key = OFFLINE_QUEUE_KEY) {
+  localStorage.setItem(key, JSON.stringify(queue));
+  updateOfflineStatus();
+}
+
+function updateOfflineStatus() {
+  const badge = document.getElementById("offlineStatus");
+  if (!badge) return;
+
+  const pending = loadQueue().length;
+  const rejected = loadQueue(OFFLINE_REJECTED_KEY).length;
+  const parts = [];
+
+  if (offlineMode) parts.push("Offline");
+  if (pending > 0) parts.push(`${pending} transaksi belum terkirim`);
+  if (rejected > 0) parts.push(`${rejected} ditolak server`);
+
+  badge.innerText = parts.join(" · ");
+  badge.classList.toggle("d-none", parts.length === 0);
+}
+
+function enterOfflineMode() {
+  if (offlineMode) return;
+
+  offlineMode = true;
+  updateOfflineStatus();
+  showWarning("Koneksi terputus. Mode offline: transaksi disimpan di perangkat ini dan dikirim otomatis saat online.");
+}
+
+// Cart lokal dalam format response /cart/update
+function localCartData() {
+  const items = Object.values(cart);
+  const subtotal = items.reduce((sum, item) => sum + item.price * item.qty, 0);
+
+  return {
+    cart: items,
+    count: items.reduce((sum, item) => sum + item.qty, 0),
+    ...hitungTotal(subtotal),
+  };
+}
+
+function updateCartOffline(action, id) {
+  const item = cart[id] || (offlineMenu[id] && { ...offlineMenu[id], qty: 0 });
+  if (!item) {
+    showWarning("Item tidak tersedia saat offline");
+    return;
+  }
+
+  if (action === "remove") {
+    delete cart[id];
+  } else {
+    if (action === "add" || action === "plus") item.qty += 1;
+    if (action === "minus" && item.qty > 1) item.qty -= 1;
+    item.subtotal = item.price * item.qty;
+    cart[id] = item;
+  }
+
+  offlineCartDirty = true;
+  applyCartData(localCartData());
+}
+
+function clearCartOffline() {
+  cart = {};
+  offlineCartDirty = true;
+  applyCartData(localCartData());
+  showSuccess("Keranjang berhasil dikosongkan!");
+}
+
+function scanOffline(codes) {
+  // Index barcode ada di server: saat offline hanya kode = ID menu yang dikenali
+  const notFound = codes.filter((code) => !offlineMenu[code]);
+  codes.filter((code) => offlineMenu[code]).forEach((code) => updateCartOffline("add", code));
+
+  if (notFound.length > 0) {
+    showWarning(`Kode tidak dikenal (offline): ${notFound.join(", ")}`);
+  }
+}
+
+function checkoutOffline(nama, cash) {
+  if (!offlineMathOk || Number.isNaN(DISKON_BP) || Number.isNaN(PAJAK_BP)) {
+    showWarning("Checkout offline tidak tersedia: perhitungan total belum terverifikasi dengan server");
+    return;
+  }
+
+  const data = localCartData();
+  if (cash < data.total) {
+    showWarning(`Uang tidak cukup. Total: Rp ${formatRupiah(data.total)}`);
+    return;
+  }
+
+  const entry = {
+    client_id: newIdempotencyKey(),
+    waktu: Date.now() / 1000,
+    nama: nama,
+    order: document.getElementById("inputOrderName")?.value.trim() || null,
+    // Harga & nama dicatat apa adanya: server memakai harga ini walaupun
+    // menu berubah sebelum transaksi terkirim
+    items: data.cart.map((item) => ({ id: item.id, nama: item.nama, qty: item.qty, price: item.price })),
+    subtotal: data.subtotal,
+    diskon: data.diskon,
+    ppn: data.ppn,
+    total: data.total,
+    cash: cash,
+    kembalian: cash - data.total,
+  };
+  saveQueue([...loadQueue(), entry]);
+
+  // Cart dikosongkan agar transaksi yang sama tidak tercatat dua kali
+  cart = {};
+  offlineCartDirty = true;
+  applyCartData(localCartData());
+
+  updateElement("Subtotal", `Rp ${formatRupiah(entry.subtotal)}`);
+  updateElement("ppn", `Rp ${formatRupiah(entry.ppn)}`);
+  updateElement("diskon", `Rp ${formatRupiah(entry.diskon)}`);
+  updateElement("total", `Rp ${formatRupiah(entry.total)}`);
+  updateElement("uangBayar", `Rp ${formatRupiah(entry.cash)}`);
+  updateElement("kembalian", `Rp ${formatRupiah(entry.kembalian)}`);
+
+  showSuccess("Pembayaran offline dicatat! Struk tersedia setelah transaksi terkirim ke server.");
+}
+
+function syncOfflineQueue() {
+  const batch = loadQueue().slice(0, OFFLINE_SYNC_BATCH);
+  if (offlineSyncing || batch.length === 0) return Promise.resolve();
+
+  offlineSyncing = true;
+
+  return fetchOnline("/checkout/sync", {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ checkouts: batch }),
+  })
+    .then((res) =>
+      res.json().then((data) => {
+        if (!res.ok) throw new Error(data.error || "Gagal sinkronisasi transaksi offline");
+        return data;
+      })
+    )
+    .then((data) => {
+      // ok / duplicate: sudah tercatat di server. rejected: dipindah ke
+      // daftar ditolak untuk dicek kasir. error: tetap di antrian.
+      const done = new Set();
+      const rejected = [];
+      let review = 0;
+
+      data.results.forEach((result, i) => {
+        if (result.status === "ok" || result.status === "duplicate") {
+          done.add(batch[i].client_id);
+        } else if (result.status === "rejected") {
+          done.add(batch[i].client_id);
+          rejected.push({ ...batch[i], error: result.error });
+        }
+        if (result.stock_short && result.stock_short.length > 0) {
+          console.warn(`Stok kurang untuk ${result.trx_id}:`, result.stock_short);
+        }
+        // Tercatat, tapi harga / total berbeda dengan menu server
+        if (result.review && result.review.length > 0) {
+          console.warn(`Transaksi ${result.trx_id} perlu dicek admin:`, result.review);
+          review += 1;
+        }
+      });
+
+      // Antrian dibaca ulang: checkout baru selama request tetap tersimpan
+      saveQueue(loadQueue().filter((entry) => !done.has(entry.client_id)));
+
+      if (rejected.length > 0) {
+        saveQueue([...loadQueue(OFFLINE_REJECTED_KEY), ...rejected], OFFLINE_REJECTED_KEY);
+        showWarning(`${rejected.length} transaksi offline ditolak server: ${rejected[0].error}`);
+      } else if (review > 0) {
+        showWarning(`${data.synced} transaksi offline dikirim, ${review} perlu dicek admin (harga/total berbeda dengan menu)`);
+      } else if (data.synced > 0) {
+        showSuccess(`${data.synced} transaksi offline berhasil dikirim`);
+      }
+
+      return done.size === batch.length;
+    })
+    .catch((error) => {
+      if (error.offline) {
+        enterOfflineMode();
+        return false;
+      }
+      console.error("Error syncing offline checkouts:", error);
+      return false;
+    })
+    .finally(() => {
+      offlineSyncing = false;
+    })
+    .then((more) => {
+      // Batch berikutnya (jika antrian lebih dari OFFLINE_SYNC_BATCH)
+      if (more && loadQueue().length > 0) return syncOfflineQueue();
+    });
+}
+
+function tryGoOnline() {
+  // Cart lokal yang belum selesai tetap dipakai sampai checkout / clear,
+  // antrian tetap boleh dikirim
+  if (!offlineMode || Object.keys(cart).length > 0) {
+    syncOfflineQueue();
+    return;
+  }
+
+  // Cart di session server masih isi lama (sebelum offline): dikosongkan
+  // dulu supaya reservasi stoknya kembali sebelum antrian dikirim
+  const clearServerCart = offlineCartDirty
+    ? fetchOnline("/cart/clear", { method: "POST" }).then((res) => {
+        if (!res.ok) throw new Error("Gagal menghapus keranjang");
+      })
+    : fetchOnline("/cart/get").then((res) => {
+        if (!res.ok) throw new Error("Gagal load cart");
+      });
+
+  clearServerCart
+    .then(() => {
+      offlineMode = false;
+      offlineCartDirty = false;
+      loadCartFromServer();
+      return syncOfflineQueue();
+    })
+    .catch((error) => {
+      if (!error.offline) console.error("Error going online:", error);
+    })
+    .finally(updateOfflineStatus);
+}
+
+// Transaksi yang ditolak server tidak dihapus otomatis: kasir melihat
+// rinciannya (klik badge) untuk dicatat manual, lalu menghapusnya
+function reviewRejectedCheckouts() {
+  const rejected = loadQueue(OFFLINE_REJECTED_KEY);
+  if (rejected.length === 0) return;
+
+  const lines = rejected.map((entry) => `${entry.nama} - Rp ${formatRupiah(entry.total)}: ${entry.error}`);
+  showConfirm(`Transaksi offline ditolak server:\n${lines.join("\n")}\n\nSudah dicatat? Hapus dari daftar.`, (yes) => {
+    if (yes) saveQueue([], OFFLINE_REJECTED_KEY);
+  });
+}
+
+function initOfflineMode() {
+  if ("serviceWorker" in navigator) {
+    navigator.serviceWorker.register("/sw.js").catch((error) => {
+      console.error("Service worker gagal didaftarkan:", error);
+    });
+  }
+
+  indexOfflineMenu();
+
+  const badge = document.getElementById("offlineStatus");
+  if (badge) badge.addEventListener("click", reviewRejectedCheckouts);
+
+  window.addEventListener("online", tryGoOnline);
+  window.addEventListener("offline", enterOfflineMode);
+  setInterval(() => {
+    if (offlineMode || loadQueue().length > 0) tryGoOnline();
+  }, OFFLINE_RETRY_INTERVAL);
+
+  updateOfflineStatus();
+
+  // Sisa antrian dari sesi sebelumnya (halaman ditutup saat offline)
+  syncOfflineQueue();
+}
+
 // ===================================== INITIALIZE
 document.addEventListener("DOMContentLoaded", () => {
+  initOfflineMode();
   initClearButton();
+  initParkedOrders();
+  initShift();
+  initSearchMenu();
+  initAvailabilityStream();
   loadCartFromServer(); // Load cart dari server saat page load
   console.log("Cart system initialized");
 });
@@ -0,0 +1,93 @@
+// ===================================== SERVICE WORKER (MODE OFFLINE)
+// Menyimpan "shell" aplikasi (halaman index + grid menu, JS, CSS, gambar)
+// agar halaman kasir tetap bisa dibuka saat koneksi outlet putus.
+// Request API (/cart/*, /checkout, stream SSE) TIDAK di-cache: saat offline
+// main.js memakai cart lokal + antrian checkout di localStorage.
+const CACHE_NAME = "kasir-shell-v1";
+
+const SHELL_URLS = ["/", "/static/js/main.js", "/static/css/style.css", "/static/img/LogoUBSI.png", "/static/img/kdk.jpg"];
+
+// Mode request harus sama dengan di index.html: response opaque (no-cors)
+// tidak bisa dipakai untuk <script crossorigin> / integrity
+const CDN_URLS = [
+  ["https://cdn.jsdelivr.net/npm/bootstrap@5.3.8/dist/css/bootstrap.min.css", "cors"],
+  ["https://cdn.jsdelivr.net/npm/bootstrap@5.3.8/dist/js/bootstrap.bundle.min.js", "cors"],
+  ["https://cdn.jsdelivr.net/npm/bootstrap-icons@1.13.1/font/bootstrap-icons.min.css", "no-cors"],
+  ["https://unpkg.com/scrollreveal", "no-cors"],
+];
+
+// Halaman yang selalu diambil dari network dulu (isi berubah saat menu diupdate)
+const NETWORK_FIRST = ["/", "/menu/grid"];
+
+function cacheResponse(request, response) {
+  // Redirect ke /login (session habis) / error tidak boleh menimpa shell
+  if (response.redirected || (!response.ok && response.type !== "opaque")) {
+    return response;
+  }
+  const copy = response.clone();
+  caches.open(CACHE_NAME).then((cache) => cache.put(request, copy));
+  return response;
+}
+
+self.addEventListener("install", (event) => {
+  event.waitUntil(
+    caches.open(CACHE_NAME).then((cache) =>
+      // Satu asset gagal (CDN down) tidak membatalkan instalasi
+      Promise.all(
+        [...SHELL_URLS.map((url) => [url, "same-origin"]), ...CDN_URLS].map(([url, mode]) => {
+          const request = new Request(url, { mode: mode, credentials: mode === "same-origin" ? "same-origin" : "omit" });
+          return fetch(request)
+            .then((response) => {
+              if (!response.redirected && (response.ok || response.type === "opaque")) {
+                return cache.put(request, response);
+              }
+            })
+            .catch((error) => console.warn("Precache gagal:", url, error));
+        })
+      )
+    )
+  );
+  self.skipWaiting();
+});
+
+self.addEventListener("activate", (event) => {
+  // Hapus cache versi lama
+  event.waitUntil(
+    caches
+      .keys()
+      .then((keys) => Promise.all(keys.filter((key) => key !== CACHE_NAME).map((key) => caches.delete(key))))
+      .then(() => self.clients.claim())
+  );
+});
+
+self.addEventListener("fetch", (event) => {
+  const request = event.request;
+  if (request.method !== "GET") return;
+
+  const url = new URL(request.url);
+  const sameOrigin = url.origin === self.location.origin;
+
+  // Network first: halaman index & grid menu, fallback ke cache saat offline
+  if (sameOrigin && NETWORK_FIRST.includes(url.pathname)) {
+    event.respondWith(
+      fetch(request)
+        .then((response) => cacheResponse(request, response))
+        .catch(() => caches.match(request, { ignoreSearch: true, ignoreVary: true }).then((cached) => cached || Response.error()))
+    );
+    return;
+  }
+
+  // Stale-while-revalidate: static file, CDN, gambar menu
+  if ((sameOrigin && url.pathname.startsWith("/static/")) || (!sameOrigin && ["style", "script", "font", "image"].includes(request.destination))) {
+    event.respondWith(
+      caches.match(request, { ignoreVary: true }).then((cached) => {
+        const network = fetch(request)
+          .then((response) => cacheResponse(request, response))
+          .catch(() => cached || Response.error());
+        return cached || network;
+      })
+    );
+  }
+
+  // Selain itu (API, SSE, /struk, /login) langsung ke network
+});
@@ -0,0 +1,37 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# main.py memakai path relatif (data/menu.json, static/img, ...)
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import main  # noqa: E402
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Database SQLite sementara (bukan data/kasir.db)"""
+    original = main.app.config["DATABASE"]
+    path = str(tmp_path / "kasir.db")
+    main.app.config["DATABASE"] = path
+    yield path
+    main.app.config["DATABASE"] = original
+
+
+@pytest.fixture
+def outlets_dir(tmp_path, monkeypatch):
+    """
+    Folder overlay outlet sementara (bukan data/outlets)
+
+    Katalog yang di-reload selama test dikembalikan setelah test selesai.
+    """
+    path = tmp_path / "outlets"
+    monkeypatch.setattr(main, "OUTLETS_DIR", str(path))
+    monkeypatch.setattr(main, "base_catalog", main.base_catalog)
+    monkeypatch.setattr(main, "catalogs", main.catalogs)
+    monkeypatch.setattr(main, "_menu_loaded_mtimes", main._menu_loaded_mtimes)
+    return path
@@ -0,0 +1,96 @@
+"""
+Test /api/menu: pagination, filter kategori, ETag / 304
+"""
+
+import pytest
+
+import main
+
+BASE_URL = "https://localhost"
+
+
+@pytest.fixture
+def client(db_path):
+    client = main.app.test_client()
+    response = client.post(
+        "/login",
+        data={"email": "zhaenx_id@yeswehack.com", "password": "zh43nx"},
+        base_url=BASE_URL,
+    )
+    assert response.status_code == 302
+    return client
+
+
+def get(client, etag=None, **params):
+    headers = {"If-None-Match": etag} if etag else {}
+    return client.get("/api/menu", query_string=params, headers=headers, base_url=BASE_URL)
+
+
+def test_full_catalog(client):
+    data = get(client).json
+    catalog = main.catalogs["K3"]
+
+    assert data["version"] == catalog.version
+    assert data["kategori"] == list(catalog.menu)
+    assert data["page"] is None
+    assert data["total"] == data["per_page"] == len(data["items"])
+    assert data["total"] == sum(len(items) for items in catalog.menu.values())
+
+
+def test_pages_cover_catalog_in_order(client):
+    items = get(client).json["items"]
+
+    pages = []
+    for page in range(1, len(items) // 5 + 2):
+        data = get(client, page=page, per_page=5).json
+        assert data["page"] == page
+        assert data["per_page"] == 5
+        assert data["total"] == len(items)
+        pages.extend(data["items"])
+
+    assert pages == items
+    assert get(client, page=100, per_page=5).json["items"] == []
+
+
+def test_kategori_filter(client):
+    data = get(client, kategori="Minuman", page=1, per_page=3).json
+
+    assert data["total"] == len(main.catalogs["K3"].menu["Minuman"])
+    assert len(data["items"]) == 3
+    assert {item["kategori"] for item in data["items"]} == {"Minuman"}
+    assert get(client, kategori="Tidak ada").status_code == 404
+
+
+@pytest.mark.parametrize(
+    "params",
+    [{"page": 0}, {"page": "satu"}, {"page": 1, "per_page": 0}, {"page": 1, "per_page": 201}],
+)
+def test_invalid_page(client, params):
+    assert get(client, **params).status_code == 400
+
+
+def test_conditional_get(client, monkeypatch, outlets_dir):
+    first = get(client, page=1, per_page=4)
+    etag = first.headers["ETag"]
+
+    assert get(client, page=2, per_page=4).headers["ETag"] != etag
+
+    # Body di-serialize sekali per (versi, kategori, page, per_page)
+    serialize = main.serialize_menu_page
+
+    def fail(*args):
+        raise AssertionError("katalog di-serialize ulang")
+
+    monkeypatch.setattr(main, "serialize_menu_page", fail)
+    not_modified = get(client, etag, page=1, per_page=4)
+    assert not_modified.status_code == 304
+    assert not_modified.data == b""
+    assert get(client, page=1, per_page=4).data == first.data
+
+    # Katalog berubah: versi baru, response lengkap
+    monkeypatch.setattr(main, "serialize_menu_page", serialize)
+    main.set_item_availability("K3", "Mkn001", False)
+    changed = get(client, etag, page=1, per_page=4)
+
+    assert changed.status_code == 200
+    assert changed.json["version"] == main.catalogs["K3"].version != first.json["version"]
@@ -0,0 +1,80 @@
+"""
+Test cart_json / MenuItem.cart_json: fragment harus sama persis (bytes)
+dengan encode_json(lines), baik dengan orjson maupun json stdlib
+"""
+
+import pytest
+
+import main
+
+ITEMS = [
+    {"id": "Mn001", "nama": "Es teh manis", "price": 5000, "img": "static/img/teh.png"},
+    {"id": "Mn002", "nama": "Kopi susu ☕ gula aren", "price": 18000, "img": ""},
+    {"id": "Mkn010", "nama": "Crème brûlée «spesial»", "price": 42000, "img": "static/img/é.png"},
+    {"id": "Mkn011", "nama": 'Nasi "goreng" \\ pedas\t😋', "price": 25000, "img": "a/b.png"},
+    {"id": "Mkn012", "nama": "Tumpeng besar", "price": 2**40, "img": "x.png"},
+]
+
+CARTS = [
+    [],
+    [("Mn001", 1)],
+    [("Mn001", 0), ("Mn002", 3)],
+    [("Mn002", 1), ("Mkn010", 2), ("Mkn011", 999_999), ("Mkn012", 100_000)],
+]
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def backend(request, monkeypatch):
+    if request.param == "orjson":
+        if main.orjson is None:
+            pytest.skip("orjson tidak terinstall")
+    else:
+        monkeypatch.setattr(main, "orjson", None)
+    return request.param
+
+
+@pytest.fixture
+def catalog(backend, monkeypatch):
+    # MenuItem baru per backend: prefix cart_json di-cache per item
+    items = {data["id"]: main.MenuItem(data, "Test") for data in ITEMS}
+    monkeypatch.setattr(main, "current_catalog", lambda: items)
+    return items
+
+
+def expand(cart):
+    with main.app.test_request_context():
+        return main.expand_cart([[item_id, qty] for item_id, qty in cart])
+
+
+@pytest.mark.parametrize("cart", CARTS)
+def test_item_fragment_matches_encode_json(catalog, cart):
+    lines = expand(cart)
+    fragments = [catalog[line["id"]].cart_json(line["qty"]) for line in lines]
+
+    spliced = main.encode_json({"cart": [main.JSONFragment(b"[" + b",".join(fragments) + b"]")]})
+
+    assert spliced == main.encode_json({"cart": [lines]})
+    for fragment, line in zip(fragments, lines):
+        assert bytes(fragment) == main.encode_json(line)
+
+
+@pytest.mark.parametrize("cart", CARTS)
+def test_cart_json_matches_encode_json(catalog, cart):
+    lines = expand(cart)
+
+    with main.app.test_request_context():
+        response = main.encode_json({"cart": main.cart_json(lines), "count": len(lines)})
+
+    assert response == main.encode_json({"cart": lines, "count": len(lines)})
+
+
+def test_stdlib_and_orjson_agree(monkeypatch):
+    if main.orjson is None:
+        pytest.skip("orjson tidak terinstall")
+
+    items = [main.MenuItem(data, "Test") for data in ITEMS]
+    lines = [{"id": item.id, "img": item.img, "nama": item.nama, "price": item.price} for item in items]
+    fast = main.encode_json(lines)
+
+    monkeypatch.setattr(main, "orjson", None)
+    assert main.encode_json(lines) == fast
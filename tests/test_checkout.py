@@ -0,0 +1,132 @@
+"""
+Test /checkout (online): stok, cart, dan nomor struk
+"""
+
+import sqlite3
+import uuid
+
+import pytest
+
+import main
+
+BASE_URL = "https://localhost"
+OUTLET = "K3"
+ITEM = "Mkn001"
+
+
+@pytest.fixture
+def client(db_path):
+    client = main.app.test_client()
+    response = client.post(
+        "/login",
+        data={"email": "zhaenx_id@yeswehack.com", "password": "zh43nx"},
+        base_url=BASE_URL,
+    )
+    assert response.status_code == 302
+    main.inventory.set_level(OUTLET, ITEM, 10)
+    return client
+
+
+def add(client, item_id=ITEM):
+    response = client.post(
+        "/cart/update", json={"id": item_id, "action": "add"}, base_url=BASE_URL
+    )
+    assert response.status_code == 200
+
+
+def checkout(client, key=None):
+    key = key or str(uuid.uuid4())
+    return client.post(
+        "/checkout",
+        json={"nama": "Ana", "cash": 10_000_000},
+        headers={"Idempotency-Key": key},
+        base_url=BASE_URL,
+    )
+
+
+def test_second_checkout_does_not_sell_again(client):
+    add(client)
+    add(client)
+
+    first = checkout(client)
+    second = checkout(client)
+
+    assert first.status_code == 200
+    assert second.status_code == 400
+    assert second.json == {"error": "Keranjang kosong"}
+    assert main.inventory.level(OUTLET, ITEM) == 8
+    assert [row[1] for row in main.trx_journal.rows()] == [first.json["trx_id"]]
+
+    with client.session_transaction(base_url=BASE_URL) as session:
+        assert session["jumlahcart"] == []
+        assert session["cart_count"] == 0
+        assert session["pembeli"]["trx_id"] == first.json["trx_id"]
+
+
+def test_replay_keeps_cart_empty(client):
+    add(client)
+
+    key = str(uuid.uuid4())
+    first = checkout(client, key)
+    with client.session_transaction(base_url=BASE_URL) as session:
+        # Cookie response pertama tidak sampai ke browser
+        session["jumlahcart"] = [[ITEM, 1]]
+        session["cart_count"] = 1
+    replay = checkout(client, key)
+
+    assert replay.headers["Idempotent-Replayed"] == "true"
+    assert replay.json == first.json
+    assert main.inventory.level(OUTLET, ITEM) == 9
+    with client.session_transaction(base_url=BASE_URL) as session:
+        assert session["jumlahcart"] == []
+
+
+def test_item_removed_from_menu_is_not_dropped(client):
+    add(client)
+    with client.session_transaction(base_url=BASE_URL) as session:
+        session["jumlahcart"] = [[ITEM, 1], ["Hilang001", 2]]
+        session["cart_count"] = 3
+
+    response = checkout(client)
+
+    assert response.status_code == 409
+    assert response.json["items"] == ["Hilang001"]
+    assert main.inventory.level(OUTLET, ITEM) == 9
+    assert main.trx_journal.rows() == []
+
+
+def test_receipt_number_failure_keeps_stock(client, monkeypatch):
+    class BrokenCounter:
+        def next_id(self):
+            raise sqlite3.OperationalError("database is locked")
+
+    add(client)
+    monkeypatch.setattr(main, "receipt_numbers_for", lambda outlet: BrokenCounter())
+
+    response = checkout(client)
+
+    assert response.status_code == 500
+    assert main.inventory.level(OUTLET, ITEM) == 9
+    with client.session_transaction(base_url=BASE_URL) as session:
+        assert session["jumlahcart"] == [[ITEM, 1]]
+
+    # Reservasi cart masih utuh: checkout berikutnya tidak memotong stok lagi
+    monkeypatch.undo()
+    assert checkout(client).status_code == 200
+    assert main.inventory.level(OUTLET, ITEM) == 9
+
+
+def test_outlet_switch_requires_empty_cart(client, monkeypatch):
+    monkeypatch.setitem(main.catalogs, "K5", main.catalogs[OUTLET])
+    add(client)
+
+    refused = client.post("/outlet", json={"outlet": "K5"}, base_url=BASE_URL)
+    assert refused.status_code == 409
+    assert client.get("/outlet", base_url=BASE_URL).json["outlet"] == OUTLET
+
+    client.post("/cart/clear", base_url=BASE_URL)
+    assert main.inventory.level(OUTLET, ITEM) == 10
+
+    switched = client.post("/outlet", json={"outlet": "K5"}, base_url=BASE_URL)
+    assert switched.status_code == 200
+    assert switched.json["outlet"] == "K5"
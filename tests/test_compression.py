@@ -0,0 +1,131 @@
+"""
+Test compress_response: negosiasi br / gzip, batas ukuran, cache, ETag
+"""
+
+import gzip
+import os
+
+import pytest
+
+import main
+
+BASE_URL = "https://localhost"
+BODY = b'{"items":[' + b",".join(b'{"id":"Mkn%03d","nama":"Nasi goreng"}' % n for n in range(100)) + b"]}"
+
+
+def compress(body, accept, mimetype="application/json", etag=None, path="/test", **headers):
+    with main.app.test_request_context(path, headers={"Accept-Encoding": accept}):
+        response = main.app.response_class(body, mimetype=mimetype, headers=headers)
+        if etag:
+            response.set_etag(etag)
+        return main.compress_response(response)
+
+
+def decode(response):
+    encoding = response.headers.get("Content-Encoding")
+    if encoding == "br":
+        return main.brotli.decompress(response.get_data())
+    if encoding == "gzip":
+        return gzip.decompress(response.get_data())
+    return response.get_data()
+
+
+@pytest.mark.parametrize(
+    "accept, encoding",
+    [
+        ("br", "br"),
+        ("gzip", "gzip"),
+        ("gzip, deflate, br", "br"),
+        ("br;q=0.5, gzip", "gzip"),
+        ("*", "br"),
+        ("deflate", None),
+        ("identity", None),
+        ("", None),
+    ],
+)
+def test_encoding_negotiation(accept, encoding):
+    if encoding == "br" and main.brotli is None:
+        encoding = "gzip"
+
+    response = compress(BODY, accept)
+
+    assert response.headers.get("Content-Encoding") == encoding
+    assert "Accept-Encoding" in response.vary
+    assert decode(response) == BODY
+
+
+def test_gzip_only_without_brotli(monkeypatch):
+    monkeypatch.setattr(main, "brotli", None)
+
+    assert compress(BODY, "br").headers.get("Content-Encoding") is None
+    assert compress(BODY, "br, gzip").headers["Content-Encoding"] == "gzip"
+
+
+@pytest.mark.parametrize(
+    "body, mimetype, headers",
+    [
+        (BODY[: main.app.config["COMPRESS_MIN_SIZE"] - 1], "application/json", {}),
+        (BODY, "image/png", {}),
+        (BODY, "application/json", {"Content-Encoding": "gzip"}),
+        (os.urandom(4096), "application/pdf", {}),  # Tidak mengecil
+    ],
+)
+def test_skipped_bodies_are_sent_as_is(body, mimetype, headers):
+    response = compress(body, "gzip, br", mimetype=mimetype, **headers)
+
+    assert response.get_data() == body
+    assert response.headers.get("Content-Encoding") == headers.get("Content-Encoding")
+
+
+def test_compressed_body_cached_per_path_etag_encoding(monkeypatch):
+    etag = "compress-test-etag"
+    first = compress(BODY, "gzip", etag=etag)
+
+    assert main._compress_cache[("/test", etag, "gzip")] == first.get_data()
+    assert ("/test", etag, "br") not in main._compress_cache
+    assert first.get_etag() == (etag, True)  # Weak: bytes beda, isi sama
+
+    def fail(*args):
+        raise AssertionError("body dikompres ulang")
+
+    monkeypatch.setattr(main, "compress_body", fail)
+    assert compress(BODY, "gzip", etag=etag).get_data() == first.get_data()
+
+    # Tanpa ETag tidak di-cache (isi bisa berubah dengan path yang sama)
+    monkeypatch.undo()
+    size = len(main._compress_cache)
+    compress(BODY, "gzip")
+    assert len(main._compress_cache) == size
+
+
+@pytest.fixture
+def client(db_path):
+    client = main.app.test_client()
+    response = client.post(
+        "/login",
+        data={"email": "zhaenx_id@yeswehack.com", "password": "zh43nx"},
+        base_url=BASE_URL,
+    )
+    assert response.status_code == 302
+    return client
+
+
+def test_etag_304_under_compression(client):
+    first = client.get("/api/menu", headers={"Accept-Encoding": "gzip"}, base_url=BASE_URL)
+    etag, weak = first.get_etag()
+
+    assert first.headers["Content-Encoding"] == "gzip"
+    assert weak
+
+    again = client.get(
+        "/api/menu",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": first.headers["ETag"]},
+        base_url=BASE_URL,
+    )
+    assert again.status_code == 304
+    assert again.data == b""
+    assert "Content-Encoding" not in again.headers
+
+    # ETag weak dari response terkompres juga berlaku untuk client tanpa gzip
+    plain = client.get("/api/menu", headers={"If-None-Match": f'"{etag}"'}, base_url=BASE_URL)
+    assert plain.status_code == 304
@@ -0,0 +1,150 @@
+"""
+Test Idempotency-Key pada /checkout (IdempotencyStore di SQLite)
+"""
+
+import threading
+import time
+import uuid
+
+import pytest
+
+import main
+
+BASE_URL = "https://localhost"
+ITEM = "Mkn001"
+
+
+def login():
+    client = main.app.test_client()
+    response = client.post(
+        "/login",
+        data={"email": "zhaenx_id@yeswehack.com", "password": "zh43nx"},
+        base_url=BASE_URL,
+    )
+    assert response.status_code == 302
+    response = client.post(
+        "/cart/update", json={"id": ITEM, "action": "add"}, base_url=BASE_URL
+    )
+    assert response.status_code == 200
+    return client
+
+
+@pytest.fixture
+def client(db_path):
+    return login()
+
+
+def checkout(client, key, cash=1_000_000):
+    return client.post(
+        "/checkout",
+        json={"nama": "Ana", "cash": cash},
+        headers={"Idempotency-Key": key},
+        base_url=BASE_URL,
+    )
+
+
+def journal():
+    return [row[1] for row in main.trx_journal.rows()]
+
+
+def test_replay_returns_first_response(client):
+    key = str(uuid.uuid4())
+
+    first = checkout(client, key)
+    replay = checkout(client, key)
+
+    assert first.status_code == 200
+    assert "Idempotent-Replayed" not in first.headers
+    assert replay.status_code == 200
+    assert replay.headers["Idempotent-Replayed"] == "true"
+    assert replay.data == first.data
+    assert journal() == [first.json["trx_id"]]
+
+
+def test_replay_from_another_worker(client):
+    key = str(uuid.uuid4())
+    first = checkout(client, key)
+
+    # Worker lain: store baru, database yang sama
+    worker = main.IdempotencyStore()
+    scoped_key = f"zhaenx_id@yeswehack.com:/checkout:{key}"
+    body = main.app.json.dumps({"nama": "Ana", "cash": 1_000_000}).encode()
+    fingerprint = main.hashlib.sha1(body).hexdigest()
+
+    def execute():
+        raise AssertionError("checkout diproses ulang")
+
+    result, replayed = worker.run(scoped_key, fingerprint, execute)
+
+    assert replayed
+    assert result["status"] == 200
+    assert result["body"] == first.data
+    assert result["session"]["pembeli"]["trx_id"] == first.json["trx_id"]
+
+
+def test_same_key_different_body_is_rejected(client):
+    key = str(uuid.uuid4())
+
+    first = checkout(client, key)
+    other = checkout(client, key, cash=2_000_000)
+
+    assert first.status_code == 200
+    assert other.status_code == 422
+    assert journal() == [first.json["trx_id"]]
+
+
+def test_server_error_is_not_stored(client, monkeypatch):
+    class BrokenCounter:
+        def next_id(self):
+            raise main.sqlite3.OperationalError("database is locked")
+
+    key = str(uuid.uuid4())
+    monkeypatch.setattr(main, "receipt_numbers_for", lambda outlet: BrokenCounter())
+    assert checkout(client, key).status_code == 500
+
+    monkeypatch.undo()
+    retry = checkout(client, key)
+
+    assert retry.status_code == 200
+    assert "Idempotent-Replayed" not in retry.headers
+    assert journal() == [retry.json["trx_id"]]
+
+
+def test_concurrent_duplicate_waits_for_first(db_path, monkeypatch):
+    first_client = login()
+    second_client = login()
+    key = str(uuid.uuid4())
+
+    started = threading.Event()
+    release = threading.Event()
+    publish = main.publish_kitchen_order
+
+    def slow_publish(outlet, pembeli):
+        started.set()
+        assert release.wait(10)
+        publish(outlet, pembeli)
+
+    monkeypatch.setattr(main, "publish_kitchen_order", slow_publish)
+
+    responses = {}
+
+    def send(name, client):
+        responses[name] = checkout(client, key)
+
+    first = threading.Thread(target=send, args=("first", first_client))
+    first.start()
+    assert started.wait(10)
+
+    second = threading.Thread(target=send, args=("second", second_client))
+    second.start()
+    time.sleep(0.3)
+    assert second.is_alive()  # Menunggu request pertama, bukan diproses
+
+    release.set()
+    first.join(10)
+    second.join(10)
+
+    assert responses["first"].status_code == 200
+    assert responses["second"].headers["Idempotent-Replayed"] == "true"
+    assert responses["second"].data == responses["first"].data
+    assert journal() == [responses["first"].json["trx_id"]]
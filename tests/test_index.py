@@ -0,0 +1,86 @@
+"""
+Test halaman index (/): fragment grid menu + ETag / 304
+"""
+
+import pytest
+
+import main
+
+BASE_URL = "https://localhost"
+
+
+@pytest.fixture
+def client(db_path):
+    client = main.app.test_client()
+    response = client.post(
+        "/login",
+        data={"email": "zhaenx_id@yeswehack.com", "password": "zh43nx"},
+        base_url=BASE_URL,
+    )
+    assert response.status_code == 302
+    return client
+
+
+@pytest.fixture
+def renders(monkeypatch):
+    """Nama template yang di-render selama test"""
+    names = []
+    render_template = main.render_template
+
+    def counting(name, **context):
+        names.append(name)
+        return render_template(name, **context)
+
+    monkeypatch.setattr(main, "render_template", counting)
+    return names
+
+
+def get(client, etag=None):
+    headers = {"If-None-Match": etag} if etag else {}
+    return client.get("/", headers=headers, base_url=BASE_URL)
+
+
+def test_repeat_load_is_304_without_render(client, renders):
+    first = get(client)
+    etag, _ = first.get_etag()
+
+    assert first.status_code == 200
+    assert etag == f"{main.catalogs['K3'].version}-{main.template_version()}"
+    assert b"Mkn001" in first.data
+
+    renders.clear()
+    assert get(client, first.headers["ETag"]).status_code == 304
+    assert get(client, f'W/"{etag}"').status_code == 304
+    assert renders == []
+
+
+def test_cart_does_not_change_page(client):
+    before = get(client)
+    client.post("/cart/update", json={"id": "Mkn001", "action": "add"}, base_url=BASE_URL)
+    after = get(client)
+
+    assert after.get_etag() == before.get_etag()
+    assert after.data == before.data
+
+
+def test_menu_change_renders_grid_once(client, renders, outlets_dir):
+    etag = get(client).headers["ETag"]
+
+    main.set_item_availability("K3", "Mkn001", False)
+    renders.clear()
+    changed = get(client, etag)
+    again = get(client)
+
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert again.data == changed.data
+    assert renders.count("_menu_grid.html") == 1
+    assert renders.count("index.html") == 2
+
+
+def test_template_deploy_changes_etag(client, monkeypatch):
+    etag = get(client).headers["ETag"]
+
+    monkeypatch.setattr(main, "_template_version", "deploy-baru")
+
+    assert get(client, etag).status_code == 200
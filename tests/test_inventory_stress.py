@@ -0,0 +1,142 @@
+"""
+Stress test InventoryStore: beberapa proses (masing-masing dengan
+beberapa thread) reserve + checkout item yang sama di satu file SQLite.
+Stok tidak boleh pernah terjual lebih dari yang tersedia.
+"""
+
+import multiprocessing
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import main
+
+PROCESSES = 6
+THREADS = 4
+# Batas putaran per thread (jaga-jaga jika stok tidak pernah habis)
+MAX_ROUNDS = 1000
+OUTLET = "K3"
+ITEM = "Mkn001"
+
+
+def sell(worker, thread):
+    """Reserve + checkout 1 unit berulang sampai stok habis"""
+    sid = f"sid-{worker}-{thread}"
+    sold = 0
+
+    for i in range(1, MAX_ROUNDS + 1):
+        try:
+            main.inventory.reserve(sid, OUTLET, ITEM, 1)
+
+            # Sesekali: tambah lalu kurangi lagi (jalur release)
+            if i % 3 == 0:
+                main.inventory.reserve(sid, OUTLET, ITEM, 1)
+                main.inventory.release(sid, OUTLET, [(ITEM, 1)])
+
+            main.inventory.commit(sid, OUTLET, [(ITEM, 1)])
+            sold += 1
+        except main.OutOfStock:
+            # Reservasi yang tersisa dikembalikan, lalu cek apakah stok
+            # benar-benar habis (bukan hanya cache yang belum update)
+            main.inventory.release_all(sid)
+            if main.inventory.levels(OUTLET).get(ITEM, 0) == 0:
+                break
+
+    return sold
+
+
+def worker(db_path, index, cache_ttl, barrier, go, results):
+    main.app.config["DATABASE"] = db_path
+    main.inventory.cache.ttl = cache_ttl
+
+    # Isi cache proses ini dengan level stok saat ini (bisa None =
+    # item belum di-track)
+    main.inventory.level(OUTLET, ITEM)
+
+    barrier.wait()
+    go.wait()
+
+    with ThreadPoolExecutor(THREADS) as executor:
+        sold = sum(executor.map(lambda t: sell(index, t), range(THREADS)))
+
+    results.put(sold)
+
+
+def run_workers(db_path, cache_ttl, before_go=None):
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(PROCESSES + 1)
+    go = ctx.Event()
+    results = ctx.Queue()
+
+    processes = [
+        ctx.Process(target=worker, args=(db_path, i, cache_ttl, barrier, go, results))
+        for i in range(PROCESSES)
+    ]
+    for process in processes:
+        process.start()
+
+    # Semua worker sudah mengisi cache-nya
+    barrier.wait(timeout=120)
+    if before_go:
+        before_go()
+    go.set()
+
+    sold = []
+    deadline = time.monotonic() + 120
+    while len(sold) < len(processes):
+        try:
+            sold.append(results.get(timeout=0.5))
+        except queue.Empty:
+            crashed = [p.exitcode for p in processes if p.exitcode not in (None, 0)]
+            assert not crashed, f"worker gagal, exitcode {crashed}"
+            assert time.monotonic() < deadline, "worker tidak selesai dalam 120 detik"
+
+    for process in processes:
+        process.join(timeout=30)
+        assert process.exitcode == 0
+
+    return sum(sold)
+
+
+def reserved_total(db_path):
+    conn = main.connect_db()
+    try:
+        (total,) = conn.execute(
+            "SELECT COALESCE(SUM(qty), 0) FROM stock_reservations WHERE outlet = ? AND item_id = ?",
+            (OUTLET, ITEM),
+        ).fetchone()
+    finally:
+        conn.close()
+    return total
+
+
+def test_parallel_checkouts_never_oversell(db_path):
+    stock = 200
+    main.inventory.set_level(OUTLET, ITEM, stock)
+
+    sold = run_workers(db_path, main.STOCK_CACHE_TTL)
+
+    available = main.inventory.levels(OUTLET)[ITEM]
+    assert available == 0
+    assert reserved_total(db_path) == 0
+    assert sold == stock
+
+
+def test_item_tracked_while_cached_as_untracked(db_path):
+    # Setiap worker meng-cache item sebagai "tidak di-track" (None),
+    # lalu stok mulai di-track oleh proses lain sebelum worker menjual.
+    # TTL cache dibuat panjang supaya semua penjualan terjadi di dalam
+    # window cache basi tersebut.
+    stock = 60
+    main.inventory.level(OUTLET, ITEM)  # buat tabel
+
+    sold = run_workers(
+        db_path,
+        cache_ttl=60,
+        before_go=lambda: main.inventory.set_level(OUTLET, ITEM, stock),
+    )
+
+    available = main.inventory.levels(OUTLET)[ITEM]
+    assert available >= 0
+    assert sold + available + reserved_total(db_path) == stock
+    assert sold == stock
@@ -0,0 +1,171 @@
+"""
+Test /checkout/sync: checkout offline yang dikirim saat koneksi kembali
+"""
+
+import time
+import uuid
+
+import pytest
+
+import main
+
+BASE_URL = "https://localhost"
+
+
+@pytest.fixture
+def client(db_path):
+    client = main.app.test_client()
+    response = client.post(
+        "/login",
+        data={"email": "zhaenx_id@yeswehack.com", "password": "zh43nx"},
+        base_url=BASE_URL,
+    )
+    assert response.status_code == 302
+    return client
+
+
+def entry(items, cash, **override):
+    """Checkout offline seperti yang disimpan static/js/main.js"""
+    subtotal = sum(price * qty for _, _, qty, price in items)
+    diskon, ppn, total = main.hitung_total(subtotal)
+    data = {
+        "client_id": str(uuid.uuid4()),
+        "waktu": time.time() - 60,
+        "nama": "Ana",
+        "order": None,
+        "items": [
+            {"id": item_id, "nama": nama, "qty": qty, "price": price}
+            for item_id, nama, qty, price in items
+        ],
+        "subtotal": subtotal,
+        "diskon": diskon,
+        "ppn": ppn,
+        "total": total,
+        "cash": cash,
+        "kembalian": cash - total,
+    }
+    data.update(override)
+    return data
+
+
+def menu_line(item_id, qty=1, price=None):
+    item = main.base_catalog.by_id[item_id]
+    return (item.id, item.nama, qty, item.price if price is None else price)
+
+
+def sync(client, *checkouts):
+    response = client.post("/checkout/sync", json={"checkouts": list(checkouts)}, base_url=BASE_URL)
+    assert response.status_code == 200
+    return response.json["results"]
+
+
+def journal():
+    return {row[1]: row[-1] for row in main.trx_journal.rows()}
+
+
+def test_sale_is_recorded_once(client):
+    sale = entry([menu_line("Mkn001", 2)], 100000)
+
+    (first,) = sync(client, sale)
+    (replay,) = sync(client, sale)
+
+    assert first["status"] == "ok"
+    assert "review" not in first
+    assert replay == {"client_id": sale["client_id"], "status": "duplicate", "trx_id": first["trx_id"]}
+    assert list(journal()) == [first["trx_id"]]
+
+
+@pytest.mark.parametrize(
+    "field, value",
+    [
+        ("qty", 1.9),
+        ("qty", True),
+        ("qty", "2"),
+        ("price", 23000.0),
+        ("cash", True),
+        ("cash", 100000.5),
+        ("total", "45540"),
+    ],
+)
+def test_non_integer_amounts_are_rejected(client, field, value):
+    sale = entry([menu_line("Mkn001")], 100000)
+    if field in ("qty", "price"):
+        sale["items"][0][field] = value
+    else:
+        sale[field] = value
+
+    (result,) = sync(client, sale)
+
+    assert result["status"] == "rejected"
+    assert journal() == {}
+
+
+def test_price_changed_after_sale_is_flagged_not_dropped(client):
+    item = main.base_catalog.by_id["Mkn001"]
+    old_price = item.price - 3000
+    sale = entry([menu_line("Mkn001", 2, price=old_price)], 100000)
+
+    (result,) = sync(client, sale)
+
+    assert result["status"] == "ok"
+    assert len(result["review"]) == 1
+
+    recorded = journal()[result["trx_id"]]
+    assert recorded["items"][0]["price"] == old_price
+    assert recorded["subtotal"] == 2 * old_price
+    assert (recorded["diskon"], recorded["ppn"], recorded["total"]) == main.hitung_total(2 * old_price)
+    assert recorded["cash"] == 100000
+    assert recorded["review"] == result["review"]
+
+
+def test_item_removed_from_menu_is_flagged_not_dropped(client):
+    sale = entry([menu_line("Mkn001"), ("XX999", "Menu musiman", 1, 12000)], 100000)
+
+    (result,) = sync(client, sale)
+
+    assert result["status"] == "ok"
+    assert any("XX999" in note for note in result["review"])
+    assert journal()[result["trx_id"]]["items"][1]["nama"] == "Menu musiman"
+
+
+def test_client_total_mismatch_uses_server_totals(client):
+    sale = entry([menu_line("Mkn001")], 100000)
+    sale["ppn"] += 1
+
+    (result,) = sync(client, sale)
+
+    assert result["status"] == "ok"
+    assert any(note.startswith("ppn") for note in result["review"])
+    recorded = journal()[result["trx_id"]]
+    assert recorded["ppn"] == sale["ppn"] - 1
+    # cash & kembalian tetap angka dari client (isi laci sebenarnya)
+    assert (recorded["cash"], recorded["kembalian"]) == (sale["cash"], sale["kembalian"])
+
+
+def test_impossible_change_is_rejected(client):
+    sale = entry([menu_line("Mkn001")], 10000, kembalian=20000)
+
+    (result,) = sync(client, sale)
+
+    assert result["status"] == "rejected"
+
+
+@pytest.mark.parametrize(
+    "age, published",
+    [(60, True), (main.OFFLINE_KITCHEN_MAX_AGE + 60, False)],
+)
+def test_kitchen_receives_only_recent_offline_orders(client, age, published):
+    topic = f"{main.app.config['OUTLET_ID']}:semua"
+    subscriber = main.kitchen_broker.subscribe(topic)
+    try:
+        sale = entry([menu_line("Mkn001")], 100000, waktu=time.time() - age)
+        (result,) = sync(client, sale)
+        assert result["status"] == "ok"
+
+        messages = []
+        while not subscriber.empty():
+            messages.append(subscriber.get_nowait())
+    finally:
+        main.kitchen_broker.unsubscribe(topic, subscriber)
+
+    assert any(result["trx_id"].encode() in message for message in messages) is published
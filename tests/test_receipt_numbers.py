@@ -0,0 +1,102 @@
+"""
+Stress test ReceiptNumberAllocator: beberapa proses (masing-masing
+dengan beberapa thread) mengambil nomor struk dari satu file SQLite
+secara bersamaan.
+"""
+
+import multiprocessing
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import main
+
+PROCESSES = 6
+THREADS = 4
+BLOCK_SIZE = 7
+# Kelipatan BLOCK_SIZE: setiap blok yang disewa habis terpakai, jadi
+# gabungan semua nomor harus rapat tanpa gap
+IDS_PER_PROCESS = BLOCK_SIZE * 60
+
+
+def allocate(db_path, outlet_id, barrier, results):
+    main.app.config["DATABASE"] = db_path
+    allocator = main.ReceiptNumberAllocator(outlet_id, block_size=BLOCK_SIZE)
+
+    barrier.wait()
+    with ThreadPoolExecutor(THREADS) as executor:
+        ids = list(executor.map(lambda _: allocator.next_id(), range(IDS_PER_PROCESS)))
+
+    results.put(ids)
+
+
+def run_workers(db_path, outlet_ids):
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(len(outlet_ids))
+    results = ctx.Queue()
+
+    processes = [
+        ctx.Process(target=allocate, args=(db_path, outlet_id, barrier, results))
+        for outlet_id in outlet_ids
+    ]
+    for process in processes:
+        process.start()
+
+    collected = []
+    deadline = time.monotonic() + 120
+    while len(collected) < len(processes):
+        try:
+            collected.append(results.get(timeout=0.5))
+        except queue.Empty:
+            # Worker yang crash tidak pernah mengirim hasil: gagal cepat
+            crashed = [p.exitcode for p in processes if p.exitcode not in (None, 0)]
+            assert not crashed, f"worker gagal, exitcode {crashed}"
+            assert time.monotonic() < deadline, "worker tidak selesai dalam 120 detik"
+
+    for process in processes:
+        process.join(timeout=30)
+        assert process.exitcode == 0
+
+    return collected
+
+
+def numbers(ids, outlet_id):
+    prefix = f"{outlet_id}-"
+    assert all(i.startswith(prefix) for i in ids)
+    return [int(i[len(prefix):]) for i in ids]
+
+
+def test_concurrent_processes_get_unique_gapless_ids(db_path):
+    collected = run_workers(db_path, ["K3"] * PROCESSES)
+
+    all_numbers = [n for ids in collected for n in numbers(ids, "K3")]
+    total = PROCESSES * IDS_PER_PROCESS
+
+    assert len(all_numbers) == total
+    assert len(set(all_numbers)) == total  # tidak ada duplikat
+    assert sorted(all_numbers) == list(range(1, total + 1))  # tidak ada gap
+
+
+def test_outlets_have_independent_counters(db_path):
+    collected = run_workers(db_path, ["K3", "K5", "K3", "K5"])
+
+    by_outlet = {"K3": [], "K5": []}
+    for ids in collected:
+        outlet_id = ids[0].split("-")[0]
+        by_outlet[outlet_id].extend(numbers(ids, outlet_id))
+
+    for outlet_numbers in by_outlet.values():
+        assert sorted(outlet_numbers) == list(range(1, 2 * IDS_PER_PROCESS + 1))
+
+
+def test_ids_increase_within_one_thread(db_path):
+    allocator = main.ReceiptNumberAllocator("K3", block_size=BLOCK_SIZE)
+    other = main.ReceiptNumberAllocator("K3", block_size=BLOCK_SIZE)
+
+    ids = []
+    for _ in range(50):
+        ids.append(allocator.next_id())
+        other.next_id()  # "worker" lain menyewa blok di sela-sela
+
+    assert numbers(ids, "K3") == sorted(numbers(ids, "K3"))
+    assert len(set(ids)) == len(ids)
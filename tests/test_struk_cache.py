@@ -0,0 +1,111 @@
+"""
+Test StrukCache (memory LRU + folder disk bersama) dan akses /struk/<trx_id>
+"""
+
+import os
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+import main
+
+BASE_URL = "https://localhost"
+
+
+def pdf(n, size=100):
+    return b"%PDF-" + bytes([n]) * (size - 5)
+
+
+def disk_cache(path, **kwargs):
+    kwargs.setdefault("disk_max_bytes", 1024 * 1024)
+    return main.StrukCache(1024 * 1024, disk_dir=str(path), **kwargs)
+
+
+def test_memory_hit():
+    cache = main.StrukCache(1024)
+    etag = cache.put("K3-00000001", pdf(1))
+
+    assert cache.get("K3-00000001") == (pdf(1), etag)
+    assert etag == main.StrukCache.make_etag(pdf(1))
+    assert cache.get("K3-00000002") is None
+
+
+def test_disk_hit_from_another_worker(tmp_path):
+    writer = disk_cache(tmp_path)
+    reader = disk_cache(tmp_path)  # Worker lain, folder yang sama
+
+    etag = writer.put("K3-00000001", pdf(1))
+
+    assert reader.get("K3-00000001") == (pdf(1), etag)
+    # Hit disk masuk memory reader: tetap terbaca walaupun file dihapus
+    os.remove(tmp_path / "K3-00000001.pdf")
+    assert reader.get("K3-00000001") == (pdf(1), etag)
+
+
+def test_memory_evicts_least_recently_used():
+    cache = main.StrukCache(250)
+    cache.put("K3-00000001", pdf(1))
+    cache.put("K3-00000002", pdf(2))
+    cache.get("K3-00000001")  # Baru dipakai: yang dibuang nomor 2
+    cache.put("K3-00000003", pdf(3))
+
+    assert cache.get("K3-00000001") is not None
+    assert cache.get("K3-00000002") is None
+    assert cache.get("K3-00000003") is not None
+
+
+def test_disk_evicts_oldest_file(tmp_path):
+    cache = disk_cache(tmp_path, disk_max_bytes=250)
+    for n in range(1, 4):
+        # mtime = urutan LRU; put berikutnya men-scan folder lagi
+        # karena 100 bytes >= disk_max_bytes / DISK_PRUNE_FRACTION
+        cache.put(f"K3-0000000{n}", pdf(n))
+        os.utime(tmp_path / f"K3-0000000{n}.pdf", (n, n))
+
+    assert sorted(os.listdir(tmp_path)) == ["K3-00000002.pdf", "K3-00000003.pdf"]
+    assert cache.prune_disk() == 0
+
+
+def test_read_without_promote_keeps_lru_order(tmp_path):
+    cache = main.StrukCache(250, disk_dir=str(tmp_path), disk_max_bytes=1024 * 1024)
+    cache.put("K3-00000001", pdf(1))
+    cache.put("K3-00000002", pdf(2))
+    os.utime(tmp_path / "K3-00000001.pdf", (1, 1))
+
+    # Export: baca struk lama tanpa menggeser struk yang baru dipakai
+    assert cache.get("K3-00000001", promote=False) is not None
+    assert cache.get("K3-00000000", promote=False) is None
+    other = disk_cache(tmp_path)
+    assert other.get("K3-00000002", promote=False) is not None
+
+    cache.put("K3-00000003", pdf(3))
+    assert list(cache._memory) == ["K3-00000002", "K3-00000003"]
+    assert os.stat(tmp_path / "K3-00000001.pdf").st_mtime == 1
+    assert list(other._memory) == []
+
+
+@pytest.fixture
+def cashiers(db_path, monkeypatch):
+    monkeypatch.setitem(main.USERS, "kasir2@example.com", generate_password_hash("rahasia"))
+
+    clients = []
+    for email, password in (("zhaenx_id@yeswehack.com", "zh43nx"), ("kasir2@example.com", "rahasia")):
+        client = main.app.test_client()
+        response = client.post("/login", data={"email": email, "password": password}, base_url=BASE_URL)
+        assert response.status_code == 302
+        clients.append(client)
+    return clients
+
+
+def test_other_cashier_gets_404(cashiers):
+    owner, other = cashiers
+    owner.post("/cart/update", json={"id": "Mkn001", "action": "add"}, base_url=BASE_URL)
+    trx_id = owner.post("/checkout", json={"nama": "Ana", "cash": 100000}, base_url=BASE_URL).json["trx_id"]
+
+    first = owner.get(f"/struk/{trx_id}", base_url=BASE_URL)
+    assert first.status_code == 200
+    assert main.struk_cache.get(trx_id) is not None
+
+    # Struk sudah di cache: tetap 404 untuk kasir lain
+    assert other.get(f"/struk/{trx_id}", base_url=BASE_URL).status_code == 404
+    assert other.get("/struk/K3-99999999", base_url=BASE_URL).status_code == 404
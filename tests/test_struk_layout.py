@@ -0,0 +1,124 @@
+"""
+Golden test layout struk thermal (layout_struk / render_struk)
+
+Snapshot layout (tinggi halaman + daftar drawing op) disimpan sebagai
+JSON di tests/golden/. Setelah mengubah layout dengan sengaja, buat ulang
+snapshot dengan:
+
+    UPDATE_GOLDEN=1 python -m pytest tests/test_struk_layout.py
+"""
+
+import datetime
+import json
+import os
+import re
+
+import pytest
+
+import main
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden")
+
+WAKTU = datetime.datetime(2025, 12, 8, 14, 30, 5)
+
+CASES = {
+    "struk_pendek": {
+        "nama": "Budi",
+        "items": [
+            {"nama": "Nasi goreng pedas pake telor", "qty": 1, "price": 23000},
+            {"nama": "Es teh manis", "qty": 2, "price": 5000},
+        ],
+        "subtotal": 33000,
+        "diskon": 3300,
+        "ppn": 2970,
+        "total": 32670,
+        "cash": 50000,
+        "kembalian": 17330,
+        "waktu": WAKTU,
+        "nomor": "K3-00000001",
+    },
+    "struk_panjang": {
+        "nama": "Pelanggan dengan nama yang cukup panjang",
+        "items": [
+            {
+                "nama": "Rice bowl sweet & sour karage extra sambal matah dan telur setengah matang",
+                "qty": 3,
+                "price": 25000,
+            },
+        ]
+        + [{"nama": f"Menu nomor {i}", "qty": i, "price": 1000 * i} for i in range(1, 31)],
+        "subtotal": 484500,
+        "diskon": 48450,
+        "ppn": 43605,
+        "total": 479655,
+        "cash": 500000,
+        "kembalian": 20345,
+        "waktu": WAKTU,
+        "nomor": "K3-00000002",
+    },
+}
+
+
+def layout_snapshot(data):
+    height, ops = main.layout_struk(data)
+    # Round-trip JSON: tuple menjadi list, sama seperti isi file golden
+    return json.loads(json.dumps({"height": height, "ops": ops}))
+
+
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_layout_matches_golden(name):
+    snapshot = layout_snapshot(CASES[name])
+    path = os.path.join(GOLDEN_DIR, f"{name}.json")
+
+    if os.environ.get("UPDATE_GOLDEN"):
+        # Satu op per baris supaya diff golden mudah dibaca saat review
+        ops = ",\n  ".join(json.dumps(op, ensure_ascii=False) for op in snapshot["ops"])
+        with open(path, "w") as file:
+            file.write(f'{{"height": {json.dumps(snapshot["height"])}, "ops": [\n  {ops}\n]}}\n')
+
+    with open(path) as file:
+        golden = json.load(file)
+
+    assert snapshot == golden
+
+
+def test_long_names_are_wrapped_inside_paper():
+    _, ops = main.layout_struk(CASES["struk_panjang"])
+    measure = main.canvas.Canvas(None)
+    font = None
+    lines = []
+
+    for op in ops:
+        if op[0] == "font":
+            font = op[1:]
+        elif op[0] == "text" and op[1] == "left":
+            lines.append(op[4])
+            assert op[2] + measure.stringWidth(op[4], *font) <= main.RIGHT_MARGIN
+
+    long_name = CASES["struk_panjang"]["items"][0]["nama"]
+    assert long_name not in lines
+    assert any(line.startswith("Rice bowl") for line in lines)
+
+
+def test_height_grows_with_items():
+    short_height, _ = main.layout_struk(CASES["struk_pendek"])
+    long_height, _ = main.layout_struk(CASES["struk_panjang"])
+
+    assert long_height > short_height
+    assert long_height > 600  # dulu halaman fixed 600pt dipecah ke beberapa halaman
+
+
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_render_is_single_page_with_layout_height(name):
+    data = CASES[name]
+    pdf = main.render_struk(data)
+    height, _ = main.layout_struk(data)
+
+    # invariant=1: data sama -> bytes sama (dipakai untuk ETag cache struk)
+    assert pdf == main.render_struk(data)
+
+    assert pdf.count(b"/Type /Page\n") + pdf.count(b"/Type /Page ") == 1
+    media_box = re.search(rb"/MediaBox \[\s*0 0 ([\d.]+) ([\d.]+)\s*\]", pdf)
+    assert media_box is not None
+    assert float(media_box.group(1)) == pytest.approx(main.THERMAL_WIDTH, abs=0.01)
+    assert float(media_box.group(2)) == pytest.approx(height, abs=0.01)